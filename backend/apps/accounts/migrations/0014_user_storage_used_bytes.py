@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+def backfill_storage_used(apps, schema_editor):
+    from django.db.models import OuterRef, Subquery, Sum
+    from django.db.models.functions import Coalesce
+
+    User = apps.get_model('accounts', 'User')
+    UserFile = apps.get_model('files', 'UserFile')
+
+    totals = UserFile.objects.filter(user=OuterRef('pk')).exclude(
+        status__in=['DELETED', 'EXPIRED'],
+    ).values('user').annotate(total=Sum('size_bytes')).values('total')
+    User.objects.update(storage_used_bytes=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0013_emailverificationtoken'),
+        ('files', '0002_userfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='storage_used_bytes',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_storage_used, migrations.RunPython.noop),
+    ]
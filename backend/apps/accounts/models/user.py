@@ -70,6 +70,10 @@ class User(AbstractUser):
         help_text="Admin who flagged this account"
     )
     flagged_at = models.DateTimeField(null=True, blank=True)
+    
+    # Denormalized total of live UserFile sizes, kept by F() updates on upload
+    # and delete and repaired nightly (see apps.files.services.storage_counter)
+    storage_used_bytes = models.BigIntegerField(default=0)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
@@ -82,6 +86,17 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        # storage_used_bytes only changes through F() updates (see
+        # apps.files.services.storage_counter); writing back the value loaded
+        # at the start of a request would undo concurrent uploads and deletes
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'storage_used_bytes'
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def is_super_admin(self):
         return self.role == self.Roles.SUPER_ADMIN
@@ -1,6 +1,7 @@
 from rest_framework import viewsets, permissions, status, decorators
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.http import HttpResponse
 from django.core.files.storage import default_storage
 from apps.files.models.user_file import UserFile
 from apps.files.api.serializers import UserFileSerializer
@@ -164,6 +165,83 @@ class UserFileViewSet(viewsets.ModelViewSet):
         file.save()
         return Response({'status': 'Password removed'})
 
+    @decorators.action(detail=False, methods=['get'])
+    def search(self, request):
+        """Ranked full-text search over the user's files, with page-level hits."""
+        from apps.files.services.search_index import SearchIndexService
+        
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Query parameter q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = SearchIndexService.search(request.user, query, limit=limit)
+        
+        logger.info(f"FileSearch:QUERY user={request.user.id} results={len(results)}")
+        
+        return Response({'query': query, 'count': len(results), 'results': results})
+
+    @decorators.action(detail=True, methods=['get'], url_path=r'tiles/(?P<page>\d+)')
+    def tiles(self, request, pk=None, page=None):
+        """Deep-zoom descriptor of a page: full size, tile size and level count."""
+        from apps.files.services.tile_service import TileService
+        
+        file = self.get_object()
+        if file.mime_type != 'application/pdf':
+            return Response({'error': 'Tiles are only available for PDFs'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        descriptor = TileService.descriptor(file, int(page))
+        if descriptor is None:
+            return Response({'error': f"Page {page} does not exist"}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response({'page': int(page), **descriptor})
+
+    @decorators.action(
+        detail=True, methods=['get'],
+        url_path=r'tiles/(?P<page>\d+)/(?P<level>\d+)/(?P<col>\d+)_(?P<row>\d+)',
+    )
+    def tile(self, request, pk=None, page=None, level=None, col=None, row=None):
+        """One 256px tile of a page at a pyramid level, rendered on first request."""
+        from apps.files.services.tile_service import TileService
+        
+        file = self.get_object()
+        if file.mime_type != 'application/pdf':
+            return Response({'error': 'Tiles are only available for PDFs'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            data = TileService.get_tile(file, int(page), int(level), int(col), int(row))
+        except IndexError as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error(f"FileTile:FAILED file_id={file.id} page={page} error={e}")
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        content_type = 'image/webp' if TileService.format() == 'webp' else 'image/jpeg'
+        response = HttpResponse(data, content_type=content_type)
+        # Tiles are addressed by file content, so they never change
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return response
+
+    @decorators.action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Stream the file, honoring Range requests for progressive viewing."""
+        from core.delivery import DeliveryService
+        from core.storage import StorageError
+        
+        file = self.get_object()
+        if not file.file or not file.file.name:
+            return Response({'error': 'File not found in storage'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            return DeliveryService.stream_response(request, file.file.name, file.name, file.mime_type)
+        except (StorageError, FileNotFoundError) as e:
+            logger.error(f"FileDownload:FAILED file_id={file.id} error={e}")
+            return Response({'error': 'File not found in storage'}, status=status.HTTP_404_NOT_FOUND)
+
     @decorators.action(detail=True, methods=['get'])
     def check_storage(self, request, pk=None):
         """Check if file exists in object storage."""
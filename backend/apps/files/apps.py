@@ -6,3 +6,6 @@ class FilesConfig(AppConfig):
     name = 'apps.files'
     label = 'files'
     verbose_name = 'File Management'
+
+    def ready(self):
+        import apps.files.signals
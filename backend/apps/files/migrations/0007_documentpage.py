@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:58
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0006_cloudprovider_cloudconnection_cloudsyncjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_number', models.PositiveIntegerField()),
+                ('content', models.TextField()),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_pages', to='files.userfile')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_pages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'files_documentpage',
+                'ordering': ['file_id', 'page_number'],
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='files_docpage_vector_gin'), models.Index(fields=['user', 'file'], name='files_docpage_user_file')],
+                'unique_together': {('file', 'page_number')},
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
 from .file_asset import FileAsset, FileVersion, FileStateLog
+from .search_index import DocumentPage
 
-__all__ = ['FileAsset', 'FileVersion', 'FileStateLog']
+__all__ = ['FileAsset', 'FileVersion', 'FileStateLog', 'DocumentPage']
@@ -0,0 +1,43 @@
+"""
+Document Search Index Model
+Per-page text postings for full-text search over users' files.
+"""
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+
+class DocumentPage(models.Model):
+    """
+    Extracted text of one page of a UserFile.
+    Postings are removed with the file (CASCADE) and rebuilt on re-index.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='search_pages',
+    )
+    file = models.ForeignKey(
+        'files.UserFile',
+        on_delete=models.CASCADE,
+        related_name='search_pages',
+    )
+    page_number = models.PositiveIntegerField()
+    content = models.TextField()
+    search_vector = SearchVectorField(null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'files'
+        db_table = 'files_documentpage'
+        ordering = ['file_id', 'page_number']
+        unique_together = ['file', 'page_number']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='files_docpage_vector_gin'),
+            models.Index(fields=['user', 'file'], name='files_docpage_user_file'),
+        ]
+
+    def __str__(self):
+        return f"{self.file_id} p{self.page_number}"
@@ -0,0 +1,299 @@
+"""
+Document Search Service
+Incremental full-text indexing of users' PDFs and ranked page-level search.
+
+Text is extracted page by page once a UserFile is AVAILABLE and stored as
+DocumentPage rows with a Postgres tsvector. Indexing runs in background
+batches; only one batch runs at a time and each batch is bounded by file and
+page budgets, so a burst of uploads queues up instead of flooding workers.
+
+A file that fails to index for a transient reason (storage, database) is
+retried with exponential backoff up to MAX_ATTEMPTS times. Only a PDF that
+cannot be parsed, or one that has used up its attempts, is marked failed for
+good.
+"""
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
+import os
+import tempfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_CONFIG = 'simple'
+STATE_KEY = 'search_index'
+
+BATCH_FILES = 20
+BATCH_PAGES = 2000
+BATCH_LOCK_KEY = 'search_index:batch_lock'
+BATCH_LOCK_TIMEOUT = 15 * 60  # seconds
+KICK_KEY = 'search_index:kick'
+KICK_DEBOUNCE = 30  # seconds
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 5 * 60  # seconds, doubled after each failed attempt
+
+MAX_PAGE_CHARS = 100_000
+MAX_HITS = 200
+PAGES_PER_RESULT = 5
+
+
+class SearchIndexService:
+    """Builds and queries the per-page full-text index."""
+
+    @staticmethod
+    def extract_pages(input_path: str, structure: dict = None, file_record=None) -> list:
+        """
+        Extract text per page.
+
+        With a file_record the text comes from the shared text cache, which
+        this fills for the other tools. Otherwise pages the structural index
+        marks as text-free are skipped without being parsed.
+
+        Returns:
+            list: [(page_number, text), ...] for pages with text, 1-based
+        """
+        import fitz
+
+        if file_record is not None:
+            from apps.files.services.text_cache import TextCacheService
+
+            texts = TextCacheService.for_record(file_record, 'text', input_path)
+            return [
+                (number, text.strip()[:MAX_PAGE_CHARS])
+                for number, text in enumerate(texts, start=1) if text.strip()
+            ]
+
+        text_pages = None
+        if structure and structure.get('pages'):
+            text_pages = {i for i, page in enumerate(structure['pages']) if page['text']}
+
+        pages = []
+        with fitz.open(input_path) as doc:
+            for page in doc:
+                if text_pages is not None and page.number not in text_pages:
+                    continue
+                text = page.get_text('text').strip()
+                if text:
+                    pages.append((page.number + 1, text[:MAX_PAGE_CHARS]))
+        return pages
+
+    @staticmethod
+    def pending_files():
+        """
+        UserFiles that are AVAILABLE PDFs not indexed yet, or due for another
+        attempt, oldest first.
+        """
+        from apps.files.models.user_file import UserFile
+
+        due = Q(**{
+            f'metadata__{STATE_KEY}__status': 'retry',
+            f'metadata__{STATE_KEY}__retry_at__lte': timezone.now().isoformat(),
+        })
+        return UserFile.objects.filter(
+            ~Q(metadata__has_key=STATE_KEY) | due,
+            status=UserFile.Status.AVAILABLE,
+            mime_type='application/pdf',
+            user__isnull=False,
+        ).order_by('created_at')
+
+    @staticmethod
+    def _mark(file_record, status: str, **extra):
+        file_record.metadata[STATE_KEY] = {
+            'status': status,
+            'indexed_at': timezone.now().isoformat(),
+            **extra,
+        }
+        file_record.save(update_fields=['metadata'])
+
+    @staticmethod
+    def _is_parse_error(error: Exception) -> bool:
+        """Whether the file itself is broken, so retrying cannot help."""
+        import fitz
+
+        return isinstance(error, fitz.FileDataError)
+
+    @classmethod
+    def _mark_failure(cls, file_record, error: Exception) -> str:
+        """
+        Schedule another attempt after a transient failure, or give up.
+
+        Returns:
+            str: 'retry' or 'failed'
+        """
+        state = (file_record.metadata or {}).get(STATE_KEY) or {}
+        attempts = state.get('attempts', 0) + 1
+        message = str(error)[:500]
+
+        if cls._is_parse_error(error) or attempts >= MAX_ATTEMPTS:
+            cls._mark(file_record, 'failed', attempts=attempts, error=message)
+            return 'failed'
+
+        retry_at = timezone.now() + timedelta(seconds=RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        cls._mark(file_record, 'retry', attempts=attempts, retry_at=retry_at.isoformat(), error=message)
+        return 'retry'
+
+    @classmethod
+    def store_pages(cls, file_record, pages: list) -> int:
+        """
+        Replace a file's postings with the given page texts.
+
+        Returns:
+            int: Pages stored
+        """
+        from django.contrib.postgres.search import SearchVector
+        from apps.files.models.search_index import DocumentPage
+
+        with transaction.atomic():
+            DocumentPage.objects.filter(file=file_record).delete()
+            DocumentPage.objects.bulk_create([
+                DocumentPage(user_id=file_record.user_id, file=file_record, page_number=number, content=text)
+                for number, text in pages
+            ], batch_size=500)
+            DocumentPage.objects.filter(file=file_record).update(
+                search_vector=SearchVector('content', config=SEARCH_CONFIG)
+            )
+        return len(pages)
+
+    @classmethod
+    def index_file(cls, file_record) -> int:
+        """
+        Download, extract and index one file.
+
+        Returns:
+            int: Pages indexed
+        """
+        from apps.files.services.structure_index import StructureIndexService
+
+        ext = os.path.splitext(file_record.file.name)[1] or '.pdf'
+        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
+            with default_storage.open(file_record.file.name, 'rb') as src:
+                for chunk in iter(lambda: src.read(1024 * 1024), b''):
+                    tmp.write(chunk)
+            local_path = tmp.name
+
+        try:
+            pages = cls.extract_pages(local_path, StructureIndexService.get(file_record), file_record)
+        finally:
+            os.unlink(local_path)
+
+        stored = cls.store_pages(file_record, pages)
+        cls._mark(file_record, 'indexed', pages=stored)
+
+        logger.info(f"SearchIndex:INDEXED file={file_record.id} pages={stored}")
+        return stored
+
+    @classmethod
+    def index_pending(cls, max_files: int = BATCH_FILES, max_pages: int = BATCH_PAGES) -> dict:
+        """
+        Index one batch of pending files.
+
+        Returns without work when another batch holds the lock. A batch stops
+        once either budget is spent; the rest waits for the next batch.
+
+        Returns:
+            dict: {files, pages, failed, remaining, skipped}
+        """
+        if not cache.add(BATCH_LOCK_KEY, timezone.now().isoformat(), BATCH_LOCK_TIMEOUT):
+            logger.info("SearchIndex:BATCH_SKIPPED reason=locked")
+            return {'files': 0, 'pages': 0, 'failed': 0, 'remaining': None, 'skipped': True}
+
+        files = pages = failed = 0
+        try:
+            for file_record in cls.pending_files()[:max_files]:
+                try:
+                    pages += cls.index_file(file_record)
+                    files += 1
+                except Exception as e:
+                    failed += 1
+                    outcome = cls._mark_failure(file_record, e)
+                    logger.error(f"SearchIndex:FAILED file={file_record.id} outcome={outcome} error={e}")
+
+                if pages >= max_pages:
+                    break
+
+            remaining = cls.pending_files().count()
+        finally:
+            cache.delete(BATCH_LOCK_KEY)
+
+        logger.info(f"SearchIndex:BATCH files={files} pages={pages} failed={failed} remaining={remaining}")
+        return {'files': files, 'pages': pages, 'failed': failed, 'remaining': remaining, 'skipped': False}
+
+    @staticmethod
+    def request_indexing():
+        """Schedule a batch soon, at most once per debounce window."""
+        if cache.add(KICK_KEY, 1, KICK_DEBOUNCE):
+            from apps.files.tasks import index_pending_files
+            index_pending_files.apply_async(countdown=5)
+
+    @staticmethod
+    def remove_file(file_record) -> int:
+        """Drop a file's postings."""
+        from apps.files.models.search_index import DocumentPage
+
+        deleted, _ = DocumentPage.objects.filter(file=file_record).delete()
+        return deleted
+
+    @staticmethod
+    def search(user, query: str, limit: int = 20) -> list:
+        """
+        Ranked search over a user's indexed pages.
+
+        Returns:
+            list: [{file_id, name, rank, hits: [{page, rank, snippet}]}] best first
+        """
+        from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+        from django.db.models import F, Q
+        from apps.files.models.search_index import DocumentPage
+
+        search_query = SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+
+        hits = (
+            DocumentPage.objects
+            .filter(user=user, search_vector=search_query)
+            .annotate(rank=SearchRank(F('search_vector'), search_query))
+            .order_by('-rank', 'file_id', 'page_number')
+            .values('file_id', 'file__name', 'page_number', 'rank')[:MAX_HITS]
+        )
+        hits = list(hits)
+
+        results = {}
+        for hit in hits:
+            if hit['file_id'] not in results and len(results) >= limit:
+                continue
+            entry = results.setdefault(hit['file_id'], {
+                'file_id': hit['file_id'],
+                'name': hit['file__name'],
+                'rank': hit['rank'],
+                'hits': [],
+            })
+            if len(entry['hits']) < PAGES_PER_RESULT:
+                entry['hits'].append({'page': hit['page_number'], 'rank': hit['rank'], 'snippet': ''})
+
+        results = list(results.values())
+
+        # Headlines are costly; build them only for the pages actually returned
+        wanted = Q()
+        for result in results:
+            wanted |= Q(file_id=result['file_id'], page_number__in=[h['page'] for h in result['hits']])
+        if results:
+            snippets = (
+                DocumentPage.objects
+                .filter(wanted, user=user)
+                .annotate(snippet=SearchHeadline(
+                    'content', search_query, config=SEARCH_CONFIG,
+                    start_sel='<mark>', stop_sel='</mark>', max_fragments=2,
+                ))
+                .values_list('file_id', 'page_number', 'snippet')
+            )
+            by_page = {(file_id, page): snippet for file_id, page, snippet in snippets}
+            for result in results:
+                for hit in result['hits']:
+                    hit['snippet'] = by_page.get((result['file_id'], hit['page']), '')
+
+        return results
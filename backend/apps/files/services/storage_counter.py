@@ -0,0 +1,92 @@
+"""
+Storage Counter
+Keeps User.storage_used_bytes equal to the total size of the user's live
+UserFile rows (every status but DELETED and EXPIRED), so quota checks read
+one column instead of aggregating over all of a user's files.
+
+The UserFile signals charge the difference between what a row counted for
+when it was loaded and what it counts for after a save or delete, with an
+F() update. Bulk queryset updates bypass the signals; reconcile() (nightly
+Celery task) repairs any drift that leaves.
+"""
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+UNCOUNTED_STATUSES = ('DELETED', 'EXPIRED')
+
+
+class StorageCounter:
+    """Denormalized per-user storage totals."""
+
+    @staticmethod
+    def charge_of(instance):
+        """(user_id, bytes) a UserFile counts for, or None when not loaded."""
+        if {'user_id', 'status', 'size_bytes'} & instance.get_deferred_fields():
+            return None
+        size = instance.size_bytes or 0
+        return instance.user_id, (0 if instance.status in UNCOUNTED_STATUSES else size)
+
+    @classmethod
+    def apply(cls, before, after):
+        """Move a file's charge from its previous (user, bytes) to the new one."""
+        from core.user_context import UserContextResolver
+
+        deltas = {}
+        if before and before[1]:
+            deltas[before[0]] = deltas.get(before[0], 0) - before[1]
+        if after and after[1]:
+            deltas[after[0]] = deltas.get(after[0], 0) + after[1]
+
+        for user_id, delta in deltas.items():
+            if delta and user_id is not None:
+                cls.add(user_id, delta)
+                UserContextResolver.invalidate(user_id)
+
+    @staticmethod
+    def add(user_id, delta: int):
+        from apps.accounts.models.user import User
+
+        User.objects.filter(pk=user_id).update(storage_used_bytes=F('storage_used_bytes') + delta)
+
+    @staticmethod
+    def live_totals():
+        """Correlated subquery: a user's live file bytes."""
+        from apps.files.models.user_file import UserFile
+
+        return Coalesce(Subquery(
+            UserFile.objects.filter(user=OuterRef('pk')).exclude(status__in=UNCOUNTED_STATUSES)
+            .values('user').annotate(total=Sum('size_bytes')).values('total')
+        ), 0)
+
+    @classmethod
+    def reconcile(cls) -> dict:
+        """
+        Repair counters that drifted from the file table.
+
+        Returns:
+            dict: {checked, repaired, drift_bytes}
+        """
+        from apps.accounts.models.user import User
+        from core.user_context import UserContextResolver
+
+        drifted = list(
+            User.objects.annotate(actual=cls.live_totals())
+            .exclude(storage_used_bytes=F('actual'))
+            .values_list('pk', 'storage_used_bytes', 'actual')
+        )
+
+        drift_bytes = 0
+        for user_id, counted, actual in drifted:
+            # Recomputed inside the UPDATE so uploads since the scan are included
+            User.objects.filter(pk=user_id).update(storage_used_bytes=cls.live_totals())
+            UserContextResolver.invalidate(user_id)
+            drift_bytes += abs(actual - counted)
+            logger.warning(f"StorageCounter:DRIFT user={user_id} counted={counted} actual={actual}")
+
+        result = {'checked': User.objects.count(), 'repaired': len(drifted), 'drift_bytes': drift_bytes}
+        logger.info(f"StorageCounter:RECONCILED checked={result['checked']} repaired={result['repaired']} drift_bytes={drift_bytes}")
+        return result
@@ -0,0 +1,209 @@
+"""
+Structural Index Service
+Per-file structural facts gathered in a single parse at upload time.
+
+The index is stored under metadata['structure'] of the FileAsset / UserFile so
+tools, cost checks and preview generation can read page count, page sizes,
+text presence, image bytes and fonts without opening the PDF again.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_VERSION = 2
+METADATA_KEY = 'structure'
+
+INFO_KEYS = ('title', 'author', 'subject', 'creator', 'producer')
+
+
+class StructureIndexService:
+    """Builds and reads the per-file structural index."""
+
+    @staticmethod
+    def _source(source):
+        """
+        A path or bytes for a path, bytes or seekable file object. Uploads
+        spooled to disk are read from their temporary file, not into memory.
+        """
+        if isinstance(source, (bytes, bytearray, str)):
+            return source
+        if hasattr(source, 'temporary_file_path'):
+            return source.temporary_file_path()
+        initial_pos = source.tell()
+        data = source.read()
+        source.seek(initial_pos)
+        return data
+
+    @classmethod
+    def _open(cls, source):
+        """Open a path, bytes or seekable file object with PyMuPDF."""
+        import fitz
+
+        source = cls._source(source)
+        if isinstance(source, (bytes, bytearray)):
+            return fitz.open(stream=source, filetype='pdf')
+        return fitz.open(source)
+
+    @classmethod
+    def _check_readable(cls, source):
+        """
+        PyMuPDF silently repairs damaged files, so the file must also open
+        in pikepdf (qpdf) with a readable page tree, as upload validation
+        always required. qpdf loads objects lazily; this costs milliseconds.
+
+        Raises:
+            ValueError: If the file is too damaged to read
+        """
+        import io
+
+        import pikepdf
+
+        source = cls._source(source)
+        try:
+            with pikepdf.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source) as pdf:
+                len(pdf.pages)
+        except pikepdf.PasswordError:
+            pass
+        except pikepdf.PdfError as e:
+            raise ValueError(f"Damaged PDF: {e}")
+
+    @classmethod
+    def build(cls, source) -> dict:
+        """
+        Parse a PDF once and collect its structural facts.
+
+        Args:
+            source: File path, bytes or seekable file object
+
+        Returns:
+            dict: {version, page_count, is_encrypted, pdf_version, info, fonts,
+                   totals, pages: [{w, h, rotation, text, images, image_bytes, fonts}]}
+                  with w/h as displayed, after rotation. A page has text when
+                  its resources use a font; no text is extracted at upload.
+
+        Raises:
+            fitz.FileDataError: If the data is not a readable PDF
+            ValueError: If the PDF is damaged beyond repair
+        """
+        with cls._open(source) as doc:
+            cls._check_readable(source)
+
+            index = {
+                'version': INDEX_VERSION,
+                'page_count': 0,
+                # Owner-password-only files open without a password but are still encrypted
+                'is_encrypted': bool(doc.needs_pass or (doc.metadata or {}).get('encryption')),
+                'pdf_version': doc.metadata.get('format', '') if doc.metadata else '',
+                'info': {},
+                'fonts': [],
+                'pages': [],
+                'totals': {'text_pages': 0, 'image_count': 0, 'image_bytes': 0},
+            }
+
+            # Page content of a password-protected file is not readable yet
+            if doc.needs_pass:
+                return index
+
+            index['page_count'] = doc.page_count
+            index['info'] = {
+                key: doc.metadata[key] for key in INFO_KEYS
+                if doc.metadata and doc.metadata.get(key)
+            }
+
+            font_ids = {}
+            image_sizes = {}
+
+            for page in doc:
+                page_fonts = []
+                for xref, ext, font_type, basefont, *_ in page.get_fonts():
+                    key = xref or basefont
+                    if key not in font_ids:
+                        font_ids[key] = len(index['fonts'])
+                        index['fonts'].append({
+                            'name': basefont,
+                            'type': font_type,
+                            'embedded': ext != 'n/a',
+                        })
+                    page_fonts.append(font_ids[key])
+
+                image_bytes = 0
+                images = page.get_images()
+                for image in images:
+                    xref = image[0]
+                    if xref not in image_sizes:
+                        # Raw (still compressed) stream length; nothing is decoded
+                        length = doc.xref_get_key(xref, 'Length')
+                        image_sizes[xref] = int(length[1]) if length[0] == 'int' else 0
+                    image_bytes += image_sizes[xref]
+
+                # Pages without a font cannot show text; extracting it at upload is too slow
+                has_text = bool(page_fonts)
+                rect = page.rect
+
+                index['pages'].append({
+                    'w': round(rect.width, 2),
+                    'h': round(rect.height, 2),
+                    'rotation': page.rotation,
+                    'text': has_text,
+                    'images': len(images),
+                    'image_bytes': image_bytes,
+                    'fonts': sorted(set(page_fonts)),
+                })
+                index['totals']['text_pages'] += has_text
+
+            index['totals']['image_count'] = len(image_sizes)
+            index['totals']['image_bytes'] = sum(image_sizes.values())
+
+        logger.info(
+            f"StructureIndex:BUILT pages={index['page_count']} "
+            f"fonts={len(index['fonts'])} images={index['totals']['image_count']}"
+        )
+
+        return index
+
+    @staticmethod
+    def get(file_record) -> dict:
+        """
+        Return the stored index of a file, or None if missing or outdated.
+        """
+        index = (getattr(file_record, 'metadata', None) or {}).get(METADATA_KEY)
+        if index and index.get('version') == INDEX_VERSION:
+            return index
+        return None
+
+    @classmethod
+    def ensure(cls, file_record, local_path: str) -> dict:
+        """
+        Return the stored index, building and saving it from a local copy if
+        the file was uploaded before indexing existed.
+        """
+        index = cls.get(file_record)
+        if index is not None:
+            return index
+
+        index = cls.build(local_path)
+        if file_record is not None and getattr(file_record, 'pk', None):
+            file_record.metadata[METADATA_KEY] = index
+            file_record.save(update_fields=['metadata'])
+        return index
+
+    @classmethod
+    def page_count(cls, file_record, default: int = None) -> int:
+        """Page count from the index, falling back to the record's own field."""
+        index = cls.get(file_record)
+        if index is not None:
+            return index['page_count']
+        return getattr(file_record, 'page_count', None) or default
+
+    @classmethod
+    def page_size(cls, file_record, page: int = 1) -> tuple:
+        """
+        Displayed (width, height) in points of a 1-based page, or None.
+        """
+        index = cls.get(file_record)
+        if index is None or not 1 <= page <= len(index['pages']):
+            return None
+
+        entry = index['pages'][page - 1]
+        return entry['w'], entry['h']
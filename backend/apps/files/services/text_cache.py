@@ -0,0 +1,179 @@
+"""
+Text Extraction Cache
+Per-page text, word boxes and tables of a document, extracted once and
+shared by every text-consuming tool.
+
+Extractions of library files are stored gzip-compressed as JSON under
+text-cache/<key>/, keyed by file content hash and extraction mode, with a
+Redis pointer to the stored blob. A changed file has a new hash (or
+version), so it never reads a stale extraction; invalidate() drops the
+entries of a file that left the library.
+
+Tool uploads and job inputs are not library files and nothing would ever
+delete their blobs, so their extractions are never written to storage: the
+compressed blob is kept in the cache for TRANSIENT_TTL only, long enough
+for repeat requests on the same document.
+"""
+from django.core.cache import cache
+import gzip
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_VERSION = 1
+POINTER_TTL = 30 * 24 * 60 * 60  # seconds
+TRANSIENT_TTL = 15 * 60  # seconds
+TRANSIENT_MAX_BYTES = 8 * 1024 * 1024  # larger transient extractions are not kept
+
+
+class TextCacheService:
+    """Lazily filled, content-addressed cache of page extractions."""
+
+    @staticmethod
+    def blob_path(key: str, mode: str) -> str:
+        return f"text-cache/{key}/{mode}.v{CACHE_VERSION}.json.gz"
+
+    @staticmethod
+    def pointer_key(key: str, mode: str) -> str:
+        return f"textcache:{key}:{mode}:v{CACHE_VERSION}"
+
+    @staticmethod
+    def transient_key(key: str, mode: str) -> str:
+        return f"textcache:transient:{key}:{mode}:v{CACHE_VERSION}"
+
+    @staticmethod
+    def _decode(blob: bytes) -> list:
+        return json.loads(gzip.decompress(blob))
+
+    @staticmethod
+    def _encode(pages: list) -> bytes:
+        return gzip.compress(json.dumps(pages, separators=(',', ':')).encode(), compresslevel=6)
+
+    @classmethod
+    def get_pages(cls, key: str, mode: str, local_path: str, persist: bool = False) -> list:
+        """
+        Per-page extraction of a document, extracting from local_path on a miss.
+
+        Args:
+            key: Content hash of the document (see render_service.content_key/record_key)
+            mode: Extraction mode, see text_extraction.MODES
+            local_path: Local copy of the PDF, only parsed on a miss
+            persist: Store the extraction; only for library files, whose
+                     deletion invalidates it. Otherwise it expires with TRANSIENT_TTL.
+
+        Returns:
+            list: One entry per page
+        """
+        if not persist:
+            return cls._get_transient(key, mode, local_path)
+
+        from apps.tools.text_extraction import extract_pages
+        from core.storage import StorageError, StorageService
+
+        pointer_key = cls.pointer_key(key, mode)
+        path = cls.blob_path(key, mode)
+
+        try:
+            pointer = cache.get(pointer_key)
+        except Exception as e:
+            logger.warning(f"TextCache:POINTER_UNAVAILABLE error={e}")
+            pointer = None
+
+        # A stored blob the pointer does not know (e.g. after a Redis flush) is adopted
+        if pointer or StorageService.exists(path):
+            try:
+                pages = cls._decode(StorageService.read_bytes(pointer or path))
+            except (StorageError, OSError, ValueError) as e:
+                logger.warning(f"TextCache:UNREADABLE key={key} mode={mode} error={e}")
+            else:
+                if not pointer:
+                    cls._set_pointer(pointer_key, path)
+                logger.debug(f"TextCache:HIT key={key} mode={mode}")
+                return pages
+
+        pages = extract_pages(local_path, mode)
+        blob = cls._encode(pages)
+        try:
+            saved_path = StorageService.upload(path, blob)
+        except Exception as e:
+            # The caller still gets its pages; the next request extracts again
+            logger.warning(f"TextCache:STORE_FAILED key={key} mode={mode} error={e}")
+            return pages
+        cls._set_pointer(pointer_key, saved_path)
+
+        logger.info(f"TextCache:FILLED key={key} mode={mode} pages={len(pages)} bytes={len(blob)}")
+        return pages
+
+    @classmethod
+    def _get_transient(cls, key: str, mode: str, local_path: str) -> list:
+        """Extraction kept in the cache for a short while, never in storage."""
+        from apps.tools.text_extraction import extract_pages
+
+        transient_key = cls.transient_key(key, mode)
+        try:
+            blob = cache.get(transient_key)
+        except Exception as e:
+            logger.warning(f"TextCache:POINTER_UNAVAILABLE error={e}")
+            blob = None
+
+        if blob is not None:
+            try:
+                pages = cls._decode(blob)
+            except (OSError, ValueError) as e:
+                logger.warning(f"TextCache:UNREADABLE key={key} mode={mode} error={e}")
+            else:
+                logger.debug(f"TextCache:TRANSIENT_HIT key={key} mode={mode}")
+                return pages
+
+        pages = extract_pages(local_path, mode)
+        blob = cls._encode(pages)
+        if len(blob) <= TRANSIENT_MAX_BYTES:
+            try:
+                cache.set(transient_key, blob, TRANSIENT_TTL)
+            except Exception as e:
+                logger.warning(f"TextCache:POINTER_UNAVAILABLE error={e}")
+        return pages
+
+    @staticmethod
+    def _set_pointer(pointer_key: str, path: str):
+        try:
+            cache.set(pointer_key, path, POINTER_TTL)
+        except Exception as e:
+            logger.warning(f"TextCache:POINTER_UNAVAILABLE error={e}")
+
+    @classmethod
+    def for_record(cls, record, mode: str, local_path: str) -> list:
+        """
+        Stored get_pages() of a library file, keyed by its hash, or id and
+        version when unhashed.
+        """
+        from apps.tools.render_service import record_key
+
+        return cls.get_pages(record_key(record), mode, local_path, persist=True)
+
+    @classmethod
+    def invalidate(cls, key: str) -> int:
+        """
+        Drop every cached extraction of a document.
+
+        Returns:
+            int: Blobs deleted
+        """
+        from apps.tools.text_extraction import MODES
+        from core.storage import StorageService
+
+        cache.delete_many(
+            [cls.pointer_key(key, mode) for mode in MODES] + [cls.transient_key(key, mode) for mode in MODES]
+        )
+
+        deleted = 0
+        for mode in MODES:
+            path = cls.blob_path(key, mode)
+            if StorageService.exists(path):
+                StorageService.delete(path)
+                deleted += 1
+
+        logger.info(f"TextCache:INVALIDATED key={key} blobs={deleted}")
+        return deleted
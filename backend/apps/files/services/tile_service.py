@@ -0,0 +1,186 @@
+"""
+Deep-Zoom Tile Service
+Renders 256px pyramid tiles of a page on demand, for large-format drawings.
+
+Tiles are stored content-addressed under tiles/<file hash>/, so identical
+uploads share them. A Redis sorted set scores every stored tile by its last
+access; evict_cold() deletes the least recently used tiles once the total
+exceeds TILE_CACHE_MAX_BYTES.
+"""
+from django.conf import settings
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+LRU_KEY = 'tiles:lru'      # zset: storage path -> last access
+SIZES_KEY = 'tiles:sizes'  # hash: storage path -> bytes
+TOTAL_KEY = 'tiles:bytes'  # total bytes of stored tiles
+
+EVICT_BATCH = 200
+
+
+class TileService:
+    """Tile pyramid descriptors, cached tile reads and cold-tile eviction."""
+
+    @staticmethod
+    def _redis():
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+
+    @staticmethod
+    def max_bytes() -> int:
+        return getattr(settings, 'TILE_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+
+    @staticmethod
+    def format() -> str:
+        from apps.tools.render_service import preview_format
+
+        return preview_format()
+
+    @classmethod
+    def descriptor(cls, record, page: int):
+        """
+        Deep-zoom descriptor of a page, from the structural index.
+
+        Returns:
+            dict: {width, height, tile_size, overlap, levels, format} or None
+                  when the page does not exist
+        """
+        from apps.files.services.structure_index import StructureIndexService
+        from apps.tools.render_service import tile_levels
+        from core.storage import StorageService
+
+        index = StructureIndexService.get(record)
+        if index is None:
+            index = StructureIndexService.ensure(record, StorageService.read_bytes(record.file.name))
+
+        if not 1 <= page <= len(index['pages']):
+            return None
+
+        entry = index['pages'][page - 1]
+        return {**tile_levels(entry['w'], entry['h']), 'format': cls.format()}
+
+    @classmethod
+    def tile_path(cls, record, page: int, level: int, col: int, row: int) -> str:
+        from apps.tools.render_service import record_key
+
+        ext = 'webp' if cls.format() == 'webp' else 'jpg'
+        return f"tiles/{record_key(record)}/{page}/{level}/{col}_{row}.{ext}"
+
+    @classmethod
+    def get_tile(cls, record, page: int, level: int, col: int, row: int) -> bytes:
+        """
+        Return one tile, rendering and storing it on a miss.
+
+        Raises:
+            IndexError: If the page, level or tile is outside the pyramid
+        """
+        from apps.tools.render_service import record_key, render_pages
+        from core.storage import StorageError, StorageService
+
+        if page < 1:
+            raise IndexError(f"Page {page} not in document")
+
+        path = cls.tile_path(record, page, level, col, row)
+
+        # A stored tile the LRU does not know (e.g. after a Redis flush) is adopted
+        known = cls._touch(path)
+        if known or StorageService.exists(path):
+            try:
+                data = StorageService.read_bytes(path)
+            except StorageError:
+                if known:
+                    cls._forget([path])
+            else:
+                if not known:
+                    cls._remember(path, len(data))
+                return data
+
+        rendered = render_pages(
+            record_key(record),
+            lambda: StorageService.read_bytes(record.file.name),
+            [page - 1],
+            tile=(level, col, row), fmt=cls.format(),
+        )
+        data = rendered['pages'][0]['data']
+
+        saved_path = StorageService.upload(path, data)
+        cls._remember(saved_path, len(data))
+
+        logger.debug(f"Tiles:RENDERED file={record.id} page={page} tile={level}/{col}_{row}")
+        return data
+
+    @classmethod
+    def _touch(cls, path: str) -> bool:
+        """Mark a tile as used now. Returns False when it is not stored."""
+        try:
+            return bool(cls._redis().zadd(LRU_KEY, {path: time.time()}, xx=True, ch=True))
+        except Exception as e:
+            logger.warning(f"Tiles:LRU_UNAVAILABLE error={e}")
+            return False
+
+    @classmethod
+    def _remember(cls, path: str, size: int):
+        try:
+            pipe = cls._redis().pipeline()
+            pipe.zadd(LRU_KEY, {path: time.time()})
+            pipe.hset(SIZES_KEY, path, size)
+            pipe.incrby(TOTAL_KEY, size)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Tiles:LRU_UNAVAILABLE error={e}")
+
+    @classmethod
+    def _forget(cls, paths: list) -> int:
+        """Drop tiles from the LRU. Returns the bytes released."""
+        redis = cls._redis()
+        sizes = redis.hmget(SIZES_KEY, paths)
+        released = sum(int(size or 0) for size in sizes)
+
+        pipe = redis.pipeline()
+        pipe.zrem(LRU_KEY, *paths)
+        pipe.hdel(SIZES_KEY, *paths)
+        pipe.decrby(TOTAL_KEY, released)
+        pipe.execute()
+        return released
+
+    @classmethod
+    def evict_cold(cls, max_bytes: int = None) -> dict:
+        """
+        Delete least recently used tiles until the total fits the budget.
+
+        Returns:
+            dict: {evicted, released, total}
+        """
+        from core.storage import StorageService
+
+        max_bytes = cls.max_bytes() if max_bytes is None else max_bytes
+        redis = cls._redis()
+        evicted = released = 0
+
+        total = int(redis.get(TOTAL_KEY) or 0)
+        while total > max_bytes:
+            coldest = [path.decode() for path in redis.zrange(LRU_KEY, 0, EVICT_BATCH - 1)]
+            if not coldest:
+                break
+
+            # Take only as many of the coldest tiles as the overshoot needs
+            paths, needed = [], total - max_bytes
+            for path, size in zip(coldest, redis.hmget(SIZES_KEY, coldest)):
+                paths.append(path)
+                needed -= int(size or 0)
+                if needed <= 0:
+                    break
+
+            for path in paths:
+                StorageService.delete(path)
+            released += cls._forget(paths)
+            evicted += len(paths)
+            total = int(redis.get(TOTAL_KEY) or 0)
+
+        logger.info(f"Tiles:EVICTED count={evicted} released={released} total={total}")
+
+        return {'evicted': evicted, 'released': released, 'total': total}
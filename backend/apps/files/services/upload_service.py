@@ -75,32 +75,26 @@ class UploadService:
     @staticmethod
     def validate_pdf_integrity(file_obj) -> dict:
         """
-        Validate PDF structure and extract metadata.
+        Validate PDF structure and build its structural index in one parse.
         
         Returns:
-            dict: {page_count, is_encrypted}
+            dict: {page_count, is_encrypted, structure}
         """
-        import pikepdf
-        
-        initial_pos = file_obj.tell()
+        from apps.files.services.structure_index import StructureIndexService
         
         try:
-            with pikepdf.open(file_obj) as pdf:
-                page_count = len(pdf.pages)
-                is_encrypted = pdf.is_encrypted
-            
-            file_obj.seek(initial_pos)
-            return {'page_count': page_count, 'is_encrypted': is_encrypted}
-            
-        except pikepdf.PasswordError:
-            file_obj.seek(initial_pos)
-            return {'page_count': 0, 'is_encrypted': True}
-        except pikepdf.PdfError as e:
-            file_obj.seek(initial_pos)
+            structure = StructureIndexService.build(file_obj)
+        except Exception as e:
             raise ValidationError(
                 message=f"Invalid PDF file: {e}",
                 code='pdf_validation_failed'
             )
+        
+        return {
+            'page_count': structure['page_count'],
+            'is_encrypted': structure['is_encrypted'],
+            'structure': structure,
+        }
     
     @staticmethod
     def calculate_checksum(file_obj) -> str:
@@ -123,7 +117,7 @@ class UploadService:
         1. Validate MIME type
         2. Validate file size
         3. Calculate checksum
-        4. Extract metadata (for PDFs)
+        4. Build the structural index (for PDFs)
         5. Upload to storage
         6. Create FileAsset record
         
@@ -145,10 +139,12 @@ class UploadService:
         # Step 4: PDF metadata
         page_count = None
         is_encrypted = False
+        metadata = {}
         if mime_type == 'application/pdf':
             pdf_info = cls.validate_pdf_integrity(file_obj)
             page_count = pdf_info['page_count']
             is_encrypted = pdf_info['is_encrypted']
+            metadata['structure'] = pdf_info['structure']
         
         # Create FileAsset
         file_asset = FileAsset.objects.create(
@@ -160,6 +156,7 @@ class UploadService:
             md5_hash=checksum,
             page_count=page_count,
             is_encrypted=is_encrypted,
+            metadata=metadata,
             status=FileAsset.Status.UPLOADING,
             expires_at=timezone.now() + timedelta(hours=expires_hours) if expires_hours else None,
         )
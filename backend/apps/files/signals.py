@@ -0,0 +1,61 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from apps.files.models.user_file import UserFile
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=UserFile)
+def sync_search_index(sender, instance, **kwargs):
+    """
+    Queue newly AVAILABLE PDFs for full-text indexing and drop the postings
+    and cached text extractions of files that left the library. Hard deletes
+    cascade to the postings.
+    """
+    from apps.files.services.search_index import SearchIndexService, STATE_KEY
+    from apps.files.services.text_cache import TextCacheService
+    from apps.tools.render_service import record_key
+
+    try:
+        if instance.status in (UserFile.Status.DELETED, UserFile.Status.EXPIRED):
+            SearchIndexService.remove_file(instance)
+            TextCacheService.invalidate(record_key(instance))
+        elif (
+            instance.status == UserFile.Status.AVAILABLE
+            and instance.mime_type == 'application/pdf'
+            and STATE_KEY not in (instance.metadata or {})
+        ):
+            SearchIndexService.request_indexing()
+    except Exception as e:
+        # Indexing is best-effort; the periodic batch picks up anything missed
+        logger.warning(f"SearchIndex:SIGNAL_FAILED file={instance.id} error={e}")
+
+
+@receiver(post_init, sender=UserFile)
+def remember_storage_charge(sender, instance, **kwargs):
+    """Note what the file counts for in its owner's storage total as loaded."""
+    from apps.files.services.storage_counter import StorageCounter
+
+    instance._storage_charge = StorageCounter.charge_of(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=UserFile)
+def update_storage_counter(sender, instance, created, **kwargs):
+    """Charge the owner for a new file and for size, status or owner changes."""
+    from apps.files.services.storage_counter import StorageCounter
+
+    before = (instance.user_id, 0) if created else getattr(instance, '_storage_charge', None)
+    after = StorageCounter.charge_of(instance)
+    if before is None or after is None:
+        # Loaded with deferred fields; the nightly reconciliation covers it
+        return
+    StorageCounter.apply(before, after)
+    instance._storage_charge = after
+
+
+@receiver(post_delete, sender=UserFile)
+def release_storage_counter(sender, instance, **kwargs):
+    from apps.files.services.storage_counter import StorageCounter
+
+    StorageCounter.apply(getattr(instance, '_storage_charge', None), None)
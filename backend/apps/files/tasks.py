@@ -31,3 +31,35 @@ def delete_expired_files():
         logger.info(f"Cleaned up {deleted_count} expired Free user files.")
 
     return f"Cleanup complete. Deleted {deleted_count} files."
+
+
+@shared_task
+def index_pending_files():
+    """
+    Index one batch of files for full-text search.
+    Chains the next batch while files are still pending.
+    """
+    from apps.files.services.search_index import SearchIndexService
+
+    result = SearchIndexService.index_pending()
+
+    if not result['skipped'] and result['remaining'] and result['files']:
+        index_pending_files.apply_async(countdown=1)
+
+    return result
+
+
+@shared_task
+def evict_cold_tiles():
+    """Delete least recently used deep-zoom tiles over the storage budget."""
+    from apps.files.services.tile_service import TileService
+
+    return TileService.evict_cold()
+
+
+@shared_task
+def reconcile_storage_counters():
+    """Repair per-user storage counters that drifted from the file table."""
+    from apps.files.services.storage_counter import StorageCounter
+
+    return StorageCounter.reconcile()
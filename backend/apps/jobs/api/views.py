@@ -54,6 +54,23 @@ class JobViewSet(viewsets.ModelViewSet):
             
         return response
 
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Stream the job's output, honoring Range requests for progressive viewing."""
+        import os
+        from core.delivery import DeliveryService
+        from core.storage import StorageError
+        
+        job = self.get_object()
+        storage_path = (job.result or {}).get('storage_path')
+        if not storage_path:
+            return Response({'error': 'Job has no stored output'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            return DeliveryService.stream_response(request, storage_path, os.path.basename(storage_path))
+        except (StorageError, FileNotFoundError):
+            return Response({'error': 'Output not found in storage'}, status=status.HTTP_404_NOT_FOUND)
+
     
     @action(detail=False, methods=['post'])
     def batch(self, request):
@@ -35,6 +35,31 @@ class JobOrchestrator:
         
         return priority_map.get(tier, (0, 'default'))
     
+    @staticmethod
+    def check_tool_limits(file_asset, tool_type: str) -> None:
+        """
+        Check the file against the tool's type, size and page limits using the
+        structural index built at upload, so the PDF is not opened again.
+        
+        Raises:
+            ValidationError: If the tool cannot process this file
+        """
+        from apps.files.services.structure_index import StructureIndexService
+        from apps.tools.registry.tool_registry import get_tool
+        from common.exceptions import ValidationError
+        
+        tool = get_tool(tool_type)
+        if not tool:
+            return
+        
+        allowed, reason = tool.can_process(
+            file_asset.mime_type,
+            file_asset.size_bytes,
+            StructureIndexService.page_count(file_asset),
+        )
+        if not allowed:
+            raise ValidationError(message=reason, code='tool_limit_exceeded', details={'tool': tool_type})
+    
     @classmethod
     def create_job(cls, file_asset, tool_type: str, user, parameters: dict = None) -> 'Job':
         """
@@ -51,6 +76,7 @@ class JobOrchestrator:
         """
         from apps.jobs.models.job import Job
         
+        cls.check_tool_limits(file_asset, tool_type)
         priority, queue_name = cls.resolve_priority(user)
         
         job = Job.objects.create(
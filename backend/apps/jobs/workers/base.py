@@ -23,11 +23,19 @@ class BaseWorker(ABC):
     name: str = "base"
     timeout_seconds: int = 300
     
+    # Parameters and operations that address pages by number; pages dropped
+    # by the clean-up pre-step would shift them onto the wrong pages
+    page_parameters = ('pages', 'order', 'position')
+    page_addressed_operations = ()
+    
     def __init__(self, job_id: str):
         self.job_id = job_id
         self.job = None
         self.file_asset = None
         self._temp_files = []
+        self._input_path = None
+        self._input_key = None
+        self._structures = {}
     
     def load_job(self):
         """Load job and file asset from database."""
@@ -58,6 +66,10 @@ class BaseWorker(ABC):
             temp.write(f.read())
         temp.close()
         
+        from apps.tools.render_service import record_key
+        self._input_path = temp.name
+        self._input_key = record_key(self.file_asset)
+        
         return temp.name
     
     @abstractmethod
@@ -89,13 +101,17 @@ class BaseWorker(ABC):
         Upload output file to storage.
         
         Returns:
-            dict: {storage_path, url, hash, size}
+            dict: {storage_path, url, hash, size, linearized}
         """
         from apps.files.models.file_asset import FileVersion
+        from core.output_workflow import OutputService
         
         ext = os.path.splitext(output_path)[1] or '.pdf'
         storage_path = f"outputs/{self.file_asset.uuid}/v{self.file_asset.version + 1}{ext}"
         
+        # Large PDFs are linearized so the viewer can start from page 1
+        linearized = OutputService.linearize_output(output_path, self.job.parameters.get('linearize'))
+        
         output_hash = self.calculate_output_hash(output_path)
         output_size = os.path.getsize(output_path)
         
@@ -113,6 +129,7 @@ class BaseWorker(ABC):
         self.file_asset.version += 1
         self.file_asset.metadata['output_hash'] = output_hash
         self.file_asset.metadata['output_size'] = output_size
+        self.file_asset.metadata['output_linearized'] = linearized
         self.file_asset.save()
         
         return {
@@ -120,6 +137,7 @@ class BaseWorker(ABC):
             'url': StorageService.generate_signed_url(storage_path),
             'hash': output_hash,
             'size': output_size,
+            'linearized': linearized,
         }
     
     def cleanup(self):
@@ -131,6 +149,144 @@ class BaseWorker(ABC):
             except Exception as e:
                 logger.warning(f"Failed to cleanup temp file {path}: {e}")
 
+    def is_stored_input(self, input_path: str) -> bool:
+        """Whether input_path is the stored file as fetched, not a rewrite of it."""
+        return input_path == self._input_path
+    
+    def input_key(self, input_path: str) -> str:
+        """
+        Cache key of the input: the stored file's key, or the content hash of
+        an input rewritten by a pre-step, so the two never share cache entries.
+        """
+        if self.is_stored_input(input_path) and self._input_key:
+            return self._input_key
+        return self.calculate_output_hash(input_path)
+    
+    def get_structure(self, input_path: str) -> dict:
+        """
+        Structural index of the input, read from the file's metadata.
+        Files uploaded before indexing existed are indexed once here. An
+        input rewritten by a pre-step gets a transient index of its own.
+        """
+        from apps.files.services.structure_index import StructureIndexService
+        
+        if self.is_stored_input(input_path):
+            return StructureIndexService.ensure(self.file_asset, input_path)
+        if input_path not in self._structures:
+            self._structures[input_path] = StructureIndexService.build(input_path)
+        return self._structures[input_path]
+    
+    def page_count(self, input_path: str) -> int:
+        """Page count of the input without re-parsing it."""
+        return self.get_structure(input_path)['page_count']
+    
+    def resolve_page_window(self, input_path: str):
+        """
+        Decide whether this job should stream its input a window of pages at a time.
+        
+        Returns:
+            int or None: Window size when the tool opted in and the PDF is large enough
+        """
+        from apps.tools.registry.tool_registry import get_tool
+        from apps.tools.windowed import should_window
+        
+        tool = get_tool(self.job.tool_type) if self.job else None
+        if not tool or not tool.page_windowed:
+            return None
+        
+        page_count = self.page_count(input_path)
+        if not should_window(tool, page_count):
+            return None
+        
+        logger.info(f"Worker:PAGE_WINDOW job={self.job_id} pages={page_count} window={tool.page_window_size}")
+        return tool.page_window_size
+    
+    def uses_page_numbers(self, parameters: dict) -> bool:
+        """Whether the job refers to pages of its input by number."""
+        return (
+            any(key in parameters for key in self.page_parameters)
+            or parameters.get('operation') in self.page_addressed_operations
+        )
+    
+    def remove_redundant_pages(self, input_path: str) -> tuple:
+        """
+        Optional pre-step: drop blank and identical duplicate pages before the
+        tool runs, so heavy tools process fewer pages. Enabled per job with the
+        remove_blank_pages and remove_duplicate_pages parameters. Near-duplicates
+        that are not identical are only reported, and jobs that address pages
+        by number are left untouched.
+        
+        Returns:
+            tuple: (path to process, {blank_pages, duplicate_pages} or None)
+        """
+        from apps.tools.page_analysis import analyze_pages, remove_pages
+        from apps.tools.registry.tool_registry import get_tool
+        from core.scale_control import WorkerConfig
+        
+        parameters = self.job.parameters or {}
+        remove_blank = parameters.get('remove_blank_pages', False)
+        remove_duplicates = parameters.get('remove_duplicate_pages', False)
+        if not (remove_blank or remove_duplicates):
+            return input_path, None
+        
+        tool = get_tool(self.job.tool_type)
+        if not (tool.requires_pdf_input if tool else input_path.lower().endswith('.pdf')):
+            return input_path, None
+        
+        if self.uses_page_numbers(parameters):
+            logger.warning(f"Worker:PAGE_CLEANUP_SKIPPED job={self.job_id} reason=page_parameters")
+            return input_path, {'blank_pages': [], 'duplicate_pages': [], 'skipped': 'page_parameters'}
+        
+        analysis = self.run_tool(
+            analyze_pages, input_path,
+            max_workers=WorkerConfig.get_process_pool_size('PAGE_ANALYSIS'),
+        )
+        blank_pages = analysis['blank_pages'] if remove_blank else []
+        duplicate_pages = [d['page'] for d in analysis['duplicates'] if d['identical']] if remove_duplicates else []
+        drop = sorted(set(blank_pages + duplicate_pages))
+        
+        summary = {'blank_pages': blank_pages, 'duplicate_pages': duplicate_pages}
+        if not drop or len(drop) == analysis['page_count']:
+            return input_path, summary
+        
+        cleaned_path = input_path + '.cleaned.pdf'
+        self._temp_files.append(cleaned_path)
+        self.run_tool(remove_pages, input_path, cleaned_path, drop)
+        
+        logger.info(
+            f"Worker:PAGES_REMOVED job={self.job_id} blank={len(blank_pages)} "
+            f"duplicates={len(duplicate_pages)} remaining={analysis['page_count'] - len(drop)}"
+        )
+        return cleaned_path, summary
+    
+    def page_texts(self, input_path: str, mode: str = 'text') -> list:
+        """
+        Per-page extraction of the input through the shared text cache.
+        An input rewritten by a pre-step is keyed by its own content hash.
+        """
+        from apps.files.services.text_cache import TextCacheService
+        
+        return TextCacheService.get_pages(self.input_key(input_path), mode, input_path)
+    
+    def report_progress(self, percent: int, message: str = '', level: str = 'INFO'):
+        """Record progress for the job as a JobLog entry."""
+        from apps.jobs.models.job import JobLog
+        
+        if self.job:
+            JobLog.objects.create(
+                job=self.job,
+                level=level,
+                message=message,
+                metadata={'progress_percent': min(percent, 100)},
+            )
+    
+    def run_tool(self, func, *args, **kwargs) -> dict:
+        """Run a pure tool function, raising on failure like the inline paths do."""
+        result = func(*args, **kwargs)
+        if not result.get('success'):
+            raise FileProcessingError(result.get('message', 'Processing failed'))
+        return result
+
     def create_watermark(self, text):
         """Create a temporary PDF with the watermark text."""
         packet = io.BytesIO()
@@ -196,9 +352,10 @@ class BaseWorker(ABC):
         
         try:
             input_path = self.fetch_input_file()
+            input_path, page_cleanup = self.remove_redundant_pages(input_path)
             output_path = input_path + '.output'
             
-            self.transform(input_path, output_path, self.job.parameters)
+            transform_result = self.transform(input_path, output_path, self.job.parameters)
             
             # WATERMARK CHECK
             # If Free tier, apply watermark to the OUTPUT (if it's a PDF)
@@ -215,6 +372,10 @@ class BaseWorker(ABC):
                 raise FileProcessingError("Output validation failed")
             
             result = self.upload_output(output_path)
+            if transform_result:
+                result['transform'] = transform_result
+            if page_cleanup:
+                result['page_cleanup'] = page_cleanup
             
             transition(self.file_asset, 'AVAILABLE')
             self.job.mark_completed(result)
@@ -252,51 +413,79 @@ class ConversionWorker(BaseWorker):
     def transform(self, input_path: str, output_path: str, parameters: dict) -> None:
         """Execute file format conversion."""
         conversion_type = parameters.get('type', 'pdf')
+        window = self.resolve_page_window(input_path) if conversion_type in ('jpg', 'png', 'image') else None
         
         if conversion_type in ('word', 'docx'):
-            # PDF to Word using pdf2docx
-            from pdf2docx import Converter
-            cv = Converter(input_path)
-            # Use start=0 to include content from the very top of the page
-            # and min_section_height=0 to capture all content including headers
-            cv.convert(output_path, start=0, min_section_height=0)
-            cv.close()
+            # PDF to Word using pdf2docx, page chunks parsed in parallel
+            from apps.tools.converters.pdf_to_word import convert
+            from core.scale_control import WorkerConfig
+            
+            def on_progress(done, total):
+                self.report_progress(int(done * 100 / total), f"Converted {done}/{total} pages")
+            
+            result = self.run_tool(
+                convert, input_path, output_path,
+                max_workers=WorkerConfig.get_process_pool_size('PDF_TO_WORD'),
+                on_progress=on_progress,
+            )
+            if result['skipped_pages']:
+                self.report_progress(100, f"Skipped pages: {result['skipped_pages']}", level='WARNING')
             
         elif conversion_type in ('excel', 'xlsx'):
-            # PDF to Excel - extract tables
-            import tabula
+            # PDF to Excel - tables from the worker's warm tabula process,
+            # or pdfplumber through the text cache when Java is absent
             import pandas as pd
-            dfs = tabula.read_pdf(input_path, pages='all', multiple_tables=True)
+            from apps.tools.converters.tabula_service import extract_tables
+            
+            result = self.run_tool(
+                extract_tables, input_path,
+                fallback=lambda: self.page_texts(input_path, 'tables'),
+            )
+            frames = []
+            for table in result['tables']:
+                if len(table) > 1:
+                    headers = [str(h) if h else f"Col_{k}" for k, h in enumerate(table[0])]
+                    frames.append(pd.DataFrame(table[1:], columns=headers))
+                else:
+                    frames.append(pd.DataFrame(table))
+            if not frames:
+                frames.append(pd.DataFrame([["No tables detected"]], columns=["Message"]))
             with pd.ExcelWriter(output_path) as writer:
-                for i, df in enumerate(dfs):
+                for i, df in enumerate(frames):
                     df.to_excel(writer, sheet_name=f'Table_{i+1}', index=False)
                     
+        elif conversion_type in ('jpg', 'png', 'image') and window:
+            # Very large PDF to images - stream every page into a zip
+            from apps.tools.windowed import rasterize_pages
+            self.run_tool(
+                rasterize_pages, input_path, output_path,
+                dpi=150, fmt=conversion_type, window_size=window,
+            )
+            
         elif conversion_type in ('jpg', 'png', 'image'):
-            # PDF to images
-            import fitz
-            doc = fitz.open(input_path)
-            for i, page in enumerate(doc):
-                pix = page.get_pixmap(dpi=150)
-                img_path = output_path.replace('.output', f'_page_{i+1}.{conversion_type}')
-                pix.save(img_path)
-            doc.close()
-            # For single output, create first page
-            if doc.page_count > 0:
-                doc = fitz.open(input_path)
-                pix = doc[0].get_pixmap(dpi=150)
-                pix.save(output_path)
-                doc.close()
+            # PDF to images, rendered once through the shared document cache
+            # into the same zip layout as the windowed path
+            import zipfile
+            from apps.tools.render_service import render_pages
+            
+            def load():
+                with open(input_path, 'rb') as f:
+                    return f.read()
+            
+            fmt = 'png' if conversion_type == 'png' else 'jpeg'
+            ext = 'png' if conversion_type == 'png' else 'jpg'
+            rendered = render_pages(self.input_key(input_path), load, dpi=150, fmt=fmt)
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED) as zf:
+                for image in rendered['pages']:
+                    zf.writestr(f"page_{image['page'] + 1}.{ext}", image['data'])
                 
         elif conversion_type == 'html':
-            # PDF to HTML
-            import fitz
-            doc = fitz.open(input_path)
-            html_content = []
-            for page in doc:
-                html_content.append(page.get_text('html'))
-            doc.close()
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(html_content))
+            # PDF to HTML, written to disk page by page
+            from apps.tools.converters.pdf_to_html import convert
+            self.run_tool(
+                convert, input_path, output_path,
+                external_images=parameters.get('external_images', False),
+            )
                 
         elif conversion_type == 'pdfa':
             # PDF to PDF/A for archiving
@@ -358,62 +547,58 @@ class EditingWorker(BaseWorker):
     """Worker for file editing (merge, split, rotate, etc)."""
     name = "editing"
     
+    # Page-local operations that can run through the page-window pipeline
+    page_operations = ('rotate', 'watermark', 'page_numbers', 'flatten')
+    # Split defaults to page 1 even without a pages parameter
+    page_addressed_operations = ('split', 'rotate', 'delete', 'reorder')
+    
     def transform(self, input_path: str, output_path: str, parameters: dict) -> None:
         """Execute PDF editing operations."""
         operation = parameters.get('operation', 'copy')
+        window = self.resolve_page_window(input_path) if operation in self.page_operations else None
         
         import fitz
+        from apps.tools import backends
         
         if operation == 'merge':
             # Merge multiple PDFs
-            writer = fitz.open()
-            files = parameters.get('files', [input_path])
-            for f in files:
-                doc = fitz.open(f)
-                writer.insert_pdf(doc)
-                doc.close()
-            writer.save(output_path)
-            writer.close()
+            backends.merge(parameters.get('files', [input_path]), output_path)
             
         elif operation == 'split':
-            # Split PDF by pages
-            pages = parameters.get('pages', '1')  # e.g., "1,3-5,8"
-            doc = fitz.open(input_path)
-            writer = fitz.open()
-            
-            for range_str in pages.split(','):
-                range_str = range_str.strip()
-                if '-' in range_str:
-                    start, end = range_str.split('-')
-                    for p in range(int(start)-1, int(end)):
-                        if 0 <= p < len(doc):
-                            writer.insert_pdf(doc, from_page=p, to_page=p)
-                else:
-                    p = int(range_str) - 1
-                    if 0 <= p < len(doc):
-                        writer.insert_pdf(doc, from_page=p, to_page=p)
-            
-            writer.save(output_path)
-            writer.close()
-            doc.close()
+            # Extract pages into one PDF, e.g. "1,3-5,8"
+            from apps.tools.windowed import parse_page_spec
+            pages = parameters.get('pages', '1')
+            backends.split(input_path, [parse_page_spec(pages, backends.page_count(input_path))], [output_path])
+            
+        elif operation == 'rotate' and window:
+            # Rotate pages of a very large PDF window by window
+            from apps.tools.windowed import transform_pages
+            self.run_tool(
+                transform_pages, input_path, output_path, 'rotate',
+                window_size=window,
+                angle=parameters.get('angle', 90), pages=parameters.get('pages', 'all'),
+            )
             
         elif operation == 'rotate':
             # Rotate pages
             angle = parameters.get('angle', 90)
             pages = parameters.get('pages', 'all')
-            doc = fitz.open(input_path)
+            page_list = None
             
-            if pages == 'all':
-                page_list = range(len(doc))
-            else:
-                page_list = [int(p)-1 for p in pages.split(',')]
+            if pages != 'all':
+                page_count = self.page_count(input_path)
+                page_list = [p for p in (int(p) - 1 for p in pages.split(',')) if 0 <= p < page_count]
             
-            for p in page_list:
-                if 0 <= p < len(doc):
-                    doc[p].set_rotation(angle)
+            backends.rotate(input_path, output_path, angle, page_list)
             
-            doc.save(output_path)
-            doc.close()
+        elif operation in ('watermark', 'page_numbers', 'flatten'):
+            # Page-local stamping; small documents run as a single window
+            from apps.tools.windowed import transform_pages
+            page_parameters = {k: v for k, v in parameters.items() if k != 'operation'}
+            self.run_tool(
+                transform_pages, input_path, output_path, operation,
+                window_size=window or self.page_count(input_path), **page_parameters,
+            )
             
         elif operation == 'delete':
             # Delete specific pages
@@ -453,38 +638,34 @@ class EditingWorker(BaseWorker):
 class SecurityWorker(BaseWorker):
     """Worker for security operations (encrypt, decrypt, sign)."""
     name = "security"
+    page_addressed_operations = ('add_signature',)
     
     def transform(self, input_path: str, output_path: str, parameters: dict) -> None:
         """Execute PDF security operations."""
         operation = parameters.get('operation', 'encrypt')
         
         import fitz
+        from apps.tools import backends
         
         if operation == 'encrypt':
             password = parameters.get('password', '')
             owner_password = parameters.get('owner_password', password)
             permissions = parameters.get('permissions', fitz.PDF_PERM_PRINT | fitz.PDF_PERM_COPY)
             
-            doc = fitz.open(input_path)
-            doc.save(
-                output_path,
-                encryption=fitz.PDF_ENCRYPT_AES_256,
-                owner_pw=owner_password,
-                user_pw=password,
-                permissions=permissions
+            backends.encrypt(
+                input_path, output_path,
+                user_password=password,
+                owner_password=owner_password,
+                allow_printing=bool(permissions & fitz.PDF_PERM_PRINT),
+                allow_copying=bool(permissions & fitz.PDF_PERM_COPY),
             )
-            doc.close()
             
         elif operation == 'decrypt':
             password = parameters.get('password', '')
-            doc = fitz.open(input_path)
-            
-            if doc.is_encrypted:
-                if not doc.authenticate(password):
-                    raise FileProcessingError("Invalid password")
-            
-            doc.save(output_path)
-            doc.close()
+            try:
+                backends.decrypt(input_path, output_path, password)
+            except backends.PasswordError:
+                raise FileProcessingError("Invalid password")
             
         elif operation == 'add_signature':
             # Add visual signature/stamp
@@ -521,14 +702,22 @@ class AIWorker(BaseWorker):
     name = "ai"
     timeout_seconds = 600  # AI ops can take longer
     
-    def transform(self, input_path: str, output_path: str, parameters: dict) -> None:
+    def transform(self, input_path: str, output_path: str, parameters: dict) -> dict:
         """Execute AI-powered PDF operations."""
         operation = parameters.get('operation', 'ocr')
+        window = self.resolve_page_window(input_path) if operation == 'extract_images' else None
         
         if operation == 'ocr':
             language = parameters.get('language', 'eng')
             deskew = parameters.get('deskew', True)
             
+            # Every page already has a text layer - nothing to recognise
+            page_texts = self.page_texts(input_path)
+            if page_texts and all(text.strip() for text in page_texts):
+                import shutil
+                shutil.copy(input_path, output_path)
+                return {'ocr_skipped': True, 'reason': 'text_layer_present'}
+            
             import subprocess
             cmd = ['ocrmypdf', '--skip-text']
             
@@ -545,33 +734,25 @@ class AIWorker(BaseWorker):
                 raise FileProcessingError(f"OCR failed: {result.stderr}")
                 
         elif operation == 'extract_text':
-            # Extract text from PDF
-            import fitz
-            doc = fitz.open(input_path)
-            text = []
-            for page in doc:
-                text.append(page.get_text())
-            doc.close()
+            # Extract text from PDF, shared with the other text-consuming tools
+            text = self.page_texts(input_path)
             
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write('\n\n'.join(text))
                 
         elif operation == 'extract_images':
-            # Extract all images from PDF
-            import fitz
-            import zipfile
-            
-            doc = fitz.open(input_path)
-            with zipfile.ZipFile(output_path, 'w') as zf:
-                for page_num, page in enumerate(doc):
-                    images = page.get_images()
-                    for img_idx, img in enumerate(images):
-                        xref = img[0]
-                        base_image = doc.extract_image(xref)
-                        image_bytes = base_image["image"]
-                        image_ext = base_image["ext"]
-                        zf.writestr(f"page{page_num+1}_img{img_idx+1}.{image_ext}", image_bytes)
-            doc.close()
+            # Each unique image is extracted once, in parallel chunks; very
+            # large PDFs are scanned a window of pages at a time
+            from apps.tools.image_extraction import extract_images
+            from core.scale_control import WorkerConfig
+            self.run_tool(
+                extract_images, input_path, output_path,
+                pages=parameters.get('pages'),
+                fmt=parameters.get('image_format'),
+                max_size=parameters.get('max_size'),
+                max_workers=WorkerConfig.get_process_pool_size('EXTRACT_IMAGES'),
+                window_size=window,
+            )
             
         else:
             import shutil
@@ -582,39 +763,27 @@ class RepairWorker(BaseWorker):
     """Worker for file repair operations."""
     name = "repair"
     
-    def transform(self, input_path: str, output_path: str, parameters: dict) -> None:
-        """Execute PDF repair operations."""
-        repair_type = parameters.get('type', 'basic')
+    def transform(self, input_path: str, output_path: str, parameters: dict) -> dict:
+        """
+        Execute PDF repair.
         
-        if repair_type == 'ghostscript':
-            # Use Ghostscript to repair/rewrite PDF
-            import subprocess
-            result = subprocess.run([
-                'gs', '-o', output_path, '-sDEVICE=pdfwrite',
-                '-dPDFSETTINGS=/prepress',
-                input_path
-            ], capture_output=True, text=True, timeout=300)
-            
-            if result.returncode != 0:
-                raise FileProcessingError(f"Repair failed: {result.stderr}")
-                
-        elif repair_type == 'pikepdf':
-            # Use pikepdf to repair
-            import pikepdf
-            try:
-                pdf = pikepdf.open(input_path)
-                pdf.save(output_path)
-                pdf.close()
-            except pikepdf.PdfError as e:
-                # Try permissive open
-                pdf = pikepdf.open(input_path, allow_overwriting_input=True)
-                pdf.save(output_path)
-                pdf.close()
-                
-        else:
-            # Basic repair using PyMuPDF
-            import fitz
-            doc = fitz.open(input_path)
-            doc.save(output_path, garbage=4, deflate=True, clean=True)
-            doc.close()
-
+        'auto' (default) runs diagnostics and escalates pikepdf -> PyMuPDF ->
+        Ghostscript; 'pikepdf', 'basic'/'pymupdf' or 'ghostscript' force one tier.
+        """
+        from apps.tools.repair.repair import repair
+        
+        result = repair(
+            input_path, output_path,
+            mode=parameters.get('type', 'auto'),
+            budgets=parameters.get('budgets'),
+        )
+        
+        if not result.get('success'):
+            raise FileProcessingError(f"Repair failed: {result.get('message')}")
+        
+        return {
+            'repair_tier': result['tier'],
+            'attempts': result['attempts'],
+            'severity': result['diagnostics'].get('severity'),
+            'page_count': result['page_count'],
+        }
@@ -4,7 +4,8 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.utils import timezone
 
-from apps.subscriptions.models import Plan, Subscription
+from apps.subscriptions.models import Subscription
+from apps.subscriptions.services.catalog import catalog
 from apps.subscriptions.services.trial_service import TrialService
 from core.views import IsSuperAdmin
 
@@ -22,9 +23,8 @@ class StartTrialView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            plan = Plan.objects.get(slug=plan_slug, is_active=True)
-        except Plan.DoesNotExist:
+        plan = catalog().plan(plan_slug, active_only=True)
+        if plan is None:
             return Response(
                 {'error': 'Plan not found'},
                 status=status.HTTP_404_NOT_FOUND
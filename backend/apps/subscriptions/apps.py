@@ -6,3 +6,6 @@ class SubscriptionsConfig(AppConfig):
     name = 'apps.subscriptions'
     label = 'subscriptions'
     verbose_name = 'Subscriptions & Billing'
+
+    def ready(self):
+        import apps.subscriptions.signals
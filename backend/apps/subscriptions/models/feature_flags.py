@@ -164,11 +164,10 @@ class FeatureFlag(models.Model):
         Returns:
             True if feature is enabled
         """
-        try:
-            flag = cls.objects.get(code=code)
-            return flag.is_active_for_user(user)
-        except cls.DoesNotExist:
-            return False
+        from apps.subscriptions.services.catalog import catalog
+        
+        flag = catalog().flag(code)
+        return flag is not None and flag.is_active_for_user(user)
     
     @classmethod
     def get_all_for_user(cls, user) -> dict:
@@ -179,7 +178,9 @@ class FeatureFlag(models.Model):
         Returns:
             Dict of {code: is_enabled}
         """
-        flags = cls.objects.filter(is_enabled=True)
+        from apps.subscriptions.services.catalog import catalog
+        
+        flags = [flag for flag in catalog().flags.values() if flag.is_enabled]
         result = {}
         for flag in flags:
             result[flag.code] = flag.is_active_for_user(user)
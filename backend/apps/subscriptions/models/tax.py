@@ -67,26 +67,9 @@ class TaxRule(models.Model):
         Returns:
             TaxRule or None
         """
-        # Try region-specific first
-        if region:
-            tax = cls.objects.filter(
-                country_code=country_code.upper(),
-                region__iexact=region,
-                is_active=True,
-                applies_to_digital=True,
-            ).first()
-            if tax:
-                if is_business and not tax.applies_to_business:
-                    return None
-                return tax
+        from apps.subscriptions.services.catalog import catalog
         
-        # Fall back to country-level
-        return cls.objects.filter(
-            country_code=country_code.upper(),
-            region='',
-            is_active=True,
-            applies_to_digital=True,
-        ).first()
+        return catalog().tax_rule(country_code, region, is_business)
 
 
 class TaxExemption(models.Model):
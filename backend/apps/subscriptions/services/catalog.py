@@ -0,0 +1,217 @@
+"""
+Catalog Snapshot
+Features, feature flags, plans, plan entitlements, tax rules and per-user
+feature overrides, loaded into one read-only in-process snapshot.
+
+These tables change a few times a month but are read on every tool request,
+so hot-path lookups are served from memory with zero queries. The snapshot
+carries the catalog version stored in Redis. Saving or deleting a catalog
+row bumps the version and publishes it on a pub/sub channel after commit;
+a listener thread in every Gunicorn and Celery process marks the local
+snapshot stale, and the next lookup reloads it. A periodic version check
+covers messages missed while the listener was reconnecting, and without
+Redis the snapshot is reloaded at that interval instead.
+
+Objects in the snapshot are shared by every thread of the process: read
+them, never modify or save them.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+VERSION_KEY = 'catalog:version'
+CHANNEL = 'catalog:invalidate'
+VERIFY_INTERVAL = 30  # seconds between version checks against Redis
+LISTEN_RETRY = 5  # seconds between listener reconnects
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    loaded_at: float
+    features: MappingProxyType  # code -> Feature
+    flags: MappingProxyType  # code -> FeatureFlag
+    plans: MappingProxyType  # slug -> Plan
+    plan_features: MappingProxyType  # (plan_id, feature code) -> PlanFeature
+    overrides: MappingProxyType  # (user_id, feature_id) -> is_enabled
+    tax_rules: tuple  # active digital TaxRules in (country, region, id) order
+
+    def feature(self, code: str):
+        return self.features.get(code)
+
+    def flag(self, code: str):
+        return self.flags.get(code)
+
+    def plan(self, slug: str, active_only: bool = False):
+        plan = self.plans.get(slug)
+        if plan is not None and active_only and not plan.is_active:
+            return None
+        return plan
+
+    def plan_feature(self, plan_id: int, code: str):
+        return self.plan_features.get((plan_id, code))
+
+    def override(self, user_id, feature_id: int):
+        """True / False for an explicit per-user override, None without one."""
+        return self.overrides.get((user_id, feature_id))
+
+    def tax_rule(self, country_code: str, region: str = None, is_business: bool = False):
+        """Same selection as TaxRule.get_applicable_tax."""
+        country_code = country_code.upper()
+        if region:
+            region = region.lower()
+            for rule in self.tax_rules:
+                if rule.country_code == country_code and rule.region.lower() == region:
+                    if is_business and not rule.applies_to_business:
+                        return None
+                    return rule
+        for rule in self.tax_rules:
+            if rule.country_code == country_code and rule.region == '':
+                return rule
+        return None
+
+
+class Catalog:
+    """Process-wide snapshot with Redis-versioned invalidation."""
+
+    _snapshot = None
+    _stale = False
+    _checked_at = 0.0
+    _pid = None
+    _listener_pid = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _redis():
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+
+    @classmethod
+    def _remote_version(cls):
+        """Catalog version in Redis, or None when Redis is unreachable."""
+        try:
+            return int(cls._redis().get(VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning(f"Catalog:VERSION_UNAVAILABLE error={e}")
+            return None
+
+    @classmethod
+    def get(cls) -> CatalogSnapshot:
+        """The current snapshot, reloaded first when it is stale."""
+        snapshot = cls._snapshot
+        if snapshot is None or cls._stale or cls._pid != os.getpid():
+            return cls._reload(snapshot)
+
+        now = time.monotonic()
+        if now - cls._checked_at > VERIFY_INTERVAL:
+            cls._checked_at = now
+            version = cls._remote_version()
+            if version is None or version != snapshot.version:
+                return cls._reload(snapshot)
+        return snapshot
+
+    @classmethod
+    def _reload(cls, seen) -> CatalogSnapshot:
+        with cls._lock:
+            snapshot = cls._snapshot
+            if snapshot is not seen and snapshot is not None and not cls._stale and cls._pid == os.getpid():
+                # Another thread reloaded while this one waited
+                return snapshot
+
+            cls._ensure_listener()
+            # Read the version first: a change during the load then triggers another one
+            cls._stale = False
+            version = cls._remote_version()
+            snapshot = cls.load(version or 0)
+            cls._snapshot, cls._pid = snapshot, os.getpid()
+            cls._checked_at = time.monotonic()
+
+        logger.info(f"Catalog:LOADED version={snapshot.version} features={len(snapshot.features)} flags={len(snapshot.flags)}")
+        return snapshot
+
+    @staticmethod
+    def load(version: int = 0) -> CatalogSnapshot:
+        """Read the catalog tables into a new snapshot."""
+        from apps.subscriptions.models.feature_flags import FeatureFlag
+        from apps.subscriptions.models.subscription import Feature, Plan, PlanFeature, UserFeatureOverride
+        from apps.subscriptions.models.tax import TaxRule
+
+        plan_features = PlanFeature.objects.select_related('feature')
+        tax_rules = TaxRule.objects.filter(is_active=True, applies_to_digital=True).order_by('country_code', 'region', 'id')
+
+        return CatalogSnapshot(
+            version=version,
+            loaded_at=time.time(),
+            features=MappingProxyType({f.code: f for f in Feature.objects.all()}),
+            flags=MappingProxyType({f.code: f for f in FeatureFlag.objects.all()}),
+            plans=MappingProxyType({p.slug: p for p in Plan.objects.all()}),
+            plan_features=MappingProxyType({(pf.plan_id, pf.feature.code): pf for pf in plan_features}),
+            overrides=MappingProxyType({
+                (user_id, feature_id): is_enabled
+                for user_id, feature_id, is_enabled in UserFeatureOverride.objects.values_list('user_id', 'feature_id', 'is_enabled')
+            }),
+            tax_rules=tuple(tax_rules),
+        )
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Mark this process's snapshot stale now, and every other process's
+        once the surrounding transaction commits.
+        """
+        from django.db import transaction
+
+        cls._stale = True
+        transaction.on_commit(cls.publish)
+
+    @classmethod
+    def publish(cls):
+        try:
+            redis = cls._redis()
+            version = redis.incr(VERSION_KEY)
+            redis.publish(CHANNEL, version)
+        except Exception as e:
+            # Other processes catch up at their next version check
+            logger.warning(f"Catalog:PUBLISH_FAILED error={e}")
+            return
+        cls._stale = True
+        logger.info(f"Catalog:PUBLISHED version={version}")
+
+    @classmethod
+    def _ensure_listener(cls):
+        """One subscriber thread per process; a forked child starts its own."""
+        if cls._listener_pid == os.getpid():
+            return
+        cls._listener_pid = os.getpid()
+        threading.Thread(target=cls._listen, name='catalog-invalidation', daemon=True).start()
+
+    @classmethod
+    def _listen(cls):
+        pid = os.getpid()
+        connected_before = False
+        while cls._listener_pid == pid:
+            try:
+                pubsub = cls._redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                if connected_before:
+                    # Anything published while disconnected was missed
+                    cls._stale = True
+                connected_before = True
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        cls._stale = True
+            except Exception as e:
+                logger.debug(f"Catalog:LISTENER_RETRY error={e}")
+            time.sleep(LISTEN_RETRY)
+
+
+def catalog() -> CatalogSnapshot:
+    """Convenience function."""
+    return Catalog.get()
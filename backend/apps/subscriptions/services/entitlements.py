@@ -1,7 +1,5 @@
-from django.utils import timezone
-from apps.subscriptions.models.subscription import (
-    Feature, UserFeatureUsage, PlanFeature, UserFeatureOverride, RolePermission
-)
+from apps.subscriptions.models.subscription import RolePermission
+from apps.subscriptions.services.usage_meter import UsageMeter
 from apps.accounts.models.user import User
 
 class EntitlementService:
@@ -11,26 +9,21 @@ class EntitlementService:
         Determines the limit for a specific feature for a user.
         Returns: (limit, is_unlimited)
         """
+        from apps.subscriptions.services.catalog import catalog
+        
+        snapshot = catalog()
+        feature = snapshot.feature(feature_code)
+        
         # 1. User Override
-        try:
-            override = UserFeatureOverride.objects.get(user=user, feature__code=feature_code)
-            if not override.is_enabled:
-                return 0, False # Explicitly disabled
-            # If enabled via override, we might need a separate field for 'limit override',
-            # but for now assume override = unlimited or standard system default?
-            # The model UserFeatureOverride only has is_enabled. 
-            # Let's assume override grants standard access, but we check plan for limits?
-            # Or maybe override is just a bool toggle. 
-            # If strictly following requirements, Admins might adjust usage limits per user (Task 125).
-            # For now, let's look at Plan.
-        except UserFeatureOverride.DoesNotExist:
-            pass
+        if feature is not None and snapshot.override(user.id, feature.id) is False:
+            return 0, False # Explicitly disabled
+        # An enabling override grants standard access; limits still come from the plan
             
         # 2. Plan Entitlement
-        if hasattr(user, 'subscription') and user.subscription.plan:
-            try:
-                # Check PlanFeature
-                pf = user.subscription.plan.plan_features.get(feature__code=feature_code)
+        subscription = getattr(user, 'subscription', None)
+        if subscription is not None and subscription.plan_id:
+            pf = snapshot.plan_feature(subscription.plan_id, feature_code)
+            if pf is not None:
                 if not pf.is_enabled:
                     return 0, False
                 
@@ -39,16 +32,10 @@ class EntitlementService:
                     return -1, True # Unlimited
                 
                 return pf.daily_limit, False
-            except PlanFeature.DoesNotExist:
-                pass
         
         # 3. Default Free/Feature Limit
-        try:
-            feat = Feature.objects.get(code=feature_code)
-            if feat.free_limit > 0:
-                return feat.free_limit, False
-        except Feature.DoesNotExist:
-            pass
+        if feature is not None and feature.free_limit > 0:
+            return feature.free_limit, False
             
         return 0, False
 
@@ -69,18 +56,20 @@ class EntitlementService:
         if limit <= 0:
             return False
             
-        # Check usage today
-        today = timezone.now().date()
-        usage, created = UserFeatureUsage.objects.get_or_create(
-            user=user, 
-            feature__code=feature_code, 
-            date=today
-        )
+        # Usage today, from the same counter the tool endpoints increment
+        return EntitlementService.used_today(user, feature_code) < limit
+
+    @staticmethod
+    def used_today(user, feature_code):
+        """
+        Uses of the feature today, read from the usage meter.
+        """
+        from apps.subscriptions.services.catalog import catalog
         
-        if usage.count >= limit:
-            return False
-            
-        return True
+        feature = catalog().feature(feature_code)
+        if feature is None:
+            return 0
+        return UsageMeter.count('user', user.id, feature.id)
 
     @staticmethod
     def get_remaining_usage(user, feature_code):
@@ -99,17 +88,7 @@ class EntitlementService:
         if limit <= 0:
             return 0, False
             
-        today = timezone.now().date()
-        try:
-            usage = UserFeatureUsage.objects.get(
-                user=user, 
-                feature__code=feature_code, 
-                date=today
-            )
-            remaining = max(0, limit - usage.count)
-            return remaining, False
-        except UserFeatureUsage.DoesNotExist:
-            return limit, False
+        return max(0, limit - EntitlementService.used_today(user, feature_code)), False
 
     @staticmethod
     def record_usage(user, feature_code, count=1):
@@ -119,11 +98,10 @@ class EntitlementService:
         if user.is_super_admin:
             return
             
-        today = timezone.now().date()
-        usage, created = UserFeatureUsage.objects.get_or_create(
-            user=user, 
-            feature__code=feature_code, 
-            date=today
-        )
-        usage.count += count
-        usage.save()
+        from apps.subscriptions.services.catalog import catalog
+        
+        feature = catalog().feature(feature_code)
+        if feature is None:
+            return
+        # Recorded after the check has passed, so the meter does not apply the limit again
+        UsageMeter.check_and_increment('user', user.id, feature.id, 0, amount=count)
@@ -0,0 +1,218 @@
+"""
+Usage Meter
+Daily per-feature usage counters for users and guests, checked against the
+limit and incremented in one Redis round-trip.
+
+Each (identity, feature, day) counter is a Redis hash holding the running
+count and the part of it already written to UserFeatureUsage /
+GuestFeatureUsage. Counters touched since the last flush sit in a dirty set;
+flush() (a periodic Celery task) copies them to the usage tables in batches.
+
+A counter missing from Redis (first use of the day, or Redis lost its data)
+is seeded from the usage table before it is incremented, so a lost Redis
+forgets at most the uses since the last flush. When Redis is unreachable,
+the check falls back to a conditional UPDATE on the usage table.
+
+The tool endpoints and EntitlementService (used by the jobs API) both
+count and read uses through these counters, so there is one source of truth.
+"""
+from datetime import datetime, timedelta
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+DIRTY_KEY = 'usage:dirty'
+GRACE_SECONDS = 2 * 24 * 60 * 60  # counters outlive their day so late flushes still see them
+FLUSH_BATCH = 500
+
+# KEYS[1] counter hash, KEYS[2] dirty set
+# ARGV[1] limit (0 = unlimited), ARGV[2] ttl seconds, ARGV[3] seed count or '',
+# ARGV[4] uses to add
+# Returns {1, count} allowed, {0, count} over the limit, {-1, 0} seed needed
+CHECK_AND_INCR = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    if ARGV[3] == '' then
+        return {-1, 0}
+    end
+    redis.call('HSET', KEYS[1], 'count', ARGV[3], 'flushed', ARGV[3])
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local count = tonumber(redis.call('HGET', KEYS[1], 'count'))
+local limit = tonumber(ARGV[1])
+local amount = tonumber(ARGV[4])
+if limit > 0 and count + amount > limit then
+    return {0, count}
+end
+count = redis.call('HINCRBY', KEYS[1], 'count', amount)
+redis.call('SADD', KEYS[2], KEYS[1])
+return {1, count}
+"""
+
+# KEYS[1] counter hash; ARGV[1] count now stored in the usage table
+MARK_FLUSHED = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    local flushed = tonumber(redis.call('HGET', KEYS[1], 'flushed') or '0')
+    if tonumber(ARGV[1]) > flushed then
+        redis.call('HSET', KEYS[1], 'flushed', ARGV[1])
+    end
+end
+return 1
+"""
+
+
+class UsageMeter:
+    """Atomic daily usage limits for tool features."""
+
+    @staticmethod
+    def _redis():
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+
+    @staticmethod
+    def counter_key(kind: str, identity, feature_id: int, day) -> str:
+        # The identity goes last: IPv6 addresses contain colons
+        return f"usage:{kind}:{feature_id}:{day.isoformat()}:{identity}"
+
+    @staticmethod
+    def parse_key(key: str) -> tuple:
+        _, kind, feature_id, day, identity = key.split(':', 4)
+        return kind, identity, int(feature_id), datetime.strptime(day, '%Y-%m-%d').date()
+
+    @staticmethod
+    def _usage_rows(kind: str, identity, feature_id: int):
+        from apps.subscriptions.models.subscription import GuestFeatureUsage, UserFeatureUsage
+
+        if kind == 'guest':
+            return GuestFeatureUsage, {'ip_address': identity, 'feature_id': feature_id}
+        return UserFeatureUsage, {'user_id': identity, 'feature_id': feature_id}
+
+    @classmethod
+    def _stored_count(cls, kind: str, identity, feature_id: int, day) -> int:
+        model, lookup = cls._usage_rows(kind, identity, feature_id)
+        return model.objects.filter(date=day, **lookup).values_list('count', flat=True).first() or 0
+
+    @staticmethod
+    def _ttl() -> int:
+        """Seconds until the counter's day is over, plus the flush grace period."""
+        now = timezone.now()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return int((midnight - now).total_seconds()) + GRACE_SECONDS
+
+    @classmethod
+    def count(cls, kind: str, identity, feature_id: int) -> int:
+        """Uses of a feature today, without counting a new one."""
+        day = timezone.now().date()
+        try:
+            count = cls._redis().hget(cls.counter_key(kind, identity, feature_id, day), 'count')
+            if count is not None:
+                return int(count)
+        except Exception as e:
+            logger.warning(f"UsageMeter:REDIS_UNAVAILABLE error={e}")
+        return cls._stored_count(kind, identity, feature_id, day)
+
+    @classmethod
+    def check_and_increment(cls, kind: str, identity, feature_id: int, limit: int, amount: int = 1) -> tuple:
+        """
+        Count uses of a feature unless they would exceed the daily limit.
+
+        Args:
+            kind: 'user' or 'guest'
+            identity: User id or guest IP address
+            feature_id: Feature primary key
+            limit: Uses allowed per day, 0 for unlimited
+            amount: Uses to count at once
+
+        Returns:
+            tuple: (allowed, count) with count the uses today including these
+        """
+        day = timezone.now().date()
+        try:
+            redis = cls._redis()
+            script = redis.register_script(CHECK_AND_INCR)
+            key = cls.counter_key(kind, identity, feature_id, day)
+            args = [limit, cls._ttl(), '', amount]
+
+            allowed, count = script(keys=[key, DIRTY_KEY], args=args)
+            if allowed == -1:
+                args[2] = cls._stored_count(kind, identity, feature_id, day)
+                allowed, count = script(keys=[key, DIRTY_KEY], args=args)
+            return allowed == 1, count
+        except Exception as e:
+            logger.warning(f"UsageMeter:REDIS_UNAVAILABLE error={e}")
+            return cls._check_and_increment_db(kind, identity, feature_id, limit, amount, day)
+
+    @classmethod
+    def _check_and_increment_db(cls, kind: str, identity, feature_id: int, limit: int, amount: int, day) -> tuple:
+        """Fallback without Redis: a conditional UPDATE keeps bursts within the limit."""
+        model, lookup = cls._usage_rows(kind, identity, feature_id)
+        usage, _ = model.objects.get_or_create(date=day, **lookup)
+
+        rows = model.objects.filter(pk=usage.pk)
+        if limit > 0:
+            rows = rows.filter(count__lte=limit - amount)
+        allowed = rows.update(count=F('count') + amount) == 1
+
+        usage.refresh_from_db(fields=['count'])
+        return allowed, usage.count
+
+    @classmethod
+    def flush(cls) -> dict:
+        """
+        Write counters changed since the last flush to the usage tables.
+
+        Returns:
+            dict: {flushed, failed}
+        """
+        redis = cls._redis()
+        mark_flushed = redis.register_script(MARK_FLUSHED)
+        flushed = failed = 0
+
+        while True:
+            keys = [k.decode() if isinstance(k, bytes) else k for k in redis.spop(DIRTY_KEY, FLUSH_BATCH) or []]
+            if not keys:
+                break
+
+            pipe = redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.hmget(key, 'count', 'flushed')
+            counters = pipe.execute()
+
+            written = []
+            try:
+                with transaction.atomic():
+                    for key, (count, stored) in zip(keys, counters):
+                        # Expired since it was marked dirty: its day is long flushed
+                        if count is None or int(count) <= int(stored or 0):
+                            continue
+                        cls._write(key, int(count))
+                        written.append((key, int(count)))
+            except Exception as e:
+                logger.error(f"UsageMeter:FLUSH_FAILED keys={len(keys)} error={e}")
+                redis.sadd(DIRTY_KEY, *keys)
+                failed += len(keys)
+                break
+
+            for key, count in written:
+                mark_flushed(keys=[key], args=[count])
+            flushed += len(written)
+
+        if flushed or failed:
+            logger.info(f"UsageMeter:FLUSHED counters={flushed} failed={failed}")
+        return {'flushed': flushed, 'failed': failed}
+
+    @classmethod
+    def _write(cls, key: str, count: int):
+        kind, identity, feature_id, day = cls.parse_key(key)
+        model, lookup = cls._usage_rows(kind, identity, feature_id)
+
+        # Counts never go down: another path may have counted uses meanwhile
+        if not model.objects.filter(date=day, **lookup).update(count=Greatest(F('count'), count)):
+            # A raw save keeps the given date; date is auto_now_add and would
+            # stamp a counter flushed just after midnight with the new day
+            model(date=day, count=count, **lookup).save_base(raw=True, force_insert=True)
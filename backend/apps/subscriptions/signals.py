@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from apps.subscriptions.models.feature_flags import FeatureFlag
+from apps.subscriptions.models.subscription import Feature, Plan, PlanFeature, UserFeatureOverride
+from apps.subscriptions.models.tax import TaxRule
+
+CATALOG_MODELS = (Feature, FeatureFlag, Plan, PlanFeature, TaxRule, UserFeatureOverride)
+
+
+def invalidate_catalog(sender, **kwargs):
+    """Refresh the in-process catalog snapshots after a catalog row changes."""
+    from apps.subscriptions.services.catalog import Catalog
+
+    Catalog.invalidate()
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_save_{model.__name__}')
+    post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_delete_{model.__name__}')
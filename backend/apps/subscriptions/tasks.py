@@ -0,0 +1,12 @@
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_usage_counters():
+    """Copy Redis usage counters changed since the last run to the usage tables."""
+    from apps.subscriptions.services.usage_meter import UsageMeter
+
+    return UsageMeter.flush()
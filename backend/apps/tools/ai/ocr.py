@@ -38,9 +38,8 @@ def ocr(input_path: str, output_path: str, language: str = 'eng', deskew: bool =
         if result.returncode not in (0, 6):
             raise Exception(f"OCR error: {result.stderr}")
         
-        import pikepdf
-        with pikepdf.open(output_path) as pdf:
-            page_count = len(pdf.pages)
+        from apps.tools import backends
+        page_count = backends.page_count(output_path)
         
         logger.info(f"OCR complete: {page_count} pages")
         
@@ -20,6 +20,9 @@ from apps.tools.api.views import (
     MergePDFView,
     SplitPDFView,
     PDFPagePreviewsView,
+    PageThumbnailsView,
+    PageThumbnailSheetView,
+    PageAnalysisView,
     OfficeFilePreviewView,
     CompressPDFView,
     OrganizePDFView,
@@ -62,6 +65,9 @@ urlpatterns = [
     path('merge/', MergePDFView.as_view(), name='merge-pdf'),
     path('split/', SplitPDFView.as_view(), name='split-pdf'),
     path('page-previews/', PDFPagePreviewsView.as_view(), name='pdf-page-previews'),
+    path('page-thumbnails/', PageThumbnailsView.as_view(), name='page-thumbnails'),
+    path('page-thumbnails/<str:file_hash>/<int:height>/<int:sheet>/', PageThumbnailSheetView.as_view(), name='page-thumbnail-sheet'),
+    path('page-analysis/', PageAnalysisView.as_view(), name='page-analysis'),
     path('office-preview/', OfficeFilePreviewView.as_view(), name='office-file-preview'),
     path('compress-pdf/', CompressPDFView.as_view(), name='compress-pdf'),
     path('organize/', OrganizePDFView.as_view(), name='organize-pdf'),
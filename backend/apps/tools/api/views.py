@@ -164,20 +164,27 @@ class URLToPDFView(PDFToolAPIView):
         margins = request.data.get('margins', 'normal')
         print_background = request.data.get('printBackground', True)
         emulate_media = request.data.get('emulateMedia', 'screen')
+        wait_delay = request.data.get('waitDelay', '2s')
         
         # Convert boolean if string
         if isinstance(print_background, str):
             print_background = print_background.lower() == 'true'
         
         try:
-            from apps.tools.converters.gotenberg_converter import convert_url_to_pdf_gotenberg
-            result = convert_url_to_pdf_gotenberg(
-                url=url,
-                page_size=page_size,
-                orientation=orientation,
-                margins=margins,
-                print_background=print_background,
-                emulate_media=emulate_media
+            from apps.tools.converters.gotenberg_converter import clamp_wait_delay, convert_url_to_pdf_gotenberg
+            from apps.tools.services.url_render_cache import URLRenderCache
+            
+            options = {
+                'page_size': page_size,
+                'orientation': orientation,
+                'margins': margins,
+                'print_background': print_background,
+                'emulate_media': emulate_media,
+                'wait_delay': clamp_wait_delay(wait_delay),
+            }
+            # Popular public pages are rendered once and revalidated, not re-rendered
+            result, cache_status = URLRenderCache.render(
+                url, lambda: convert_url_to_pdf_gotenberg(url=url, **options), **options
             )
             
             # Generate filename from URL
@@ -187,6 +194,7 @@ class URLToPDFView(PDFToolAPIView):
             
             response = HttpResponse(result, content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+            response['X-Render-Cache'] = cache_status
             return response
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -229,18 +237,13 @@ class PDFToJPGView(PDFToolAPIView):
             return error
         
         try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(stream=file.read(), filetype="pdf")
+            from apps.tools.render_service import content_key, render_pages
+            data = file.read()
             
             # Convert first page to image
-            page = doc.load_page(0)
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
+            rendered = render_pages(content_key(data), lambda: data, [0], zoom=2, fmt='jpeg', quality=95)
             
-            output = io.BytesIO()
-            output.write(pix.tobytes("jpeg"))
-            output.seek(0)
-            
-            response = HttpResponse(output.read(), content_type='image/jpeg')
+            response = HttpResponse(rendered['pages'][0]['data'], content_type='image/jpeg')
             response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}.jpg"'
             return response
         except Exception as e:
@@ -258,39 +261,44 @@ class PDFToWordView(PDFToolAPIView):
         if error:
             return error
         
+        input_path = None
+        output_path = None
         try:
-            from pdf2docx import Converter
+            from apps.tools.converters.pdf_to_word import convert
+            from core.scale_control import WorkerConfig
             
             # Write to temp file
             with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
-                tmp_in.write(file.read())
+                for chunk in file.chunks():
+                    tmp_in.write(chunk)
                 input_path = tmp_in.name
             
             output_path = input_path.replace('.pdf', '.docx')
             
-            # Convert with proper margin settings to prevent header cutoff
-            cv = Converter(input_path)
-            # Use start=0 to include content from the very top of the page
-            # and min_section_height=0 to capture all content including headers
-            cv.convert(output_path, start=0, min_section_height=0)
-            cv.close()
+            result = convert(
+                input_path, output_path,
+                max_workers=WorkerConfig.get_process_pool_size('PDF_TO_WORD'),
+            )
+            if not result.get('success'):
+                return Response({'error': result.get('message', 'Conversion failed')}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
             # Read output
             with open(output_path, 'rb') as f:
                 output_content = f.read()
             
-            # Cleanup
-            os.unlink(input_path)
-            os.unlink(output_path)
-            
             response = HttpResponse(
                 output_content,
                 content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
             )
             response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}.docx"'
+            if result['skipped_pages']:
+                response['X-Skipped-Pages'] = ','.join(str(p) for p in result['skipped_pages'])
             return response
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            from core.utils import cleanup_files
+            cleanup_files([input_path, output_path])
 
 
 class PDFToExcelView(PDFToolAPIView):
@@ -308,12 +316,16 @@ class PDFToExcelView(PDFToolAPIView):
         output_format = request.data.get('output_format', 'xlsx').lower()
         
         try:
-            import pdfplumber
+            import hashlib
             import pandas as pd
+            from apps.files.services.text_cache import TextCacheService
             
-            # Write to temp file
+            # Write to temp file, hashing as we go
+            sha = hashlib.sha256()
             with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
-                tmp_in.write(file.read())
+                for chunk in file.chunks():
+                    sha.update(chunk)
+                    tmp_in.write(chunk)
                 input_path = tmp_in.name
             
             output_ext = '.csv' if output_format == 'csv' else '.xlsx'
@@ -321,23 +333,23 @@ class PDFToExcelView(PDFToolAPIView):
             
             all_tables = []
             
-            with pdfplumber.open(input_path) as pdf:
-                for i, page in enumerate(pdf.pages):
-                    tables = page.extract_tables()
-                    for j, table in enumerate(tables):
-                        if not table: continue
+            # pdfplumber tables per page, parsed once per document
+            page_tables = TextCacheService.get_pages(sha.hexdigest(), 'tables', input_path)
+            for i, tables in enumerate(page_tables):
+                for j, table in enumerate(tables):
+                    if not table: continue
+                    
+                    # Basic header detection: Use first row
+                    if len(table) > 1:
+                        # Clean headers to avoid duplicates or empty
+                        headers = table[0]
+                        # Ensure unique headers
+                        headers = [str(h) if h else f"Col_{k}" for k, h in enumerate(headers)]
+                        df = pd.DataFrame(table[1:], columns=headers)
+                    else:
+                        df = pd.DataFrame(table)
                         
-                        # Basic header detection: Use first row
-                        if len(table) > 1:
-                            # Clean headers to avoid duplicates or empty
-                            headers = table[0]
-                            # Ensure unique headers
-                            headers = [str(h) if h else f"Col_{k}" for k, h in enumerate(headers)]
-                            df = pd.DataFrame(table[1:], columns=headers)
-                        else:
-                            df = pd.DataFrame(table)
-                            
-                        all_tables.append((f"P{i+1}_T{j+1}", df))
+                    all_tables.append((f"P{i+1}_T{j+1}", df))
             
             if not all_tables:
                  # Create a dummy dataframe if no tables found
@@ -380,6 +392,17 @@ class PDFToPowerpointView(PDFToolAPIView):
     """Convert PDF to PowerPoint."""
     
     def post(self, request):
+        from apps.tools.converters.pdf_to_pptx import (
+            DEFAULT_DPI, DEFAULT_JPEG_QUALITY, clamp_dpi, clamp_quality, convert,
+        )
+        
+        # Rejected before the usage check so a bad request costs no quota
+        try:
+            quality = clamp_quality(request.data.get('quality', DEFAULT_JPEG_QUALITY))
+            dpi = clamp_dpi(request.data.get('dpi', DEFAULT_DPI))
+        except (TypeError, ValueError):
+            return Response({'error': 'quality and dpi must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        
         allowed, error = check_usage_limit(request, 'PDF_TO_PPT')
         if not allowed: return error
 
@@ -387,69 +410,41 @@ class PDFToPowerpointView(PDFToolAPIView):
         if error:
             return error
         
+        input_path = None
         try:
-            import fitz
-            from pptx import Presentation
-            from pptx.util import Inches
+            image_format = request.data.get('image_format', 'png')
+            editable_text = str(request.data.get('editable_text', 'false')).lower() == 'true'
             
             # Write to temp file
             with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
-                tmp_in.write(file.read())
+                for chunk in file.chunks():
+                    tmp_in.write(chunk)
                 input_path = tmp_in.name
             
-            output_path = input_path.replace('.pdf', '.pptx')
-            
-            # Open PDF
-            doc = fitz.open(input_path)
-            
-            # Create PowerPoint
-            prs = Presentation()
-            prs.slide_width = Inches(10)
-            prs.slide_height = Inches(7.5)
-            
-            for page in doc:
-                # Convert page to image
-                pix = page.get_pixmap(dpi=150)
-                img_path = f"{input_path}_page_{page.number}.png"
-                pix.save(img_path)
-                
-                # Add slide
-                slide_layout = prs.slide_layouts[6]  # Blank layout
-                slide = prs.slides.add_slide(slide_layout)
-                
-                # Add image to slide
-                left = Inches(0)
-                top = Inches(0)
-                slide.shapes.add_picture(img_path, left, top, width=prs.slide_width, height=prs.slide_height)
-                
-                # Cleanup temp image
-                os.unlink(img_path)
-            
-            doc.close()
-            
-            # Save PowerPoint
-            prs.save(output_path)
-            
-            # Read output
-            with open(output_path, 'rb') as f:
-                output_content = f.read()
-            
-            # Cleanup
-            os.unlink(input_path)
-            os.unlink(output_path)
+            output = io.BytesIO()
+            result = convert(
+                input_path, output,
+                dpi=dpi, image_format=image_format, jpeg_quality=quality,
+                editable_text=editable_text,
+            )
+            if not result.get('success'):
+                return Response({'error': result.get('message', 'Conversion failed')}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
             response = HttpResponse(
-                output_content,
+                output.getvalue(),
                 content_type='application/vnd.openxmlformats-officedocument.presentationml.presentation'
             )
             response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}.pptx"'
             return response
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            from core.utils import cleanup_files
+            cleanup_files([input_path])
 
 
 class PDFToHTMLView(PDFToolAPIView):
-    """Convert PDF to HTML."""
+    """Convert PDF to HTML, streamed page by page."""
     
     def post(self, request):
         allowed, error = check_usage_limit(request, 'PDF_TO_HTML')
@@ -459,27 +454,44 @@ class PDFToHTMLView(PDFToolAPIView):
         if error:
             return error
         
+        input_path = None
         try:
             import fitz
+            from django.http import StreamingHttpResponse
+            from apps.tools.converters.pdf_to_html import stream_html, stream_zip
+            from core.utils import CleanupIterator
             
-            doc = fitz.open(stream=file.read(), filetype="pdf")
-            
-            html_content = ['<!DOCTYPE html><html><head><meta charset="utf-8"><title>Converted PDF</title></head><body>']
+            external_images = str(request.data.get('external_images', 'false')).lower() == 'true'
+            base_name = file.name.rsplit(".", 1)[0]
             
-            for page in doc:
-                page_html = page.get_text('html')
-                html_content.append(f'<div class="page" style="page-break-after: always;">{page_html}</div>')
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
+                for chunk in file.chunks():
+                    tmp_in.write(chunk)
+                input_path = tmp_in.name
             
-            html_content.append('</body></html>')
-            doc.close()
+            # Fail fast while a proper error response is still possible
+            with fitz.open(input_path) as doc:
+                if doc.needs_pass:
+                    raise ValueError("PDF is password protected")
             
-            full_html = '\n'.join(html_content)
+            # Removed when the response is closed, whether or not the body was sent
+            if external_images:
+                body = CleanupIterator(stream_zip(input_path, title=base_name), [input_path])
+                response = StreamingHttpResponse(body, content_type='application/zip')
+                response['Content-Disposition'] = f'attachment; filename="{base_name}_html.zip"'
+            else:
+                body = CleanupIterator(stream_html(input_path, title=base_name), [input_path])
+                response = StreamingHttpResponse(body, content_type='text/html; charset=utf-8')
+                response['Content-Disposition'] = f'attachment; filename="{base_name}.html"'
             
-            response = HttpResponse(full_html, content_type='text/html')
-            response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}.html"'
+            # Cleanup now belongs to the response
+            input_path = None
             return response
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            from core.utils import cleanup_files
+            cleanup_files([input_path])
 
 
 class PDFToPDFAView(PDFToolAPIView):
@@ -557,11 +569,12 @@ def check_usage_limit(request, feature_code):
     Returns (allowed: bool, response: Response | None)
     """
     try:
-        from apps.subscriptions.models.subscription import Feature, UserFeatureUsage, UserFeatureOverride, GuestFeatureUsage
-        from django.utils import timezone
+        from apps.subscriptions.services.catalog import catalog
+        from apps.subscriptions.services.usage_meter import UsageMeter
         
-        # Get Feature
-        feature = Feature.objects.filter(code=feature_code).first()
+        # Get Feature and overrides from the in-process catalog snapshot
+        snapshot = catalog()
+        feature = snapshot.feature(feature_code)
         if not feature:
             return True, None # Feature not restricted or unknown
 
@@ -579,28 +592,24 @@ def check_usage_limit(request, feature_code):
             if not ip:
                  return False, Response({'error': 'Cannot identify client.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            today = timezone.now().date()
-            usage, created = GuestFeatureUsage.objects.get_or_create(ip_address=ip, feature=feature, date=today)
-            
             limit = feature.free_limit
+            allowed, _ = UsageMeter.check_and_increment('guest', ip, feature.id, limit)
             
-            if limit > 0 and usage.count >= limit:
+            if not allowed:
                  return False, Response(
                      {'error': f'Daily guest limit of {limit} reached. Please sign up for more.'}, 
                      status=status.HTTP_403_FORBIDDEN
                  )
             
-            usage.count += 1
-            usage.save()
             return True, None
 
         # 2. LOGGED-IN USER ACCESS
         user = request.user
         
         # Check Override
-        override = UserFeatureOverride.objects.filter(user=user, feature=feature).first()
-        if override:
-            if override.is_enabled:
+        override = snapshot.override(user.id, feature.id)
+        if override is not None:
+            if override:
                 return True, None
             else:
                 return False, Response({'error': 'Feature disabled for your account'}, status=status.HTTP_403_FORBIDDEN)
@@ -621,21 +630,15 @@ def check_usage_limit(request, feature_code):
                  status=status.HTTP_403_FORBIDDEN
              )
 
-        # Check Free User Limits
-        today = timezone.now().date()
-        usage, created = UserFeatureUsage.objects.get_or_create(user=user, feature=feature, date=today)
-        
+        # Check Free User Limits and count this use in one atomic step
         limit = feature.free_limit
-        if limit > 0:
-            if usage.count >= limit:
-                return False, Response(
-                    {'error': f'Daily limit of {limit} reached. Upgrade for unlimited access.'}, 
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        allowed, _ = UsageMeter.check_and_increment('user', user.id, feature.id, limit)
+        if not allowed:
+            return False, Response(
+                {'error': f'Daily limit of {limit} reached. Upgrade for unlimited access.'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
 
-        # Increment
-        usage.count += 1
-        usage.save()
         return True, None
         
     except Exception as e:
@@ -661,37 +664,21 @@ class MergePDFView(PDFToolAPIView):
             output_filename += '.pdf'
         
         try:
-            import fitz
+            from apps.tools import backends
             
             # Validate that all files are PDFs
             for file in files:
                 if not file.name.lower().endswith('.pdf'):
                     return Response({'error': f'File {file.name} is not a PDF'}, status=status.HTTP_400_BAD_REQUEST)
             
-            merged = fitz.open()
-            pdf_objects = []  # Keep track for proper cleanup
+            output = io.BytesIO()
+            backends.merge(files, output)
             
-            try:
-                for file in files:
-                    pdf = fitz.open(stream=file.read(), filetype="pdf")
-                    pdf_objects.append(pdf)
-                    merged.insert_pdf(pdf)
-                
-                output = io.BytesIO()
-                merged.save(output)
-                output.seek(0)
-                
-                response = HttpResponse(output.read(), content_type='application/pdf')
-                response['Content-Disposition'] = f'attachment; filename="{output_filename}"'
-                return response
-                
-            finally:
-                # Ensure all PDFs are closed
-                merged.close()
-                for pdf in pdf_objects:
-                    pdf.close()
+            response = HttpResponse(output.getvalue(), content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="{output_filename}"'
+            return response
                     
-        except fitz.FileDataError as e:
+        except backends.InvalidPDFError as e:
             return Response({'error': f'Invalid PDF file: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"PDF merge failed: {str(e)}", exc_info=True)
@@ -707,47 +694,35 @@ class SplitPDFView(PDFToolAPIView):
             return error
         
         try:
-            import fitz
+            from apps.tools import backends
             import json
             import zipfile
             
             selected_pages = json.loads(request.data.get('selectedPages', '[]'))
             split_mode = request.data.get('splitMode', 'extract')
             
-            doc = fitz.open(stream=file.read(), filetype="pdf")
+            page_count = backends.page_count(file)
             
             if split_mode == 'extract' and selected_pages:
                 # Extract selected pages
-                new_doc = fitz.open()
-                for page_num in selected_pages:
-                    if 0 <= page_num - 1 < len(doc):
-                        new_doc.insert_pdf(doc, from_page=page_num-1, to_page=page_num-1)
-                
+                pages = [page_num - 1 for page_num in selected_pages if 0 <= page_num - 1 < page_count]
                 output = io.BytesIO()
-                new_doc.save(output)
-                new_doc.close()
-                output.seek(0)
+                backends.split(file, [pages], [output])
                 
-                response = HttpResponse(output.read(), content_type='application/pdf')
+                response = HttpResponse(output.getvalue(), content_type='application/pdf')
                 response['Content-Disposition'] = 'attachment; filename="split.pdf"'
                 return response
             else:
                 # Split all pages into ZIP
+                page_buffers = [io.BytesIO() for _ in range(page_count)]
+                backends.split(file, [[i] for i in range(page_count)], page_buffers)
+                
                 zip_buffer = io.BytesIO()
                 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                    for i in range(len(doc)):
-                        page_doc = fitz.open()
-                        page_doc.insert_pdf(doc, from_page=i, to_page=i)
-                        page_buffer = io.BytesIO()
-                        page_doc.save(page_buffer)
-                        page_doc.close()
-                        page_buffer.seek(0)
-                        zip_file.writestr(f'page_{i+1}.pdf', page_buffer.read())
-                
-                doc.close()
-                zip_buffer.seek(0)
+                    for i, page_buffer in enumerate(page_buffers):
+                        zip_file.writestr(f'page_{i+1}.pdf', page_buffer.getvalue())
                 
-                response = HttpResponse(zip_buffer.read(), content_type='application/zip')
+                response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
                 response['Content-Disposition'] = 'attachment; filename="split_pages.zip"'
                 return response
         except Exception as e:
@@ -763,39 +738,177 @@ class PDFPagePreviewsView(PDFToolAPIView):
             return error
         
         try:
-            import fitz
             import base64
+            from apps.tools.render_service import content_key, render_pages
             
-            doc = fitz.open(stream=file.read(), filetype="pdf")
-            total_pages = len(doc)
+            data = file.read()
+            
+            # Render every page at higher quality for sharper previews,
+            # as lossless PNG
+            rendered = render_pages(content_key(data), lambda: data, zoom=2.0, fmt='png')
             
             previews = []
-            for page_num in range(total_pages):
-                page = doc.load_page(page_num)
-                
-                # Render page to image at higher quality for sharper previews
-                pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))  # 2.0x scaling for high quality
-                img_bytes = pix.tobytes("png")  # Use PNG for lossless quality
-
+            for page in rendered['pages']:
                 # Convert to base64
-                img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+                img_base64 = base64.b64encode(page['data']).decode('utf-8')
 
                 previews.append({
-                    'pageNumber': page_num + 1,
+                    'pageNumber': page['page'] + 1,
                     'image': f'data:image/png;base64,{img_base64}',
-                    'width': pix.width,
-                    'height': pix.height
+                    'width': page['width'],
+                    'height': page['height']
                 })
             
-            doc.close()
-            
             return Response({
                 'previews': previews,
-                'totalPages': total_pages
+                'totalPages': rendered['page_count']
+            })
+            
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PageThumbnailsView(PDFToolAPIView):
+    """
+    Thumbnails of every page packed into sprite sheets, for the organize,
+    split and merge screens. Sheets and their coordinate map are cached
+    by file hash and height; the sheets are fetched from
+    PageThumbnailSheetView.
+    """
+    
+    CACHE_TTL = 24 * 60 * 60
+    
+    def post(self, request):
+        file, error = self.get_file_from_request(request)
+        if error:
+            return error
+        
+        from apps.tools.sprites import DEFAULT_HEIGHT, build_sprite_sheets, clamp_height
+        
+        try:
+            height = clamp_height(request.data.get('height', DEFAULT_HEIGHT))
+        except (TypeError, ValueError):
+            return Response({'error': 'height must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        input_path = None
+        try:
+            import hashlib
+            from django.core.cache import cache
+            from django.urls import reverse
+            from apps.tools.render_service import preview_format
+            from core.scale_control import WorkerConfig
+            
+            # Write to temp file, hashing as we go
+            sha = hashlib.sha256()
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
+                for chunk in file.chunks():
+                    sha.update(chunk)
+                    tmp_in.write(chunk)
+                input_path = tmp_in.name
+            file_hash = sha.hexdigest()
+            
+            cache_key = f"sprites:{file_hash}:{height}"
+            sprite_map = cache.get(cache_key)
+            
+            if sprite_map is None:
+                result = build_sprite_sheets(
+                    input_path, height, fmt=preview_format(),
+                    max_workers=WorkerConfig.get_process_pool_size('PAGE_THUMBNAILS'),
+                )
+                if not result['success']:
+                    return Response({'error': result['message']}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                
+                sprite_map = {
+                    'totalPages': result['page_count'],
+                    'format': result['format'],
+                    'sheetCount': len(result['sheets']),
+                    'pages': result['pages'],
+                }
+                cache.set_many({
+                    **{f"{cache_key}:{n}": sheet for n, sheet in enumerate(result['sheets'])},
+                    cache_key: sprite_map,
+                }, timeout=self.CACHE_TTL)
+            
+            sheets = [
+                request.build_absolute_uri(reverse('page-thumbnail-sheet', args=[file_hash, height, n]))
+                for n in range(sprite_map['sheetCount'])
+            ]
+            
+            return Response({
+                'hash': file_hash,
+                'height': height,
+                'totalPages': sprite_map['totalPages'],
+                'format': sprite_map['format'],
+                'sheets': sheets,
+                'pages': sprite_map['pages'],
             })
             
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            from core.utils import cleanup_files
+            cleanup_files([input_path])
+
+
+class PageThumbnailSheetView(APIView):
+    """One cached sprite sheet from PageThumbnailsView."""
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request, file_hash, height, sheet):
+        from django.core.cache import cache
+        
+        cache_key = f"sprites:{file_hash}:{height}"
+        cached = cache.get_many([cache_key, f"{cache_key}:{sheet}"])
+        data = cached.get(f"{cache_key}:{sheet}")
+        if data is None:
+            return Response({'error': 'Sprite sheet expired, request thumbnails again'}, status=status.HTTP_404_NOT_FOUND)
+        
+        fmt = cached.get(cache_key, {}).get('format', 'webp')
+        response = HttpResponse(data, content_type='image/webp' if fmt == 'webp' else 'image/jpeg')
+        # Addressed by file content, so a sheet never changes
+        response['Cache-Control'] = 'private, max-age=86400, immutable'
+        return response
+
+
+class PageAnalysisView(PDFToolAPIView):
+    """
+    Blank and near-duplicate pages of an upload, so the client can offer to
+    drop them before running a tool (job parameters remove_blank_pages and
+    remove_duplicate_pages). Jobs only drop duplicates marked identical; the
+    others are candidates for the user to confirm.
+    """
+    
+    def post(self, request):
+        file, error = self.get_file_from_request(request)
+        if error:
+            return error
+        
+        input_path = None
+        try:
+            from apps.tools.page_analysis import analyze_pages
+            from core.scale_control import WorkerConfig
+            
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
+                for chunk in file.chunks():
+                    tmp_in.write(chunk)
+                input_path = tmp_in.name
+            
+            result = analyze_pages(input_path, max_workers=WorkerConfig.get_process_pool_size('PAGE_ANALYSIS'))
+            if not result['success']:
+                return Response({'error': result['message']}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            
+            return Response({
+                'totalPages': result['page_count'],
+                'blankPages': result['blank_pages'],
+                'duplicates': result['duplicates'],
+                'coverage': result['coverage'],
+            })
+            
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            from core.utils import cleanup_files
+            cleanup_files([input_path])
 
 
 class OfficeFilePreviewView(PDFToolAPIView):
@@ -807,9 +920,9 @@ class OfficeFilePreviewView(PDFToolAPIView):
             return error
         
         try:
-            import fitz
             import base64
             import traceback
+            from apps.tools.render_service import content_key, render_pages
             from apps.tools.converters.office_converter import convert_powerpoint_to_pdf, convert_excel_to_pdf
             from apps.tools.converters.word_to_pdf import convert_word_to_pdf
             
@@ -842,33 +955,26 @@ class OfficeFilePreviewView(PDFToolAPIView):
             else:
                 return Response({'error': 'Unsupported file type'}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Open the generated PDF and extract first page as image
-            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-            
-            if len(doc) == 0:
+            # Render the first page of the generated PDF at high quality
+            try:
+                rendered = render_pages(content_key(pdf_bytes), lambda: pdf_bytes, [0], zoom=2.0, fmt='png')
+            except IndexError:
                 return Response({'error': 'Generated PDF has no pages'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
-            logger.info(f"PDF opened successfully, pages: {len(doc)}")
+            logger.info(f"PDF opened successfully, pages: {rendered['page_count']}")
             
-            # Get first page
-            page = doc.load_page(0)
-            
-            # Render page to image at high quality
-            pix = page.get_pixmap(matrix=fitz.Matrix(2.0, 2.0))
-            img_bytes = pix.tobytes("png")
+            page = rendered['pages'][0]
             
             # Convert to base64
-            img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+            img_base64 = base64.b64encode(page['data']).decode('utf-8')
             
             preview_data = {
                 'preview': f'data:image/png;base64,{img_base64}',
-                'width': pix.width,
-                'height': pix.height,
-                'totalPages': len(doc)
+                'width': page['width'],
+                'height': page['height'],
+                'totalPages': rendered['page_count']
             }
             
-            doc.close()
-            
             logger.info("Preview generated successfully")
             return Response(preview_data)
             
@@ -908,30 +1014,31 @@ class OrganizePDFView(PDFToolAPIView):
             return error
         
         try:
-            import fitz
+            from apps.tools import backends
             import json
             
             pages_data = json.loads(request.data.get('pages', '[]'))
-            doc = fitz.open(stream=file.read(), filetype="pdf")
+            page_count = backends.page_count(file)
             
-            # Create new document with reorganized pages
-            new_doc = fitz.open()
+            # Reorder/delete in one pass, then rotate the pages that need it
+            order = []
+            rotations = {}
             for page_info in pages_data:
                 page_num = page_info.get('page', 1) - 1
-                rotation = page_info.get('rotation', 0)
-                
-                if 0 <= page_num < len(doc):
-                    new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-                    if rotation:
-                        new_doc[-1].set_rotation(rotation)
+                if 0 <= page_num < page_count:
+                    if page_info.get('rotation', 0):
+                        rotations.setdefault(page_info['rotation'], []).append(len(order))
+                    order.append(page_num)
             
             output = io.BytesIO()
-            new_doc.save(output)
-            new_doc.close()
-            doc.close()
-            output.seek(0)
+            backends.split(file, [order], [output])
             
-            response = HttpResponse(output.read(), content_type='application/pdf')
+            for rotation, pages in rotations.items():
+                rotated = io.BytesIO()
+                backends.rotate(output, rotated, rotation, pages)
+                output = rotated
+            
+            response = HttpResponse(output.getvalue(), content_type='application/pdf')
             response['Content-Disposition'] = 'attachment; filename="organized.pdf"'
             return response
         except Exception as e:
@@ -946,26 +1053,47 @@ class FlattenPDFView(PDFToolAPIView):
         if error:
             return error
         
+        input_path = None
+        output_path = None
         try:
             import fitz
+            from apps.tools.registry.tool_registry import get_tool
+            from apps.tools.windowed import count_pages, should_window, transform_pages
             
-            doc = fitz.open(stream=file.read(), filetype="pdf")
-            
-            for page in doc:
-                # Flatten annotations
-                for annot in page.annots():
-                    annot.update()
-            
-            output = io.BytesIO()
-            doc.save(output, deflate=True)
-            doc.close()
-            output.seek(0)
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
+                for chunk in file.chunks():
+                    tmp_in.write(chunk)
+                input_path = tmp_in.name
+            output_path = input_path.replace('.pdf', '_flattened.pdf')
+            
+            tool = get_tool('FLATTEN_PDF')
+            if should_window(tool, count_pages(input_path)):
+                # Very large PDF - flatten a window of pages at a time
+                result = transform_pages(input_path, output_path, 'flatten', window_size=tool.page_window_size)
+                if not result.get('success'):
+                    return Response({'error': result.get('message', 'Flatten failed')}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            else:
+                doc = fitz.open(input_path)
+                for page in doc:
+                    # Flatten annotations
+                    for annot in page.annots():
+                        annot.update()
+                doc.save(output_path, deflate=True)
+                doc.close()
             
-            response = HttpResponse(output.read(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}_flattened.pdf"'
+            # Stream from disk; the open handle outlives the unlink in finally
+            response = FileResponse(
+                open(output_path, 'rb'),
+                content_type='application/pdf',
+                as_attachment=True,
+                filename=f'{file.name.rsplit(".", 1)[0]}_flattened.pdf',
+            )
             return response
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            from core.utils import cleanup_files
+            cleanup_files([input_path, output_path])
 
 
 class CompressImageView(PDFToolAPIView):
@@ -1015,10 +1143,14 @@ class ProtectPDFView(PDFToolAPIView):
             return Response({'error': 'Password required'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            from apps.tools.security.protect import protect_pdf
-            result = protect_pdf(file, password)
+            from apps.tools.security.protect import protect
             
-            response = HttpResponse(result, content_type='application/pdf')
+            output = io.BytesIO()
+            result = protect(file, output, password)
+            if not result['success']:
+                return Response({'error': result['message']}, status=status.HTTP_400_BAD_REQUEST)
+            
+            response = HttpResponse(output.getvalue(), content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}_protected.pdf"'
             return response
         except Exception as e:
@@ -1038,20 +1170,15 @@ class UnlockPDFView(PDFToolAPIView):
             return Response({'error': 'Password required'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            import fitz
-            
-            doc = fitz.open(stream=file.read(), filetype="pdf")
-            
-            if doc.is_encrypted:
-                if not doc.authenticate(password):
-                    return Response({'error': 'Invalid password'}, status=status.HTTP_401_UNAUTHORIZED)
+            from apps.tools import backends
             
             output = io.BytesIO()
-            doc.save(output)
-            doc.close()
-            output.seek(0)
+            try:
+                backends.decrypt(file, output, password)
+            except backends.PasswordError:
+                return Response({'error': 'Invalid password'}, status=status.HTTP_401_UNAUTHORIZED)
             
-            response = HttpResponse(output.read(), content_type='application/pdf')
+            response = HttpResponse(output.getvalue(), content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}_unlocked.pdf"'
             return response
         except Exception as e:
@@ -1226,48 +1353,87 @@ class RedactPDFView(PDFToolAPIView):
         if error:
             return error
         
-        redactions = request.data.get('redactions', [])
+        import json
+        
+        def _list_param(name):
+            value = request.data.get(name, [])
+            if isinstance(value, str):
+                value = json.loads(value) if value else []
+            return value
+        
+        try:
+            redactions = _list_param('redactions')
+            terms = _list_param('terms')
+            regexes = _list_param('regexes')
+            pattern_sets = _list_param('pattern_sets')
+        except json.JSONDecodeError:
+            return Response({'error': 'Invalid redaction parameters'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if not redactions:
+        if not (redactions or terms or regexes or pattern_sets):
             return Response({'error': 'No redactions provided'}, status=status.HTTP_400_BAD_REQUEST)
         
+        # Legacy per-page entries: {'page', 'rect'} or {'page', 'text'}
+        areas = [r for r in redactions if 'rect' in r]
+        terms = list(terms) + [{'text': r['text'], 'page': r.get('page', 1)} for r in redactions if 'text' in r and 'rect' not in r]
+        
+        case_sensitive = str(request.data.get('case_sensitive', 'false')).lower() == 'true'
+        include_report = str(request.data.get('include_report', 'false')).lower() == 'true'
+        
+        input_path = None
+        output_path = None
         try:
-            import fitz
+            import hashlib
+            from apps.files.services.text_cache import TextCacheService
+            from apps.tools.security.redact import redact
             
-            doc = fitz.open(stream=file.read(), filetype="pdf")
+            # Write to temp file, hashing as we go
+            sha = hashlib.sha256()
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_in:
+                for chunk in file.chunks():
+                    sha.update(chunk)
+                    tmp_in.write(chunk)
+                input_path = tmp_in.name
+            output_path = input_path.replace('.pdf', '_redacted.pdf')
             
-            for redact in redactions:
-                page_num = redact.get('page', 1) - 1  # Convert to 0-indexed
-                
-                if page_num < 0 or page_num >= len(doc):
-                    continue
-                
-                page = doc[page_num]
-                
-                if 'rect' in redact:
-                    # Redact by coordinates
-                    rect = fitz.Rect(redact['rect'])
-                    page.add_redact_annot(rect, fill=(0, 0, 0))
-                
-                elif 'text' in redact:
-                    # Redact by finding text
-                    text_to_redact = redact['text']
-                    text_instances = page.search_for(text_to_redact)
-                    for inst in text_instances:
-                        page.add_redact_annot(inst, fill=(0, 0, 0))
-                
-                # Apply redactions to this page
-                page.apply_redactions()
+            page_words = None
+            if terms or regexes or pattern_sets:
+                # Repeat redactions of a document reuse its extracted word boxes
+                page_words = TextCacheService.get_pages(sha.hexdigest(), 'words', input_path)
             
-            output = io.BytesIO()
-            doc.save(output, garbage=4, deflate=True)  # Clean up and compress
-            doc.close()
-            output.seek(0)
+            result = redact(
+                input_path, output_path,
+                terms=terms, regexes=regexes, pattern_sets=pattern_sets,
+                areas=areas, case_sensitive=case_sensitive, page_words=page_words,
+            )
             
-            response = HttpResponse(output.read(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{file.name.rsplit(".", 1)[0]}_redacted.pdf"'
+            if not result.get('success'):
+                error_status = status.HTTP_400_BAD_REQUEST if result.get('code') == 'invalid_rules' else status.HTTP_500_INTERNAL_SERVER_ERROR
+                return Response({'error': result.get('message', 'Redaction failed')}, status=error_status)
+            
+            with open(output_path, 'rb') as f:
+                pdf_content = f.read()
+            
+            base_name = file.name.rsplit(".", 1)[0]
+            
+            if include_report:
+                import zipfile
+                report = {k: v for k, v in result.items() if k != 'success'}
+                zip_buffer = io.BytesIO()
+                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                    zip_file.writestr(f'{base_name}_redacted.pdf', pdf_content)
+                    zip_file.writestr('redaction_report.json', json.dumps(report, indent=2))
+                response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
+                response['Content-Disposition'] = f'attachment; filename="{base_name}_redacted.zip"'
+            else:
+                response = HttpResponse(pdf_content, content_type='application/pdf')
+                response['Content-Disposition'] = f'attachment; filename="{base_name}_redacted.pdf"'
+            
+            response['X-Redaction-Matches'] = str(result['total_matches'])
+            response['X-Redaction-Pages'] = str(result['pages_redacted'])
             return response
             
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+        finally:
+            from core.utils import cleanup_files
+            cleanup_files([input_path, output_path])
@@ -0,0 +1,115 @@
+"""
+PDF Backend Layer
+Pure transformation - no Django, no DB.
+
+Tool modules call these operations instead of importing a PDF library. Each
+operation runs on the backend recorded for it in selection.json, which
+scripts/benchmark_pdf_backends.py writes from timings on a reference corpus.
+PDF_BACKEND_OVERRIDES (e.g. "merge=pypdf,save=pikepdf") overrides the file.
+A backend whose library is missing falls back to the next in PREFERENCE.
+"""
+from functools import lru_cache
+import json
+import os
+import logging
+
+from apps.tools.backends.base import OPERATIONS, InvalidPDFError, PasswordError, PDFBackend
+from apps.tools.backends.pikepdf_backend import PikepdfBackend
+from apps.tools.backends.pymupdf_backend import PyMuPDFBackend
+from apps.tools.backends.pypdf_backend import PyPDFBackend
+
+logger = logging.getLogger(__name__)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (PyMuPDFBackend(), PikepdfBackend(), PyPDFBackend())
+}
+
+PREFERENCE = ('pymupdf', 'pikepdf', 'pypdf')
+
+# Used when selection.json does not name a backend for an operation
+DEFAULT_SELECTION = {
+    'page_count': 'pymupdf',
+    'merge': 'pikepdf',
+    'split': 'pikepdf',
+    'rotate': 'pikepdf',
+    'encrypt': 'pikepdf',
+    'decrypt': 'pikepdf',
+    'save': 'pikepdf',
+}
+
+SELECTION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'selection.json')
+OVERRIDES_ENV = 'PDF_BACKEND_OVERRIDES'
+
+
+def _load_selection() -> dict:
+    selection = dict(DEFAULT_SELECTION)
+
+    try:
+        with open(SELECTION_PATH) as f:
+            selection.update(json.load(f).get('selection', {}))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"PDFBackend:SELECTION_UNREADABLE path={SELECTION_PATH} error={e}")
+
+    for pair in filter(None, os.environ.get(OVERRIDES_ENV, '').split(',')):
+        operation, _, name = pair.partition('=')
+        selection[operation.strip()] = name.strip()
+
+    return selection
+
+
+@lru_cache(maxsize=None)
+def get_backend(operation: str) -> PDFBackend:
+    """Backend chosen for an operation, skipping any whose library is not installed."""
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown PDF operation '{operation}'")
+
+    chosen = _load_selection().get(operation)
+    for name in (chosen, *PREFERENCE):
+        backend = BACKENDS.get(name)
+        if backend and backend.available():
+            if name != chosen:
+                logger.warning(f"PDFBackend:FALLBACK operation={operation} wanted={chosen} using={name}")
+            return backend
+
+    raise RuntimeError(f"No PDF backend available for '{operation}'")
+
+
+def page_count(source, password: str = None) -> int:
+    return get_backend('page_count').page_count(source, password)
+
+
+def merge(sources: list, output) -> int:
+    return get_backend('merge').merge(sources, output)
+
+
+def split(source, page_groups: list, outputs: list) -> int:
+    return get_backend('split').split(source, page_groups, outputs)
+
+
+def rotate(source, output, angle: int, pages: list = None) -> int:
+    return get_backend('rotate').rotate(source, output, angle, pages)
+
+
+def encrypt(source, output, user_password: str, owner_password: str = None,
+            allow_printing: bool = True, allow_copying: bool = False):
+    return get_backend('encrypt').encrypt(
+        source, output, user_password, owner_password, allow_printing, allow_copying,
+    )
+
+
+def decrypt(source, output, password: str):
+    return get_backend('decrypt').decrypt(source, output, password)
+
+
+def save(source, output):
+    return get_backend('save').save(source, output)
+
+
+__all__ = [
+    'BACKENDS', 'OPERATIONS', 'InvalidPDFError', 'PasswordError', 'get_backend',
+    'page_count', 'merge', 'split', 'rotate', 'encrypt', 'decrypt', 'save',
+]
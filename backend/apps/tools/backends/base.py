@@ -0,0 +1,83 @@
+"""
+PDF Backend Interface
+Pure transformation - no Django, no DB.
+
+Every backend implements the same small set of document operations. Sources
+are a path or a readable, seekable file object, always read from the start.
+Outputs are a path or a writable file object. Page indexes are 0-based.
+"""
+from abc import ABC, abstractmethod
+import os
+
+
+OPERATIONS = ('page_count', 'merge', 'split', 'rotate', 'encrypt', 'decrypt', 'save')
+
+
+class PasswordError(Exception):
+    """The password does not open the document."""
+
+
+class InvalidPDFError(Exception):
+    """The data is not a PDF the backend can read."""
+
+
+def read_source(source) -> bytes:
+    """Read a whole file object, whatever its position, and leave the position unchanged."""
+    initial_pos = source.tell()
+    source.seek(0)
+    data = source.read()
+    source.seek(initial_pos)
+    return data
+
+
+def is_path(value) -> bool:
+    return isinstance(value, (str, os.PathLike))
+
+
+class PDFBackend(ABC):
+    """Base class for a PDF library adapter."""
+
+    name = 'base'
+    module = None  # importable module that must be present
+
+    @classmethod
+    def available(cls) -> bool:
+        import importlib.util
+
+        return importlib.util.find_spec(cls.module) is not None
+
+    @abstractmethod
+    def page_count(self, source, password: str = None) -> int:
+        """Open a document and read its page tree."""
+        pass
+
+    @abstractmethod
+    def merge(self, sources: list, output) -> int:
+        """Concatenate documents. Returns the merged page count."""
+        pass
+
+    @abstractmethod
+    def split(self, source, page_groups: list, outputs: list) -> int:
+        """Write each group of page indexes to the matching output. Returns files written."""
+        pass
+
+    @abstractmethod
+    def rotate(self, source, output, angle: int, pages: list = None) -> int:
+        """Set the rotation of the given pages (all when None). Returns pages rotated."""
+        pass
+
+    @abstractmethod
+    def encrypt(self, source, output, user_password: str, owner_password: str = None,
+                allow_printing: bool = True, allow_copying: bool = False):
+        """Save with AES-256 encryption."""
+        pass
+
+    @abstractmethod
+    def decrypt(self, source, output, password: str):
+        """Save without encryption. Raises PasswordError for a wrong password."""
+        pass
+
+    @abstractmethod
+    def save(self, source, output):
+        """Open and rewrite a document, compacting its structure."""
+        pass
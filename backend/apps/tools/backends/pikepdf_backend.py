@@ -0,0 +1,86 @@
+"""
+pikepdf Backend
+Pure transformation - no Django, no DB.
+"""
+from apps.tools.backends.base import InvalidPDFError, PDFBackend, PasswordError
+
+
+class PikepdfBackend(PDFBackend):
+    name = 'pikepdf'
+    module = 'pikepdf'
+
+    @staticmethod
+    def _open(source, password: str = None):
+        import pikepdf
+
+        try:
+            return pikepdf.open(source, password=password or '')
+        except pikepdf.PasswordError:
+            raise PasswordError("Incorrect password")
+        except pikepdf.PdfError as e:
+            raise InvalidPDFError(str(e))
+
+    def page_count(self, source, password: str = None) -> int:
+        with self._open(source, password) as pdf:
+            return len(pdf.pages)
+
+    def merge(self, sources: list, output) -> int:
+        import pikepdf
+
+        opened = []
+        try:
+            merged = pikepdf.Pdf.new()
+            for source in sources:
+                pdf = self._open(source)
+                opened.append(pdf)
+                merged.pages.extend(pdf.pages)
+            # Sources stay open until the merged file is written
+            merged.save(output)
+            return len(merged.pages)
+        finally:
+            for pdf in opened:
+                pdf.close()
+
+    def split(self, source, page_groups: list, outputs: list) -> int:
+        import pikepdf
+
+        with self._open(source) as pdf:
+            for pages, output in zip(page_groups, outputs):
+                part = pikepdf.Pdf.new()
+                part.pages.extend(pdf.pages[index] for index in pages)
+                part.save(output)
+        return len(outputs)
+
+    def rotate(self, source, output, angle: int, pages: list = None) -> int:
+        with self._open(source) as pdf:
+            targets = range(len(pdf.pages)) if pages is None else pages
+            for index in targets:
+                pdf.pages[index].rotate(int(angle) % 360, relative=False)
+            pdf.save(output)
+            return len(targets)
+
+    def encrypt(self, source, output, user_password: str, owner_password: str = None,
+                allow_printing: bool = True, allow_copying: bool = False):
+        import pikepdf
+
+        permissions = pikepdf.Permissions(
+            print_lowres=allow_printing,
+            print_highres=allow_printing,
+            extract=allow_copying,
+        )
+        with self._open(source) as pdf:
+            pdf.save(output, encryption=pikepdf.Encryption(
+                user=user_password,
+                owner=owner_password or user_password,
+                allow=permissions,
+            ))
+
+    def decrypt(self, source, output, password: str):
+        with self._open(source, password) as pdf:
+            pdf.save(output)
+
+    def save(self, source, output):
+        import pikepdf
+
+        with self._open(source) as pdf:
+            pdf.save(output, object_stream_mode=pikepdf.ObjectStreamMode.generate, compress_streams=True)
@@ -0,0 +1,85 @@
+"""
+PyMuPDF Backend
+Pure transformation - no Django, no DB.
+"""
+from apps.tools.backends.base import InvalidPDFError, PDFBackend, PasswordError, is_path, read_source
+
+
+class PyMuPDFBackend(PDFBackend):
+    name = 'pymupdf'
+    module = 'fitz'
+
+    @staticmethod
+    def _open(source, password: str = None):
+        import fitz
+
+        try:
+            doc = fitz.open(source) if is_path(source) else fitz.open(stream=read_source(source), filetype='pdf')
+        except (fitz.FileDataError, fitz.EmptyFileError) as e:
+            raise InvalidPDFError(str(e))
+        if doc.needs_pass and not doc.authenticate(password or ''):
+            doc.close()
+            raise PasswordError("Incorrect password")
+        return doc
+
+    def page_count(self, source, password: str = None) -> int:
+        with self._open(source, password) as doc:
+            return doc.page_count
+
+    def merge(self, sources: list, output) -> int:
+        import fitz
+
+        with fitz.open() as merged:
+            for source in sources:
+                with self._open(source) as doc:
+                    merged.insert_pdf(doc)
+            merged.save(output, garbage=1)
+            return merged.page_count
+
+    def split(self, source, page_groups: list, outputs: list) -> int:
+        import fitz
+
+        with self._open(source) as doc:
+            for pages, output in zip(page_groups, outputs):
+                with fitz.open() as part:
+                    for index in pages:
+                        part.insert_pdf(doc, from_page=index, to_page=index)
+                    part.save(output, garbage=1)
+        return len(outputs)
+
+    def rotate(self, source, output, angle: int, pages: list = None) -> int:
+        with self._open(source) as doc:
+            targets = range(doc.page_count) if pages is None else pages
+            for index in targets:
+                doc[index].set_rotation(int(angle) % 360)
+            doc.save(output, garbage=1)
+            return len(targets)
+
+    def encrypt(self, source, output, user_password: str, owner_password: str = None,
+                allow_printing: bool = True, allow_copying: bool = False):
+        import fitz
+
+        permissions = fitz.PDF_PERM_ACCESSIBILITY
+        if allow_printing:
+            permissions |= fitz.PDF_PERM_PRINT | fitz.PDF_PERM_PRINT_HQ
+        if allow_copying:
+            permissions |= fitz.PDF_PERM_COPY
+
+        with self._open(source) as doc:
+            doc.save(
+                output,
+                encryption=fitz.PDF_ENCRYPT_AES_256,
+                user_pw=user_password,
+                owner_pw=owner_password or user_password,
+                permissions=permissions,
+            )
+
+    def decrypt(self, source, output, password: str):
+        import fitz
+
+        with self._open(source, password) as doc:
+            doc.save(output, encryption=fitz.PDF_ENCRYPT_NONE)
+
+    def save(self, source, output):
+        with self._open(source) as doc:
+            doc.save(output, garbage=3, deflate=True)
@@ -0,0 +1,90 @@
+"""
+pypdf Backend
+Pure transformation - no Django, no DB.
+"""
+from apps.tools.backends.base import InvalidPDFError, PDFBackend, PasswordError
+
+
+class PyPDFBackend(PDFBackend):
+    name = 'pypdf'
+    module = 'pypdf'
+
+    @staticmethod
+    def _open(source, password: str = None):
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+
+        try:
+            reader = PdfReader(source)
+        except PdfReadError as e:
+            raise InvalidPDFError(str(e))
+        if reader.is_encrypted and not reader.decrypt(password or ''):
+            raise PasswordError("Incorrect password")
+        return reader
+
+    def page_count(self, source, password: str = None) -> int:
+        return len(self._open(source, password).pages)
+
+    def merge(self, sources: list, output) -> int:
+        from pypdf import PdfWriter
+
+        writer = PdfWriter()
+        for source in sources:
+            writer.append(self._open(source))
+        writer.write(output)
+        return len(writer.pages)
+
+    def split(self, source, page_groups: list, outputs: list) -> int:
+        from pypdf import PdfWriter
+
+        reader = self._open(source)
+        for pages, output in zip(page_groups, outputs):
+            writer = PdfWriter()
+            for index in pages:
+                writer.add_page(reader.pages[index])
+            writer.write(output)
+        return len(outputs)
+
+    def rotate(self, source, output, angle: int, pages: list = None) -> int:
+        from pypdf import PdfWriter
+        from pypdf.generic import NameObject, NumberObject
+
+        writer = PdfWriter(clone_from=self._open(source))
+        targets = range(len(writer.pages)) if pages is None else pages
+        for index in targets:
+            writer.pages[index][NameObject('/Rotate')] = NumberObject(int(angle) % 360)
+        writer.write(output)
+        return len(targets)
+
+    def encrypt(self, source, output, user_password: str, owner_password: str = None,
+                allow_printing: bool = True, allow_copying: bool = False):
+        from pypdf import PdfWriter
+        from pypdf.constants import UserAccessPermissions
+
+        permissions = UserAccessPermissions(0)
+        if allow_printing:
+            permissions |= UserAccessPermissions.PRINT | UserAccessPermissions.PRINT_TO_REPRESENTATION
+        if allow_copying:
+            permissions |= UserAccessPermissions.EXTRACT
+
+        writer = PdfWriter(clone_from=self._open(source))
+        writer.encrypt(
+            user_password=user_password,
+            owner_password=owner_password or user_password,
+            permissions_flag=permissions,
+            algorithm='AES-256',
+        )
+        writer.write(output)
+
+    def decrypt(self, source, output, password: str):
+        from pypdf import PdfWriter
+
+        writer = PdfWriter(clone_from=self._open(source, password))
+        writer.write(output)
+
+    def save(self, source, output):
+        from pypdf import PdfWriter
+
+        writer = PdfWriter(clone_from=self._open(source))
+        writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+        writer.write(output)
@@ -4,6 +4,7 @@ Uses Gotenberg (LibreOffice-based) service for reliable Office-to-PDF conversion
 This is the recommended approach for Excel, Word, and PowerPoint conversions.
 """
 import os
+import re
 import logging
 import requests
 from typing import Optional
@@ -14,6 +15,9 @@ logger = logging.getLogger(__name__)
 # Gotenberg URL from environment, fallback to localhost for local development
 GOTENBERG_URL = os.environ.get('GOTENBERG_URL', 'http://localhost:3001')
 
+# Longest page settle time a caller may request before URL conversion
+MAX_WAIT_DELAY_SECONDS = 10
+
 
 class GotenbergConverter:
     """
@@ -285,13 +289,27 @@ def convert_powerpoint_to_pdf_gotenberg(file) -> bytes:
     return convert_office_to_pdf_gotenberg(file)
 
 
+def clamp_wait_delay(wait_delay, default: str = "2s") -> str:
+    """
+    Normalize a requested wait delay ("500ms", "2s", "1m" or a number of
+    seconds) to seconds, at most MAX_WAIT_DELAY_SECONDS.
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*(ms|s|m)?\s*', str(wait_delay))
+    if not match:
+        return default
+    value, unit = float(match.group(1)), match.group(2) or 's'
+    seconds = value / 1000 if unit == 'ms' else value * 60 if unit == 'm' else value
+    return f"{min(seconds, MAX_WAIT_DELAY_SECONDS):g}s"
+
+
 def convert_url_to_pdf_gotenberg(
     url: str,
     page_size: str = "A4",
     orientation: str = "portrait",
     margins: str = "normal",
     print_background: bool = True,
-    emulate_media: str = "screen"
+    emulate_media: str = "screen",
+    wait_delay: str = "2s"
 ) -> bytes:
     """
     Convert a webpage URL to PDF using Gotenberg's Chromium engine.
@@ -303,6 +321,7 @@ def convert_url_to_pdf_gotenberg(
         margins: "none", "minimal", "normal", or "wide"
         print_background: Whether to include background graphics
         emulate_media: "screen" or "print"
+        wait_delay: Time to wait before conversion (e.g., "2s")
     
     Returns:
         PDF bytes
@@ -325,5 +344,6 @@ def convert_url_to_pdf_gotenberg(
         margin_left=margin_value,
         margin_right=margin_value,
         print_background=print_background,
+        wait_delay=clamp_wait_delay(wait_delay),
         emulate_media=emulate_media
     )
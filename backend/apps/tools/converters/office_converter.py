@@ -194,7 +194,7 @@ def convert_html_to_pdf(file) -> bytes:
         logger.warning(f"Gotenberg HTML conversion failed, trying WeasyPrint: {gotenberg_error}")
         
         try:
-            from weasyprint import HTML
+            from apps.tools.converters.weasyprint_service import render_html
             
             file.seek(0)  # Reset file pointer
             content = file.read()
@@ -203,11 +203,8 @@ def convert_html_to_pdf(file) -> bytes:
             else:
                 html_content = content
             
-            # Create PDF from HTML
-            html = HTML(string=html_content)
-            pdf_bytes = html.write_pdf()
-            
-            return pdf_bytes
+            # Create PDF from HTML in a warm WeasyPrint process
+            return render_html(html_content)
         except ImportError:
             # Fallback to LibreOffice if WeasyPrint not available
             logger.warning("WeasyPrint not available, using LibreOffice for HTML to PDF")
@@ -232,8 +229,7 @@ def convert_markdown_to_pdf(file) -> bytes:
         PDF bytes
     """
     try:
-        import markdown
-        from weasyprint import HTML, CSS
+        from apps.tools.converters.weasyprint_service import render_markdown
         
         content = file.read()
         if isinstance(content, bytes):
@@ -241,62 +237,8 @@ def convert_markdown_to_pdf(file) -> bytes:
         else:
             md_content = content
         
-        # Convert Markdown to HTML
-        html_content = markdown.markdown(
-            md_content,
-            extensions=['tables', 'fenced_code', 'codehilite']
-        )
-        
-        # Wrap in basic HTML structure with styling
-        full_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                body {{ 
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                    line-height: 1.6;
-                    max-width: 800px;
-                    margin: 40px auto;
-                    padding: 0 20px;
-                }}
-                h1, h2, h3 {{ color: #333; }}
-                code {{ 
-                    background: #f4f4f4; 
-                    padding: 2px 6px; 
-                    border-radius: 3px;
-                }}
-                pre {{ 
-                    background: #f4f4f4; 
-                    padding: 16px; 
-                    overflow-x: auto;
-                    border-radius: 6px;
-                }}
-                table {{ 
-                    border-collapse: collapse; 
-                    width: 100%;
-                    margin: 20px 0;
-                }}
-                th, td {{ 
-                    border: 1px solid #ddd; 
-                    padding: 8px; 
-                    text-align: left;
-                }}
-                th {{ background: #f4f4f4; }}
-            </style>
-        </head>
-        <body>
-            {html_content}
-        </body>
-        </html>
-        """
-        
-        # Create PDF
-        html = HTML(string=full_html)
-        pdf_bytes = html.write_pdf()
-        
-        return pdf_bytes
+        # Markdown setup, stylesheet and fonts are reused across renders
+        return render_markdown(md_content)
     except ImportError as e:
         raise Exception(f"Required library not available: {e}")
     except Exception as e:
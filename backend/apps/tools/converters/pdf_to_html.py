@@ -0,0 +1,216 @@
+"""
+PDF to HTML Converter
+Pure transformation - no Django, no DB.
+
+HTML is produced as a stream: the document header first, then each page as
+soon as PyMuPDF has extracted it, then the footer. Only one page is held in
+memory at a time, so time-to-first-byte does not depend on page count.
+Embedded images are either inlined as base64 (PyMuPDF's default) or moved
+out into a ZIP bundle next to index.html. Each image is written once per
+xref.
+"""
+from html import escape
+import re
+import tempfile
+import zipfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+HTML_HEADER = (
+    '<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>'
+    '<style>'
+    'body{{background-color:#f0f0f0}}'
+    'div.page{{position:relative;background-color:white;margin:1em auto;box-shadow:1px 1px 8px -2px black}}'
+    'p{{position:absolute;white-space:pre;margin:0}}'
+    '</style></head><body>\n'
+)
+HTML_FOOTER = '</body></html>\n'
+
+PAGE_DIV = re.compile(r'<div id="page\d+"')
+
+STORE_SHRINK_EVERY = 50  # pages
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+def _page_html(page, external_images: bool) -> tuple:
+    """
+    Extract one page as HTML.
+
+    Returns:
+        tuple: (html, [(xref, bbox), ...]) - images are only listed when external
+    """
+    import fitz
+
+    if external_images:
+        html = page.get_text('html', flags=fitz.TEXTFLAGS_HTML & ~fitz.TEXT_PRESERVE_IMAGES)
+        images = [(info['xref'], info['bbox']) for info in page.get_image_info(xrefs=True)]
+    else:
+        html = page.get_text('html')
+        images = []
+
+    # MuPDF numbers every single-page export "page0"; keep ids unique
+    html = PAGE_DIV.sub(f'<div class="page" id="page{page.number + 1}"', html, count=1)
+    return html, images
+
+
+def _image_tag(src: str, bbox) -> str:
+    x0, y0, x1, y1 = bbox
+    return (
+        f'<img style="position:absolute;left:{x0:.1f}pt;top:{y0:.1f}pt;'
+        f'width:{x1 - x0:.1f}pt;height:{y1 - y0:.1f}pt" src="{src}">\n'
+    )
+
+
+def _extract_image(doc, page, xref: int, bbox) -> tuple:
+    """Return (ext, bytes) for an image xref, rendering inline images from the page."""
+    import fitz
+
+    if xref:
+        base_image = doc.extract_image(xref)
+        if base_image:
+            return base_image['ext'], base_image['image']
+
+    # Inline images have no xref; rasterise their area instead
+    pix = page.get_pixmap(clip=fitz.Rect(bbox), dpi=150)
+    return 'png', pix.tobytes('png')
+
+
+def iter_pages(input_path: str, external_images: bool = False):
+    """
+    Yield each page's HTML, plus any images that are new on that page.
+
+    Yields:
+        tuple: (page_html, [(name, ext_bytes), ...])
+    """
+    import fitz
+
+    doc = fitz.open(input_path)
+    try:
+        written = {}
+        for page in doc:
+            html, images = _page_html(page, external_images)
+            new_images = []
+            tags = []
+
+            for index, (xref, bbox) in enumerate(images, start=1):
+                key = xref or f'p{page.number + 1}-{index}'
+                if key not in written:
+                    ext, data = _extract_image(doc, page, xref, bbox)
+                    written[key] = f'images/img-{key}.{ext}'
+                    new_images.append((written[key], data))
+                tags.append(_image_tag(written[key], bbox))
+
+            if tags:
+                head, _, tail = html.rpartition('</div>')
+                html = head + ''.join(tags) + '</div>' + tail
+
+            yield html, new_images
+
+            if (page.number + 1) % STORE_SHRINK_EVERY == 0:
+                fitz.TOOLS.store_shrink(100)
+    finally:
+        doc.close()
+
+
+def stream_html(input_path: str, title: str = 'Converted PDF'):
+    """
+    Stream a standalone HTML document with images inlined.
+
+    Yields:
+        bytes: UTF-8 encoded HTML chunks, one per page plus header and footer
+    """
+    yield HTML_HEADER.format(title=escape(title)).encode('utf-8')
+    for html, _ in iter_pages(input_path):
+        yield html.encode('utf-8')
+    yield HTML_FOOTER.encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(input_path: str, title: str = 'Converted PDF'):
+    """
+    Stream a ZIP bundle of index.html plus an images/ folder.
+
+    Images are stored and sent while pages are extracted. The HTML is spooled
+    to a temporary file and copied into the archive once the last page is
+    done, because a ZIP entry cannot stay open while other entries are
+    written.
+
+    Yields:
+        bytes: ZIP archive chunks
+    """
+    sink = _ChunkSink()
+
+    with tempfile.TemporaryFile() as html_file:
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zf:
+            html_file.write(HTML_HEADER.format(title=escape(title)).encode('utf-8'))
+
+            for html, images in iter_pages(input_path, external_images=True):
+                html_file.write(html.encode('utf-8'))
+                for name, data in images:
+                    # Images are already compressed
+                    zf.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+            html_file.write(HTML_FOOTER.encode('utf-8'))
+            html_file.seek(0)
+
+            with zf.open('index.html', 'w', force_zip64=True) as entry:
+                for block in iter(lambda: html_file.read(COPY_BUFFER_SIZE), b''):
+                    entry.write(block)
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+
+        yield sink.drain()
+
+
+def convert(input_path: str, output_path: str, external_images: bool = False, **parameters) -> dict:
+    """
+    Convert a PDF to HTML on disk.
+
+    Args:
+        input_path: Path to input PDF
+        output_path: Path for the .html file, or the .zip bundle when external_images
+        external_images: Move images out of the HTML into an images/ folder in a ZIP
+
+    Returns:
+        dict: {success, bytes_written, external_images}
+    """
+    try:
+        stream = stream_zip(input_path) if external_images else stream_html(input_path)
+        written = 0
+
+        with open(output_path, 'wb') as f:
+            for chunk in stream:
+                f.write(chunk)
+                written += len(chunk)
+
+        logger.info(f"Converted PDF to HTML: {written} bytes, external_images={external_images}")
+
+        return {'success': True, 'bytes_written': written, 'external_images': external_images}
+
+    except Exception as e:
+        logger.error(f"PDF to HTML failed: {e}")
+        return {'success': False, 'message': str(e)}
@@ -0,0 +1,208 @@
+"""
+PDF to PowerPoint Converter
+Pure transformation - no Django, no DB.
+
+Pages are rasterised concurrently by a render pool straight into encoded PNG
+or JPEG bytes; nothing is written to disk per page. Slides are appended in
+page order as each rendered chunk arrives. With editable_text, text is
+stripped from the page before rendering and re-added as real text boxes, so
+the slide text stays selectable and editable.
+"""
+import io
+import logging
+
+from apps.tools.parallel import iter_chunks, page_chunks
+
+logger = logging.getLogger(__name__)
+
+
+IMAGE_FORMATS = ('png', 'jpeg')
+DEFAULT_DPI = 150
+MIN_DPI = 36
+MAX_DPI = 300
+DEFAULT_JPEG_QUALITY = 80
+MAX_JPEG_QUALITY = 95
+PAGES_PER_CHUNK = 8
+
+EMU_PER_POINT = 12700
+MAX_SLIDE_EMU = 51206400  # PowerPoint's 56 inch limit
+
+
+def clamp_dpi(dpi) -> int:
+    return max(MIN_DPI, min(int(dpi), MAX_DPI))
+
+
+def clamp_quality(quality) -> int:
+    return max(1, min(int(quality), MAX_JPEG_QUALITY))
+
+
+def _text_lines(page) -> list:
+    """Collect text lines with position and styling in displayed page space."""
+    import fitz
+
+    lines = []
+    for block in page.get_text('dict')['blocks']:
+        if block.get('type') != 0:
+            continue
+        for line in block['lines']:
+            spans = [s for s in line['spans'] if s['text'].strip()]
+            if not spans:
+                continue
+            rect = fitz.Rect(line['bbox']) * page.rotation_matrix
+            first = spans[0]
+            lines.append({
+                'rect': tuple(rect),
+                'text': ''.join(s['text'] for s in line['spans']).strip(),
+                'size': first['size'],
+                'color': first['color'],
+                'bold': bool(first['flags'] & 16),
+                'italic': bool(first['flags'] & 2),
+            })
+    return lines
+
+
+def _render_chunk(task: tuple) -> list:
+    """
+    Render a page range to encoded images. Runs in a pool worker.
+
+    Returns:
+        list: [{width, height, image, lines}, ...] with sizes in points
+    """
+    import fitz
+
+    input_path, start, stop, dpi, image_format, jpeg_quality, editable_text = task
+    rendered = []
+
+    with fitz.open(input_path) as doc:
+        for page_no in range(start, stop):
+            page = doc[page_no]
+            lines = []
+
+            if editable_text:
+                lines = _text_lines(page)
+                if lines:
+                    # Remove only the text; images and vector art stay in the render
+                    page.add_redact_annot(page.rect)
+                    page.apply_redactions(
+                        images=fitz.PDF_REDACT_IMAGE_NONE,
+                        graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+                    )
+
+            pix = page.get_pixmap(dpi=dpi)
+            if image_format == 'jpeg':
+                image = pix.tobytes('jpeg', jpg_quality=jpeg_quality)
+            else:
+                image = pix.tobytes('png')
+
+            rendered.append({
+                'width': page.rect.width,
+                'height': page.rect.height,
+                'image': image,
+                'lines': lines,
+            })
+            pix = None
+
+    return rendered
+
+
+def _add_text_lines(slide, lines: list, scale: float, left: int, top: int):
+    """Place each text line as its own unwrapped text box."""
+    from pptx.dml.color import RGBColor
+    from pptx.util import Emu, Pt
+
+    for line in lines:
+        x0, y0, x1, y1 = line['rect']
+        box = slide.shapes.add_textbox(
+            Emu(left + int(x0 * scale)), Emu(top + int(y0 * scale)),
+            Emu(max(int((x1 - x0) * scale), 1)), Emu(max(int((y1 - y0) * scale), 1)),
+        )
+        frame = box.text_frame
+        frame.word_wrap = False
+        frame.margin_left = frame.margin_right = frame.margin_top = frame.margin_bottom = 0
+
+        run = frame.paragraphs[0].add_run()
+        run.text = line['text']
+        run.font.size = Pt(max(line['size'] * scale / EMU_PER_POINT, 1))
+        run.font.bold = line['bold']
+        run.font.italic = line['italic']
+        run.font.color.rgb = RGBColor.from_string(f"{line['color']:06X}")
+
+
+def convert(input_path: str, output, dpi: int = DEFAULT_DPI, image_format: str = 'png',
+            jpeg_quality: int = DEFAULT_JPEG_QUALITY, editable_text: bool = False,
+            max_workers: int = None, **parameters) -> dict:
+    """
+    Convert a PDF to a PowerPoint deck with one slide per page.
+
+    Args:
+        input_path: Path to input PDF
+        output: Path or writable file-like object for the PPTX
+        dpi: Render resolution
+        image_format: 'png' (lossless) or 'jpeg' (smaller deck)
+        jpeg_quality: JPEG quality 1-95
+        editable_text: Keep extractable text as real text boxes
+        max_workers: Upper bound on render processes
+
+    Returns:
+        dict: {success, slides, image_format, editable_text}
+    """
+    try:
+        import fitz
+        from pptx import Presentation
+        from pptx.util import Emu
+
+        image_format = 'jpeg' if image_format == 'jpg' else image_format
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format '{image_format}'")
+        dpi = clamp_dpi(dpi)
+        jpeg_quality = clamp_quality(jpeg_quality)
+
+        with fitz.open(input_path) as doc:
+            page_count = doc.page_count
+            if not page_count:
+                raise ValueError("PDF has no pages")
+            first = doc[0].rect
+
+        # Slide size follows the first page, capped at PowerPoint's limit
+        emu_scale = min(EMU_PER_POINT, MAX_SLIDE_EMU / max(first.width, first.height))
+        prs = Presentation()
+        prs.slide_width = Emu(int(first.width * emu_scale))
+        prs.slide_height = Emu(int(first.height * emu_scale))
+        blank_layout = prs.slide_layouts[6]
+
+        tasks = [
+            (input_path, start, stop, dpi, image_format, jpeg_quality, editable_text)
+            for start, stop in page_chunks(page_count, PAGES_PER_CHUNK)
+        ]
+
+        slides = 0
+        for chunk in iter_chunks(_render_chunk, tasks, max_workers=max_workers):
+            for page in chunk:
+                slide = prs.slides.add_slide(blank_layout)
+
+                # Fit the page inside the slide, centred, keeping its aspect ratio
+                scale = min(prs.slide_width / page['width'], prs.slide_height / page['height'])
+                width = int(page['width'] * scale)
+                height = int(page['height'] * scale)
+                left = (prs.slide_width - width) // 2
+                top = (prs.slide_height - height) // 2
+
+                slide.shapes.add_picture(io.BytesIO(page['image']), Emu(left), Emu(top), width=Emu(width), height=Emu(height))
+                if page['lines']:
+                    _add_text_lines(slide, page['lines'], scale, left, top)
+                slides += 1
+
+        prs.save(output)
+
+        logger.info(f"Converted PDF to PowerPoint: {slides} slides, {image_format} @ {dpi}dpi")
+
+        return {
+            'success': True,
+            'slides': slides,
+            'image_format': image_format,
+            'editable_text': editable_text,
+        }
+
+    except Exception as e:
+        logger.error(f"PDF to PowerPoint failed: {e}")
+        return {'success': False, 'message': str(e)}
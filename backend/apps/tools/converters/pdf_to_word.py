@@ -0,0 +1,223 @@
+"""
+PDF to Word Converter
+Pure transformation - no Django, no DB.
+
+pdf2docx parses page chunks in a bounded number of processes. Each chunk returns
+its serialized page layouts. The parent restores them into one Converter and
+writes a single docx, so the result matches a single-process run.
+
+Every chunk runs in its own process with a deadline counted from its start,
+also inside Celery workers, and only the process of an overrunning chunk is
+killed. A chunk that fails or times out is retried page by page, and any page
+that still fails is skipped instead of stalling the conversion.
+"""
+from multiprocessing.connection import wait
+import os
+import signal
+import time
+import logging
+
+from apps.tools.parallel import default_workers, page_chunks
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 10
+DEFAULT_CHUNK_TIMEOUT = 120  # seconds
+
+# min_section_height=0 captures all content from the very top of the page,
+# including headers
+CONVERT_SETTINGS = {
+    'min_section_height': 0,
+}
+
+
+def _parse_chunk(task: tuple) -> dict:
+    """
+    Parse a set of pages. Runs in a pool worker.
+
+    Returns:
+        dict: {page_index: serialized page layout}
+    """
+    from pdf2docx import Converter
+
+    input_path, page_indexes = task
+    cv = Converter(input_path)
+    try:
+        settings = {**cv.default_settings, **CONVERT_SETTINGS}
+        cv.load_pages(pages=page_indexes)
+        cv.parse_document(**settings).parse_pages(**settings)
+        return {page['id']: page for page in cv.store()['pages']}
+    finally:
+        cv.close()
+
+
+def _run_chunk(conn, task: tuple):
+    """Chunk process body: reply (True, pages) or (False, error message)."""
+    try:
+        reply = (True, _parse_chunk(task))
+    except Exception as e:
+        reply = (False, str(e))
+    conn.send(reply)
+    conn.close()
+
+
+def _stop(process):
+    """Kill a chunk process; a parse stuck in native code ignores SIGTERM."""
+    try:
+        os.kill(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.join()
+
+
+def _parse_in_pool(input_path: str, chunks: list, workers: int, timeout: int,
+                   on_chunk=None) -> tuple:
+    """
+    Parse chunks in up to `workers` processes at a time, collecting the
+    pages of chunks that fail or time out.
+
+    Each chunk runs in its own process and gets `timeout` seconds from the
+    moment that process starts; a chunk past its deadline is stopped by
+    killing only its process. billiard (Celery's multiprocessing fork) is
+    used because it may start processes from a daemonic Celery child.
+
+    Returns:
+        tuple: (parsed pages dict, list of page indexes to retry)
+    """
+    import billiard
+
+    parsed = {}
+    failed = []
+    queued = list(chunks)
+    running = {}  # connection -> (pages, process, deadline)
+
+    def _finish(pages, ok, result):
+        span = f"{pages[0] + 1}-{pages[-1] + 1}"
+        if ok:
+            parsed.update(result)
+        else:
+            logger.warning(f"PDFToWord:CHUNK_FAILED pages={span} error={result}")
+            failed.extend(pages)
+        if on_chunk:
+            on_chunk(pages)
+
+    try:
+        while queued or running:
+            while queued and len(running) < workers:
+                pages = queued.pop(0)
+                receiver, sender = billiard.Pipe(duplex=False)
+                process = billiard.Process(target=_run_chunk, args=(sender, (input_path, pages)), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (pages, process, time.monotonic() + timeout)
+
+            next_deadline = min(deadline for _, _, deadline in running.values())
+            for conn in wait(list(running), timeout=max(next_deadline - time.monotonic(), 0)):
+                pages, process, _ = running.pop(conn)
+                try:
+                    ok, result = conn.recv()
+                except (EOFError, OSError):
+                    process.join()
+                    ok, result = False, f"process exited with code {process.exitcode}"
+                conn.close()
+                process.join()
+                _finish(pages, ok, result)
+
+            now = time.monotonic()
+            for conn, (pages, process, deadline) in list(running.items()):
+                if deadline <= now:
+                    del running[conn]
+                    _stop(process)
+                    conn.close()
+                    logger.warning(
+                        f"PDFToWord:CHUNK_TIMEOUT pages={pages[0] + 1}-{pages[-1] + 1} timeout={timeout}s"
+                    )
+                    failed.extend(pages)
+                    if on_chunk:
+                        on_chunk(pages)
+    finally:
+        for conn, (_, process, _) in running.items():
+            _stop(process)
+            conn.close()
+
+    return parsed, failed
+
+
+def convert(input_path: str, output_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+            max_workers: int = None, chunk_timeout: int = DEFAULT_CHUNK_TIMEOUT,
+            on_progress=None, **parameters) -> dict:
+    """
+    Convert a PDF to DOCX, parsing page chunks in parallel.
+
+    Chunks always run in child processes, also inside Celery workers, so
+    the per-chunk timeout holds everywhere.
+
+    Args:
+        input_path: Path to input PDF
+        output_path: Path for output DOCX
+        chunk_size: Pages per chunk
+        max_workers: Upper bound on parsing processes
+        chunk_timeout: Seconds each chunk (and each retried page) may run
+        on_progress: Optional callable(pages_done, page_count)
+
+    Returns:
+        dict: {success, page_count, pages_converted, skipped_pages, chunks, workers}
+    """
+    try:
+        import fitz
+        from pdf2docx import Converter
+
+        with fitz.open(input_path) as doc:
+            if doc.needs_pass:
+                raise ValueError("PDF is password protected")
+            page_count = doc.page_count
+
+        chunks = [list(range(start, stop)) for start, stop in page_chunks(page_count, chunk_size)]
+        workers = min(default_workers(max_workers), len(chunks))
+        done = []
+
+        def _chunk_done(pages):
+            done.append(len(pages))
+            if on_progress:
+                on_progress(sum(done), page_count)
+
+        parsed, retry = _parse_in_pool(input_path, chunks, workers, chunk_timeout, _chunk_done)
+
+        # Isolate pathological pages: retry them one page per process
+        retry = [p for p in retry if p not in parsed]
+        if retry:
+            retried, _ = _parse_in_pool(
+                input_path, [[p] for p in retry],
+                min(workers, len(retry)), chunk_timeout,
+            )
+            parsed.update(retried)
+
+        if not parsed:
+            raise ValueError("No pages could be converted")
+
+        cv = Converter(input_path)
+        try:
+            cv.restore({'page_cnt': page_count, 'pages': [parsed[i] for i in sorted(parsed)]})
+            cv.make_docx(output_path, **{**cv.default_settings, **CONVERT_SETTINGS})
+        finally:
+            cv.close()
+
+        skipped = [p + 1 for p in range(page_count) if p not in parsed]
+        if skipped:
+            logger.warning(f"PDFToWord:PAGES_SKIPPED count={len(skipped)} pages={skipped[:20]}")
+
+        logger.info(f"Converted PDF to Word: {len(parsed)}/{page_count} pages, {len(chunks)} chunks, {workers} workers")
+
+        return {
+            'success': True,
+            'page_count': page_count,
+            'pages_converted': len(parsed),
+            'skipped_pages': skipped,
+            'chunks': len(chunks),
+            'workers': workers,
+        }
+
+    except Exception as e:
+        logger.error(f"PDF to Word failed: {e}")
+        return {'success': False, 'message': str(e)}
@@ -1,16 +1,26 @@
 """
 Enhanced PowerPoint to PDF Converter using multiple strategies
+
+The content-rendering fallback draws slides with PIL in a process pool that
+is shared by every conversion, so the fonts and decoded pictures cached in
+its processes stay warm between presentations. Finished slides are embedded
+as PNG or JPEG streams, whichever is smaller, or as raw pixmaps.
 """
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import atexit
 import io
 import os
 import sys
+import threading
 import logging
 from PIL import Image
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
 import tempfile
 
+from apps.tools.parallel import can_fork, default_workers, page_chunks
+
 logger = logging.getLogger(__name__)
 
 
@@ -90,34 +100,206 @@ def _convert_via_windows_com(content: bytes, filename: str) -> bytes:
             return f.read()
 
 
-def _convert_via_image_extraction(content: bytes) -> bytes:
+EMU_TO_PX = 96 * 2.5 / 914400  # 96 DPI at 2.5x for better quality
+SLIDES_PER_CHUNK = 4
+SLIDE_FORMATS = ('auto', 'png', 'jpeg', 'raw')
+SLIDE_JPEG_QUALITY = 90
+
+# Decoded, resized pictures kept per process, bounded by total pixel count
+IMAGE_CACHE_MAX_PIXELS = 32 * 1024 * 1024
+_image_cache = OrderedDict()
+_image_cache_pixels = 0
+
+
+@lru_cache(maxsize=32)
+def _font(size: int):
+    """Load (once per process) the slide font at a given pixel size."""
+    from PIL import ImageFont
+    
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _fitted_picture(image, size: tuple):
+    """
+    Decode and resize a picture, reusing earlier results for the same blob.
+    
+    Args:
+        image: python-pptx Image (provides blob and sha1)
+        size: Target (width, height) in pixels
+    """
+    global _image_cache_pixels
+    
+    key = (image.sha1, size)
+    cached = _image_cache.get(key)
+    if cached is not None:
+        _image_cache.move_to_end(key)
+        return cached
+    
+    picture = Image.open(io.BytesIO(image.blob))
+    # JPEG decoders can downscale while decoding
+    picture.draft('RGB', size)
+    has_alpha = picture.mode in ('RGBA', 'LA', 'P') and (
+        picture.mode != 'P' or 'transparency' in picture.info
+    )
+    picture = picture.convert('RGBA' if has_alpha else 'RGB')
+    picture = picture.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    
+    _image_cache[key] = picture
+    _image_cache_pixels += size[0] * size[1]
+    while _image_cache_pixels > IMAGE_CACHE_MAX_PIXELS and len(_image_cache) > 1:
+        (_, evicted_size), _ = _image_cache.popitem(last=False)
+        _image_cache_pixels -= evicted_size[0] * evicted_size[1]
+    
+    return picture
+
+
+def _encode_slide(img, slide_format: str, quality: int) -> dict:
+    """
+    Encode a rendered slide for embedding. 'auto' keeps the smaller of
+    PNG and JPEG: flat text-and-shape slides compress far better losslessly,
+    photo-heavy ones as JPEG.
+    """
+    img = img.convert('RGB')
+    if slide_format == 'raw':
+        return {'format': 'raw', 'width': img.width, 'height': img.height, 'data': img.tobytes()}
+    
+    encoded = []
+    for fmt in (('png', 'jpeg') if slide_format == 'auto' else (slide_format,)):
+        buffer = io.BytesIO()
+        if fmt == 'png':
+            img.save(buffer, format='PNG')
+        else:
+            img.save(buffer, format='JPEG', quality=quality)
+        encoded.append({'format': fmt, 'data': buffer.getvalue()})
+    return min(encoded, key=lambda payload: len(payload['data']))
+
+
+def _fallback_slide(slide_idx: int, width: int, height: int):
+    from PIL import ImageDraw
+    
+    fallback = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(fallback)
+    draw.text((100, height // 2), f"Slide {slide_idx + 1}", fill='black', font=_font(48))
+    return fallback
+
+
+def _render_slide_chunk(task: tuple) -> list:
+    """Render and encode a range of slides. Runs in a pool worker."""
+    from pptx import Presentation
+    
+    content, start, stop, width, height, slide_format, quality = task
+    prs = Presentation(io.BytesIO(content))
+    slides = list(prs.slides)
+    encoded = []
+    
+    for slide_idx in range(start, stop):
+        try:
+            slide_img = _render_slide_with_content(slides[slide_idx], width, height)
+        except Exception as e:
+            logger.error(f"Could not render slide {slide_idx + 1}: {e}")
+            slide_img = _fallback_slide(slide_idx, width, height)
+        encoded.append(_encode_slide(slide_img, slide_format, quality))
+    
+    return encoded
+
+
+def _insert_slide(doc, payload: dict, width_pt: float, height_pt: float):
+    """Add an encoded slide as a full-page image."""
+    import fitz
+    
+    page = doc.new_page(width=width_pt, height=height_pt)
+    if payload['format'] == 'raw':
+        pixmap = fitz.Pixmap(fitz.csRGB, payload['width'], payload['height'], payload['data'], 0)
+        page.insert_image(page.rect, pixmap=pixmap)
+    else:
+        page.insert_image(page.rect, stream=payload['data'])
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _slide_pool(max_workers: int = None):
+    """
+    The process pool shared by all conversions in this process, created on
+    first use with default_workers(max_workers) processes.
+    """
+    global _pool, _pool_pid
+    
+    with _pool_lock:
+        # A forked child must not use its parent's pool
+        if _pool is None or _pool_pid != os.getpid():
+            if _pool_pid is None:
+                atexit.register(_shutdown_pool)
+            _pool = ProcessPoolExecutor(max_workers=default_workers(max_workers))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _shutdown_pool(pool=None):
+    """Stop the shared pool (or only the given one, if it is still current)."""
+    global _pool
+    
+    with _pool_lock:
+        if _pool is None or (pool is not None and pool is not _pool):
+            return
+        pool, _pool = _pool, None
+    if _pool_pid == os.getpid():
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_slides(tasks: list, max_workers: int = None):
+    """Render slide chunks in the shared pool, yielding them in order."""
+    if len(tasks) <= 1 or default_workers(max_workers) <= 1 or not can_fork():
+        for task in tasks:
+            yield _render_slide_chunk(task)
+        return
+    
+    pool = _slide_pool(max_workers)
+    try:
+        yield from pool.map(_render_slide_chunk, tasks)
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole executor; start fresh next time
+        _shutdown_pool(pool)
+        raise
+
+
+def _convert_via_image_extraction(content: bytes, slide_format: str = 'auto',
+                                  quality: int = SLIDE_JPEG_QUALITY, max_workers: int = None) -> bytes:
     """
     Convert PPTX to PDF by rendering slides.
     This creates a proper visual representation of each slide.
+    
+    Args:
+        content: PPTX bytes
+        slide_format: 'auto' (smaller of PNG and JPEG), 'png', 'jpeg' or 'raw' (pixmap)
+        quality: JPEG quality for slide images
+        max_workers: Upper bound on render processes, fixed when the shared pool starts
     """
+    import fitz
     from pptx import Presentation
-    from PIL import Image, ImageDraw, ImageFont
-    import zipfile
     
     logger.info("Starting PPTX conversion...")
     
+    if slide_format not in SLIDE_FORMATS:
+        raise ValueError(f"Unsupported slide format '{slide_format}'")
+    
     try:
         prs = Presentation(io.BytesIO(content))
-        logger.info(f"Loaded presentation with {len(prs.slides)} slides")
+        slide_count = len(prs.slides)
+        logger.info(f"Loaded presentation with {slide_count} slides")
     except Exception as e:
         logger.error(f"Failed to load presentation: {e}")
         raise
     
-    # Create PDF
-    pdf_buffer = io.BytesIO()
-    
     # Use presentation dimensions if available, otherwise use standard 16:9
     try:
-        slide_width_emu = prs.slide_width
-        slide_height_emu = prs.slide_height
-        # Convert EMU to pixels (1 inch = 914400 EMU, 96 DPI)
-        slide_width_px = int((slide_width_emu / 914400) * 96 * 2.5)  # 2.5x for better quality
-        slide_height_px = int((slide_height_emu / 914400) * 96 * 2.5)
+        slide_width_px = int(prs.slide_width * EMU_TO_PX)
+        slide_height_px = int(prs.slide_height * EMU_TO_PX)
         logger.info(f"Slide dimensions: {slide_width_px}x{slide_height_px} px")
     except Exception as e:
         # Default to 16:9 at high resolution
@@ -125,67 +307,41 @@ def _convert_via_image_extraction(content: bytes) -> bytes:
         slide_height_px = 1080
         logger.info(f"Using default dimensions: {slide_width_px}x{slide_height_px} px")
     
-    c = canvas.Canvas(pdf_buffer, pagesize=(slide_width_px * 0.75, slide_height_px * 0.75))  # Convert px to points
-    
-    slide_images = []
-    
-    # First try to extract any embedded slide thumbnails or preview images
-    logger.info("Checking for embedded thumbnails...")
-    embedded_images = _extract_slide_thumbnails(content)
-    
-    if embedded_images and len(embedded_images) >= len(prs.slides):
-        # Use embedded thumbnails if available
-        logger.info(f"Using {len(embedded_images)} embedded thumbnails")
-        slide_images = embedded_images[:len(prs.slides)]
-    else:
-        # Render slides using content
-        logger.info("Rendering slides from content...")
-        for slide_idx, slide in enumerate(prs.slides):
-            try:
-                logger.info(f"Rendering slide {slide_idx + 1}/{len(prs.slides)}...")
-                slide_img = _render_slide_with_content(slide, slide_width_px, slide_height_px)
-                slide_images.append(slide_img)
-                logger.info(f"Slide {slide_idx + 1} rendered successfully")
-            except Exception as e:
-                logger.error(f"Could not render slide {slide_idx + 1}: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
-                # Create a fallback slide
-                fallback = Image.new('RGB', (slide_width_px, slide_height_px), 'white')
-                draw = ImageDraw.Draw(fallback)
-                try:
-                    font = ImageFont.truetype("arial.ttf", 48)
-                except:
-                    font = ImageFont.load_default()
-                draw.text((100, slide_height_px // 2), f"Slide {slide_idx + 1}", fill='black', font=font)
-                slide_images.append(fallback)
-    
-    if not slide_images:
-        logger.error("No slides were converted!")
-        raise Exception("No slides could be converted")
-    
-    logger.info(f"Adding {len(slide_images)} slides to PDF...")
+    # Convert px to points
+    width_pt = slide_width_px * 0.75
+    height_pt = slide_height_px * 0.75
+    doc = fitz.open()
     
-    # Add slides to PDF
-    for idx, slide_img in enumerate(slide_images):
-        try:
-            # Convert PIL Image to bytes
-            img_buffer = io.BytesIO()
-            slide_img.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            
-            # Add to PDF
-            img_reader = ImageReader(img_buffer)
-            c.drawImage(img_reader, 0, 0, 
-                       width=slide_width_px * 0.75, 
-                       height=slide_height_px * 0.75)
-            c.showPage()
-        except Exception as e:
-            logger.error(f"Failed to add slide {idx + 1} to PDF: {e}")
+    try:
+        # First try to extract any embedded slide thumbnails or preview images
+        logger.info("Checking for embedded thumbnails...")
+        embedded_images = _extract_slide_thumbnails(content)
+        
+        if embedded_images and len(embedded_images) >= slide_count:
+            # Use embedded thumbnails if available
+            logger.info(f"Using {len(embedded_images)} embedded thumbnails")
+            for slide_img in embedded_images[:slide_count]:
+                _insert_slide(doc, _encode_slide(slide_img, slide_format, quality), width_pt, height_pt)
+        else:
+            # Render slides from content, slide chunks in parallel
+            logger.info("Rendering slides from content...")
+            tasks = [
+                (content, start, stop, slide_width_px, slide_height_px, slide_format, quality)
+                for start, stop in page_chunks(slide_count, SLIDES_PER_CHUNK)
+            ]
+            for chunk in _render_slides(tasks, max_workers=max_workers):
+                for payload in chunk:
+                    _insert_slide(doc, payload, width_pt, height_pt)
+        
+        if not doc.page_count:
+            logger.error("No slides were converted!")
+            raise Exception("No slides could be converted")
+        
+        pdf_bytes = doc.tobytes(garbage=1, deflate=True)
+    finally:
+        doc.close()
     
-    c.save()
-    pdf_bytes = pdf_buffer.getvalue()
-    logger.info(f"PDF generated successfully, size: {len(pdf_bytes)} bytes")
+    logger.info(f"PDF generated successfully, {slide_count} slides, size: {len(pdf_bytes)} bytes")
     return pdf_bytes
 
 
@@ -194,39 +350,35 @@ def _render_slide_with_content(slide, width: int, height: int) -> Image:
     Render a single slide with its text and shape content.
     Returns a PIL Image.
     """
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import ImageDraw
     from pptx.enum.shapes import MSO_SHAPE_TYPE
     
     # Create slide background
     img = Image.new('RGB', (width, height), 'white')
     draw = ImageDraw.Draw(img)
     
-    # Try to load fonts
-    try:
-        title_font = ImageFont.truetype("arial.ttf", int(height * 0.06))
-        body_font = ImageFont.truetype("arial.ttf", int(height * 0.04))
-        small_font = ImageFont.truetype("arial.ttf", int(height * 0.03))
-    except:
-        title_font = body_font = small_font = ImageFont.load_default()
+    # Fonts are loaded once per process and size
+    title_font = _font(int(height * 0.06))
+    body_font = _font(int(height * 0.04))
+    small_font = _font(int(height * 0.03))
     
     # Process shapes in order
     for shape in slide.shapes:
         try:
             # Get shape position and size (convert EMU to pixels)
-            left = int((shape.left / 914400) * 96 * 2.5)
-            top = int((shape.top / 914400) * 96 * 2.5)
-            shape_width = int((shape.width / 914400) * 96 * 2.5)
-            shape_height = int((shape.height / 914400) * 96 * 2.5)
+            left = int(shape.left * EMU_TO_PX)
+            top = int(shape.top * EMU_TO_PX)
+            shape_width = int(shape.width * EMU_TO_PX)
+            shape_height = int(shape.height * EMU_TO_PX)
             
             # Handle different shape types
             if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
                 # Try to get the image
                 try:
-                    image_data = shape.image.blob
-                    shape_img = Image.open(io.BytesIO(image_data))
-                    shape_img = shape_img.resize((shape_width, shape_height), Image.Resampling.LANCZOS)
-                    img.paste(shape_img, (left, top))
-                except:
+                    shape_img = _fitted_picture(shape.image, (shape_width, shape_height))
+                    mask = shape_img if shape_img.mode == 'RGBA' else None
+                    img.paste(shape_img, (left, top), mask)
+                except Exception:
                     # Draw placeholder for image
                     draw.rectangle([left, top, left + shape_width, top + shape_height], 
                                  outline='gray', width=2)
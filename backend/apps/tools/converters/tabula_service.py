@@ -0,0 +1,310 @@
+"""
+Tabula Table Extraction Service
+Pure utilities - no Django, no DB.
+
+tabula.read_pdf() starts a Java process for every call, and JVM start-up
+plus JIT warm-up cost seconds before any page is parsed. This service keeps
+one long-lived extraction process per worker process. The child hosts the
+JVM (through tabula-py's jpype mode when JPype is installed) and answers
+requests on a line protocol: one JSON object per line on stdin, one JSON
+reply per line on stdout.
+
+The child is health-checked when it has been idle, and restarted after a
+number of jobs or when its resident memory grows past a limit, since a JVM
+rarely gives memory back. Without Java or tabula-py, tables come from
+pdfplumber instead.
+"""
+from functools import lru_cache
+import atexit
+import importlib.util
+import json
+import os
+import select
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+REQUEST_TIMEOUT = int(os.environ.get('TABULA_TIMEOUT', 300))  # seconds
+START_TIMEOUT = int(os.environ.get('TABULA_START_TIMEOUT', 60))  # seconds
+MAX_JOBS = int(os.environ.get('TABULA_MAX_JOBS', 200))
+MAX_RSS = int(os.environ.get('TABULA_MAX_RSS_MB', 1024)) * 1024 * 1024
+HEALTH_INTERVAL = 60  # seconds idle before a ping precedes the next request
+PING_TIMEOUT = 10  # seconds
+
+
+class TabulaUnavailable(Exception):
+    """The tabula process could not be started or stopped answering."""
+    pass
+
+
+@lru_cache(maxsize=None)
+def tabula_available() -> bool:
+    """Java on PATH and tabula-py importable."""
+    return shutil.which('java') is not None and importlib.util.find_spec('tabula') is not None
+
+
+# ---------------------------------------------------------------------------
+# Child process
+# ---------------------------------------------------------------------------
+
+def _rss() -> int:
+    """Resident memory of this process in bytes, JVM heap included."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        # ru_maxrss is the peak, in KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _frame_rows(df) -> list:
+    """A DataFrame as rows of cell strings, header row first."""
+    header = [None if str(c).startswith('Unnamed:') else str(c) for c in df.columns]
+    rows = [[None if value is None or value != value else str(value) for value in row] for row in df.itertuples(index=False)]
+    return [header] + rows
+
+
+def _read(path: str, pages) -> list:
+    import tabula
+
+    frames = tabula.read_pdf(path, pages=pages, multiple_tables=True, silent=True)
+    return [_frame_rows(df) for df in frames]
+
+
+def _warm_up():
+    """Start the JVM and JIT the parser on a one-page table."""
+    import tempfile
+
+    import fitz
+
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+        path = tmp.name
+    try:
+        with fitz.open() as doc:
+            page = doc.new_page()
+            for row in range(4):
+                for col in range(3):
+                    rect = fitz.Rect(72 + col * 120, 72 + row * 24, 192 + col * 120, 96 + row * 24)
+                    page.draw_rect(rect)
+                    page.insert_text(rect.tl + (4, 16), f"R{row}C{col}", fontsize=10)
+            doc.save(path)
+        _read(path, 'all')
+    finally:
+        os.remove(path)
+
+
+def serve():
+    """
+    Child loop. Requests:
+        {"op": "ping"}
+        {"op": "read", "path": "...", "pages": "all"}
+    Replies:
+        {"ok": true, "rss": <bytes>, ["tables": [...]]}
+        {"ok": false, "error": "...", "rss": <bytes>}
+    """
+    # Anything Java or tabula prints must not corrupt the protocol stream
+    reply = os.fdopen(os.dup(sys.stdout.fileno()), 'w', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    try:
+        import jpype  # noqa: F401
+        mode = 'jpype'
+    except ImportError:
+        mode = 'subprocess'
+
+    try:
+        _warm_up()
+    except Exception as e:
+        print(f"Tabula:WARM_UP_FAILED error={e}", file=sys.stderr)
+    reply.write(json.dumps({'ok': True, 'mode': mode, 'rss': _rss()}) + '\n')
+
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            response = {'ok': True}
+            if request.get('op') == 'read':
+                response['tables'] = _read(request['path'], request.get('pages') or 'all')
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        response['rss'] = _rss()
+        reply.write(json.dumps(response) + '\n')
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+class TabulaService:
+    """One warm tabula process per worker process."""
+
+    _process = None
+    _owner = None
+    _jobs = 0
+    _last_used = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def _spawn(cls):
+        backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'apps.tools.converters.tabula_service'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=backend_dir,
+            text=True,
+            bufsize=1,
+        )
+        try:
+            hello = cls._receive(process, START_TIMEOUT)
+        except TabulaUnavailable:
+            cls._kill(process)
+            raise
+
+        if hello.get('mode') != 'jpype':
+            logger.warning("Tabula:NO_JPYPE - every read starts its own JVM")
+        logger.info(f"Tabula:STARTED pid={process.pid} mode={hello.get('mode')} rss={hello.get('rss')}")
+
+        cls._process, cls._owner, cls._jobs = process, os.getpid(), 0
+        cls._last_used = time.monotonic()
+
+    @staticmethod
+    def _kill(process):
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+    @classmethod
+    def _stop(cls, reason: str):
+        process, cls._process = cls._process, None
+        if process is None:
+            return
+        logger.info(f"Tabula:STOPPED pid={process.pid} reason={reason} jobs={cls._jobs}")
+        # An inherited handle belongs to the parent's child; leave it alone
+        if cls._owner == os.getpid():
+            process.stdin.close()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                cls._kill(process)
+
+    @staticmethod
+    def _receive(process, timeout: float) -> dict:
+        ready, _, _ = select.select([process.stdout], [], [], timeout)
+        line = process.stdout.readline() if ready else ''
+        if not line:
+            raise TabulaUnavailable('no reply from tabula process' if not ready else 'tabula process exited')
+        return json.loads(line)
+
+    @classmethod
+    def _call(cls, request: dict, timeout: float) -> dict:
+        try:
+            cls._process.stdin.write(json.dumps(request) + '\n')
+            cls._process.stdin.flush()
+            response = cls._receive(cls._process, timeout)
+        except (OSError, ValueError, TabulaUnavailable) as e:
+            cls._kill(cls._process)
+            cls._stop('unresponsive')
+            raise TabulaUnavailable(str(e))
+        cls._last_used = time.monotonic()
+        return response
+
+    @classmethod
+    def _ensure(cls):
+        """A live, recently verified process."""
+        if cls._process is not None and cls._owner != os.getpid():
+            # Forked from a process that had one; start our own
+            cls._process = None
+        if cls._process is not None and cls._process.poll() is not None:
+            cls._stop('exited')
+        if cls._process is not None and time.monotonic() - cls._last_used > HEALTH_INTERVAL:
+            try:
+                cls._call({'op': 'ping'}, PING_TIMEOUT)
+            except TabulaUnavailable as e:
+                logger.warning(f"Tabula:HEALTH_CHECK_FAILED error={e}")
+        if cls._process is None:
+            cls._spawn()
+
+    @classmethod
+    def read_tables(cls, input_path: str, pages='all', timeout: int = REQUEST_TIMEOUT) -> list:
+        """
+        Tables of a PDF as found by tabula.
+
+        Args:
+            input_path: PDF file
+            pages: 'all', a page number or a list of page numbers (1-based)
+            timeout: Seconds before the request is abandoned and the process killed
+
+        Returns:
+            list: Tables, each a list of rows of cell strings, header row first
+
+        Raises:
+            TabulaUnavailable: If the process could not be started or died
+            ValueError: If tabula could not parse the document
+        """
+        with cls._lock:
+            cls._ensure()
+            response = cls._call({'op': 'read', 'path': os.path.abspath(input_path), 'pages': pages}, timeout)
+            cls._jobs += 1
+
+            if response.get('rss', 0) > MAX_RSS:
+                cls._stop(f"rss={response['rss']}")
+            elif cls._jobs >= MAX_JOBS:
+                cls._stop('max_jobs')
+
+        if not response['ok']:
+            raise ValueError(response['error'])
+        return response['tables']
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            cls._stop('shutdown')
+
+
+def _pdfplumber_pages(input_path: str) -> list:
+    from apps.tools.text_extraction import extract_pages
+
+    return extract_pages(input_path, 'tables')
+
+
+def extract_tables(input_path: str, fallback=None) -> dict:
+    """
+    Tables of a PDF through the warm tabula process, or pdfplumber without Java.
+
+    Args:
+        input_path: PDF file
+        fallback: Optional callable returning the per-page pdfplumber tables of
+                  input_path (e.g. through the text cache); extracted directly otherwise
+
+    Returns:
+        dict: {success, tables, engine} or {success: False, message}
+    """
+    try:
+        if tabula_available():
+            try:
+                return {'success': True, 'tables': TabulaService.read_tables(input_path), 'engine': 'tabula'}
+            except TabulaUnavailable as e:
+                logger.warning(f"Tabula:FALLBACK error={e}")
+
+        pages = fallback() if fallback else _pdfplumber_pages(input_path)
+        tables = [table for page in pages for table in page if table]
+        return {'success': True, 'tables': tables, 'engine': 'pdfplumber'}
+
+    except Exception as e:
+        logger.error(f"Tabula:EXTRACT_FAILED error={e}")
+        return {'success': False, 'message': str(e)}
+
+
+atexit.register(TabulaService.shutdown)
+
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,286 @@
+"""
+WeasyPrint Render Service
+Pure utilities - no Django, no DB.
+
+Building a FontConfiguration scans the system fonts and parsing the default
+stylesheet takes longer than laying out a short document, so both are made
+once per process and reused. Renders run in a small set of warm processes
+(fonts loaded, stylesheet parsed) with a per-render timeout and an address
+space cap per process. Each process serves one render at a time over a
+pipe, so a render past its deadline is stopped by killing only its own
+process; renders of other callers carry on. Where the caller may not fork,
+renders run in process with the same cached state.
+"""
+from functools import lru_cache
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import logging
+
+from apps.tools.parallel import can_fork, default_workers
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_WORKERS = int(os.environ.get('WEASYPRINT_WORKERS', 2))
+RENDER_TIMEOUT = int(os.environ.get('WEASYPRINT_TIMEOUT', 60))  # seconds
+MEMORY_LIMIT = int(os.environ.get('WEASYPRINT_MEMORY_MB', 1024)) * 1024 * 1024
+
+MARKDOWN_EXTENSIONS = ('tables', 'fenced_code', 'codehilite')
+
+MARKDOWN_CSS = """
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+    line-height: 1.6;
+    max-width: 800px;
+    margin: 40px auto;
+    padding: 0 20px;
+}
+h1, h2, h3 { color: #333; }
+code {
+    background: #f4f4f4;
+    padding: 2px 6px;
+    border-radius: 3px;
+}
+pre {
+    background: #f4f4f4;
+    padding: 16px;
+    overflow-x: auto;
+    border-radius: 6px;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+    margin: 20px 0;
+}
+th, td {
+    border: 1px solid #ddd;
+    padding: 8px;
+    text-align: left;
+}
+th { background: #f4f4f4; }
+"""
+
+MARKDOWN_TEMPLATE = '<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>{body}</body></html>'
+
+
+@lru_cache(maxsize=None)
+def font_config():
+    """Process-wide FontConfiguration; the system font scan happens once."""
+    from weasyprint.text.fonts import FontConfiguration
+
+    return FontConfiguration()
+
+
+@lru_cache(maxsize=None)
+def markdown_stylesheet():
+    """The markdown stylesheet, parsed once against the shared font configuration."""
+    from weasyprint import CSS
+
+    return CSS(string=MARKDOWN_CSS, font_config=font_config())
+
+
+_local = threading.local()
+
+
+def _markdown():
+    """A Markdown converter per thread, with its extensions set up once."""
+    converter = getattr(_local, 'markdown', None)
+    if converter is None:
+        import markdown
+
+        converter = _local.markdown = markdown.Markdown(extensions=list(MARKDOWN_EXTENSIONS))
+    return converter.reset()
+
+
+def _render(kind: str, content: str, base_url: str = None) -> bytes:
+    """Render HTML or Markdown to PDF bytes with the cached state."""
+    from weasyprint import HTML
+
+    stylesheets = []
+    if kind == 'markdown':
+        content = MARKDOWN_TEMPLATE.format(body=_markdown().convert(content))
+        stylesheets.append(markdown_stylesheet())
+
+    return HTML(string=content, base_url=base_url).write_pdf(
+        stylesheets=stylesheets, font_config=font_config(),
+    )
+
+
+def _warm(memory_limit: int):
+    """Cap the address space and load fonts and stylesheets."""
+    if memory_limit:
+        try:
+            import resource
+
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"WeasyPrint:MEMORY_LIMIT_UNAVAILABLE error={e}")
+
+    try:
+        _render('markdown', '# warm-up')
+    except Exception as e:
+        # A missing WeasyPrint is reported by the first real render
+        logger.warning(f"WeasyPrint:WARM_UP_FAILED error={e}")
+
+
+def _serve(conn, memory_limit: int):
+    """
+    Render process loop. Requests are (kind, content, base_url) tuples;
+    replies are (True, pdf bytes) or (False, exception).
+    """
+    _warm(memory_limit)
+    while True:
+        try:
+            kind, content, base_url = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            reply = (True, _render(kind, content, base_url))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # E.g. an exception that does not pickle; send its text instead
+            conn.send((False, RuntimeError(str(reply[1]) if not reply[0] else str(e))))
+
+
+class _RenderProcess:
+    """One warm render process and the parent's end of its pipe."""
+
+    def __init__(self):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(child, MEMORY_LIMIT), name='weasyprint-render', daemon=True,
+        )
+        self.process.start()
+        child.close()
+        self.owner = os.getpid()
+
+    def render(self, kind: str, content: str, base_url: str, timeout: float) -> bytes:
+        """
+        Raises:
+            TimeoutError: If no reply came within timeout
+            EOFError: If the process died during the render
+        """
+        self.conn.send((kind, content, base_url))
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        ok, value = self.conn.recv()
+        if not ok:
+            raise value
+        return value
+
+    def kill(self):
+        if self.owner != os.getpid():
+            return
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WeasyPrintService:
+    """Warm render processes shared by the HTML and Markdown converters."""
+
+    _idle = queue.LifoQueue()
+    _slots = None
+    _pid = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _acquire(cls) -> _RenderProcess:
+        """An idle warm process, or a new one while under the process limit."""
+        with cls._lock:
+            if cls._pid != os.getpid():
+                # Forked from a process that had some; start our own
+                cls._idle = queue.LifoQueue()
+                cls._slots = threading.BoundedSemaphore(default_workers(DEFAULT_WORKERS))
+                cls._pid = os.getpid()
+                atexit.register(cls.shutdown)
+            slots, idle = cls._slots, cls._idle
+
+        slots.acquire()
+        try:
+            worker = idle.get_nowait()
+            if worker.process.is_alive():
+                return worker
+            worker.kill()
+        except queue.Empty:
+            pass
+        try:
+            return _RenderProcess()
+        except Exception:
+            slots.release()
+            raise
+
+    @classmethod
+    def _release(cls, worker: _RenderProcess, keep: bool):
+        """Return a healthy process to the idle set; kill one that timed out or died."""
+        if keep:
+            cls._idle.put(worker)
+        else:
+            worker.kill()
+        cls._slots.release()
+
+    @classmethod
+    def shutdown(cls):
+        while True:
+            try:
+                cls._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+    @classmethod
+    def render(cls, kind: str, content: str, base_url: str = None, timeout: int = RENDER_TIMEOUT) -> bytes:
+        """
+        Render a document to PDF.
+
+        Args:
+            kind: 'html' or 'markdown'
+            content: Document source
+            base_url: Base for relative URLs in the document
+            timeout: Seconds before the render is abandoned
+
+        Returns:
+            bytes: PDF
+
+        Raises:
+            TimeoutError: If the render exceeds timeout
+            MemoryError: If the render exceeds the process memory cap
+        """
+        if not can_fork():
+            return _render(kind, content, base_url)
+
+        worker = cls._acquire()
+        keep = False
+        try:
+            result = worker.render(kind, content, base_url, timeout)
+            keep = True
+            return result
+        except TimeoutError:
+            logger.warning(f"WeasyPrint:TIMEOUT kind={kind} seconds={timeout} pid={worker.process.pid}")
+            raise TimeoutError(f"Rendering took longer than {timeout}s")
+        except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+            # This render's own process died (e.g. killed over its memory cap)
+            logger.warning(f"WeasyPrint:PROCESS_DIED pid={worker.process.pid} error={e!r}")
+            raise MemoryError("Rendering stopped: the document needs too much memory")
+        except Exception:
+            # The render failed but its process is fine
+            keep = True
+            raise
+        finally:
+            cls._release(worker, keep)
+
+
+def render_html(html: str, base_url: str = None) -> bytes:
+    """Convenience function."""
+    return WeasyPrintService.render('html', html, base_url)
+
+
+def render_markdown(text: str) -> bytes:
+    """Convenience function."""
+    return WeasyPrintService.render('markdown', text)
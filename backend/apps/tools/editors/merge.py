@@ -19,17 +19,9 @@ def merge(input_paths: list, output_path: str, **parameters) -> dict:
         dict: {success, page_count, files_merged}
     """
     try:
-        import pikepdf
+        from apps.tools import backends
         
-        merged = pikepdf.Pdf.new()
-        total_pages = 0
-        
-        for path in input_paths:
-            with pikepdf.open(path) as pdf:
-                merged.pages.extend(pdf.pages)
-                total_pages += len(pdf.pages)
-        
-        merged.save(output_path)
+        total_pages = backends.merge(input_paths, output_path)
         
         logger.info(f"Merged {len(input_paths)} PDFs: {total_pages} pages")
         
@@ -60,24 +52,18 @@ def split(input_path: str, output_dir: str, mode: str = 'all', pages: str = None
     import os
     
     try:
-        import pikepdf
+        from apps.tools import backends
+        from apps.tools.windowed import parse_page_spec
+        
+        total = backends.page_count(input_path)
+        
+        if mode == 'all':
+            page_list = range(total)
+        else:
+            page_list = parse_page_spec(pages, total)
         
-        with pikepdf.open(input_path) as pdf:
-            total = len(pdf.pages)
-            files_created = []
-            
-            if mode == 'all':
-                page_list = range(total)
-            else:
-                page_list = _parse_page_spec(pages, total)
-            
-            for i, page_idx in enumerate(page_list):
-                output_pdf = pikepdf.Pdf.new()
-                output_pdf.pages.append(pdf.pages[page_idx])
-                
-                output_path = os.path.join(output_dir, f'page_{page_idx + 1}.pdf')
-                output_pdf.save(output_path)
-                files_created.append(output_path)
+        files_created = [os.path.join(output_dir, f'page_{page_idx + 1}.pdf') for page_idx in page_list]
+        backends.split(input_path, [[page_idx] for page_idx in page_list], files_created)
         
         logger.info(f"Split PDF: {len(files_created)} files")
         
@@ -90,20 +76,3 @@ def split(input_path: str, output_dir: str, mode: str = 'all', pages: str = None
     except Exception as e:
         logger.error(f"Split failed: {e}")
         return {'success': False, 'message': str(e)}
-
-
-def _parse_page_spec(spec: str, total: int) -> list:
-    """Parse page specification like '1-5,8,10-12'."""
-    pages = []
-    if not spec:
-        return list(range(total))
-    
-    for part in spec.split(','):
-        part = part.strip()
-        if '-' in part:
-            start, end = part.split('-')
-            pages.extend(range(int(start) - 1, int(end)))
-        else:
-            pages.append(int(part) - 1)
-    
-    return [p for p in pages if 0 <= p < total]
@@ -0,0 +1,187 @@
+"""
+Image Extraction
+Pure transformation - no Django, no DB.
+
+Collects the unique image xrefs of the selected pages first, so an image
+repeated on many pages (logos, backgrounds) is decoded and stored once.
+The unique images are then extracted in parallel chunks, optionally
+converted to another format and size, and written into a zip on disk as
+each chunk arrives. manifest.json in the zip maps pages to images.
+"""
+import io
+import json
+import zipfile
+import logging
+
+from apps.tools.parallel import iter_chunks, page_chunks
+from apps.tools.windowed import _release_window, parse_pages
+
+logger = logging.getLogger(__name__)
+
+
+IMAGE_FORMATS = ('png', 'jpeg', 'webp')
+XREFS_PER_CHUNK = 32
+DEFAULT_QUALITY = 85
+
+
+def _convert(data: bytes, fmt: str, max_size: int, quality: int):
+    """Re-encode image bytes with Pillow. Returns (ext, data, width, height)."""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    if max_size:
+        image.thumbnail((max_size, max_size))
+
+    if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+        image = image.convert('RGB')
+
+    buffer = io.BytesIO()
+    image.save(buffer, fmt.upper(), quality=quality)
+    return ('jpg' if fmt == 'jpeg' else fmt), buffer.getvalue(), image.width, image.height
+
+
+def _extract_chunk(task: tuple) -> list:
+    """
+    Extract a list of image xrefs. Runs in a pool worker.
+
+    Returns:
+        list: [{xref, ext, data, width, height}, ...] skipping unreadable xrefs
+    """
+    import fitz
+
+    input_path, xrefs, fmt, max_size, quality = task
+    extracted = []
+
+    with fitz.open(input_path) as doc:
+        for xref in xrefs:
+            base_image = doc.extract_image(xref)
+            if not base_image:
+                continue
+
+            ext, data = base_image['ext'], base_image['image']
+            width, height = base_image['width'], base_image['height']
+
+            if fmt or max_size:
+                try:
+                    ext, data, width, height = _convert(data, fmt or 'png', max_size, quality)
+                except Exception:
+                    # Pillow cannot read e.g. JBIG2; let MuPDF decode it first
+                    pix = fitz.Pixmap(doc, xref)
+                    if pix.n - pix.alpha >= 4:
+                        pix = fitz.Pixmap(fitz.csRGB, pix)
+                    ext, data, width, height = _convert(pix.tobytes('png'), fmt or 'png', max_size, quality)
+
+            extracted.append({'xref': xref, 'ext': ext, 'data': data, 'width': width, 'height': height})
+
+    return extracted
+
+
+def extract_images(input_path: str, output_path: str, pages=None, fmt: str = None,
+                   max_size: int = None, quality: int = DEFAULT_QUALITY, max_workers: int = None,
+                   window_size: int = None) -> dict:
+    """
+    Extract the unique embedded images of a PDF into a zip.
+
+    Args:
+        input_path: Path to input PDF
+        output_path: Path for output zip
+        pages: Page selection, see windowed.parse_pages (default: all)
+        fmt: Convert every image to 'png', 'jpeg' or 'webp' (default: keep)
+        max_size: Downscale so neither side exceeds this many pixels
+        quality: Encoder quality for converted images
+        max_workers: Upper bound on extraction processes
+        window_size: Pages scanned before the object store is released,
+            for very large PDFs (default: scan in one pass)
+
+    Returns:
+        dict: {success, page_count, images, occurrences, duplicates_skipped}
+    """
+    try:
+        import fitz
+
+        fmt = 'jpeg' if fmt == 'jpg' else (fmt or None)
+        if fmt and fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format '{fmt}'")
+        max_size = int(max_size) if max_size else None
+
+        # Pass 1: where every unique xref appears; named after its first use
+        first_use = {}
+        page_images = {}
+        with fitz.open(input_path) as doc:
+            page_count = doc.page_count
+        selected = parse_pages(pages, page_count)
+
+        for start, stop in page_chunks(page_count, window_size or page_count):
+            with fitz.open(input_path) as doc:
+                for page_no in range(start, stop):
+                    if selected is not None and page_no not in selected:
+                        continue
+                    xrefs = []
+                    for img_idx, img in enumerate(doc[page_no].get_images(), start=1):
+                        xref = img[0]
+                        first_use.setdefault(xref, (page_no + 1, img_idx))
+                        xrefs.append(xref)
+                    if xrefs:
+                        page_images[page_no + 1] = xrefs
+            if window_size:
+                _release_window()
+
+        unique = list(first_use)
+        occurrences = sum(len(xrefs) for xrefs in page_images.values())
+
+        # Pass 2: decode each unique xref once, in parallel chunks
+        tasks = [
+            (input_path, unique[i:i + XREFS_PER_CHUNK], fmt, max_size, quality)
+            for i in range(0, len(unique), XREFS_PER_CHUNK)
+        ]
+
+        names = {}
+        manifest_images = []
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED) as zf:
+            for chunk in iter_chunks(_extract_chunk, tasks, max_workers=max_workers):
+                for image in chunk:
+                    page, img_idx = first_use[image['xref']]
+                    name = f"page{page}_img{img_idx}.{image['ext']}"
+                    zf.writestr(name, image['data'])
+                    names[image['xref']] = name
+                    manifest_images.append({
+                        'file': name,
+                        'xref': image['xref'],
+                        'width': image['width'],
+                        'height': image['height'],
+                        'pages': [],
+                    })
+
+            by_xref = {entry['xref']: entry for entry in manifest_images}
+            for page, xrefs in page_images.items():
+                for xref in dict.fromkeys(xrefs):
+                    if xref in by_xref:
+                        by_xref[xref]['pages'].append(page)
+
+            manifest = {
+                'images': manifest_images,
+                'pages': {
+                    str(page): [names[xref] for xref in dict.fromkeys(xrefs) if xref in names]
+                    for page, xrefs in page_images.items()
+                },
+            }
+            zf.writestr('manifest.json', json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+
+        logger.info(
+            f"ImageExtraction:DONE pages={page_count} images={len(names)} "
+            f"occurrences={occurrences} format={fmt or 'original'}"
+        )
+
+        return {
+            'success': True,
+            'page_count': page_count,
+            'images': len(names),
+            'occurrences': occurrences,
+            'duplicates_skipped': occurrences - len(unique),
+        }
+
+    except Exception as e:
+        logger.error(f"Image extraction failed: {e}")
+        return {'success': False, 'message': str(e)}
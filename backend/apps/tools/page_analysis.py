@@ -0,0 +1,257 @@
+"""
+Page Analysis
+Pure transformation - no Django, no DB.
+
+Finds blank separator pages and near-duplicate rescans. Every page is
+rendered to a small grayscale thumbnail in parallel page chunks; ink
+coverage and perceptual hashes (dHash and pHash) are then computed for all
+thumbnails at once with NumPy, and hashes are compared as packed bit arrays.
+Text pages with a similar layout hash alike, so hash matches are confirmed
+by the correlation of the pages' 32x32 mean grids.
+
+Only pages that are safe to drop unasked are flagged: a blank page has
+almost no ink and neither a text layer nor images, and a duplicate is only
+marked identical when its text and a full-size render match its original.
+Other near-duplicates are candidates for the user to confirm.
+"""
+import logging
+
+import numpy as np
+
+from apps.tools.parallel import iter_chunks, page_chunks
+
+logger = logging.getLogger(__name__)
+
+
+THUMB_SIZE = 128            # square grayscale thumbnail, aspect is ignored
+PAGES_PER_CHUNK = 50
+INK_DELTA = 48              # this far from the page background, either way, is ink
+BLANK_COVERAGE = 0.002      # below this share of ink pixels a page is blank
+DUPLICATE_DISTANCE = 6      # max differing bits of 64 in both dHash and pHash
+DUPLICATE_CORRELATION = 0.98
+COMPARE_BATCH = 512
+IDENTICAL_DPI = 72          # render used to confirm a duplicate is identical
+
+
+def _render_chunk(task: tuple) -> bytes:
+    """
+    Render a page range to THUMB_SIZE grayscale thumbnails. Runs in a pool worker.
+
+    Returns:
+        bytes: Concatenated THUMB_SIZE x THUMB_SIZE 8-bit samples, one per page
+    """
+    import fitz
+    from PIL import Image
+
+    input_path, start, stop = task
+    samples = []
+
+    with fitz.open(input_path) as doc:
+        for page_no in range(start, stop):
+            page = doc[page_no]
+            matrix = fitz.Matrix(THUMB_SIZE / page.rect.width, THUMB_SIZE / page.rect.height)
+            pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False)
+
+            image = Image.frombytes('L', (pix.width, pix.height), pix.samples)
+            if image.size != (THUMB_SIZE, THUMB_SIZE):
+                # Rounding in the render can add or drop a pixel row
+                image = image.resize((THUMB_SIZE, THUMB_SIZE))
+            samples.append(image.tobytes())
+
+    return b''.join(samples)
+
+
+def _dct_matrix(n: int):
+    k = np.arange(n)[:, None]
+    matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def ink_coverage(thumbs):
+    """
+    Share of pixels that differ from each page's own background (its median),
+    lighter or darker, so light text on a dark page counts as ink.
+    """
+    background = np.median(thumbs, axis=(1, 2)).astype(np.int16)
+    ink = np.abs(thumbs.astype(np.int16) - background[:, None, None]) > INK_DELTA
+    return ink.mean(axis=(1, 2))
+
+
+def dhash(thumbs):
+    """64-bit difference hashes: 8 rows x 9 column means, adjacent columns compared."""
+    n = len(thumbs)
+    rows = thumbs.reshape(n, 8, THUMB_SIZE // 8, THUMB_SIZE).mean(axis=2)
+    edges = np.linspace(0, THUMB_SIZE, 10).astype(int)
+    grid = np.add.reduceat(rows, edges[:-1], axis=2) / np.diff(edges)
+    return np.packbits((grid[:, :, 1:] > grid[:, :, :-1]).reshape(n, 64), axis=1)
+
+
+def mean_grid(thumbs, size: int = 32):
+    """Block means of every thumbnail on a size x size grid."""
+    n, block = len(thumbs), THUMB_SIZE // size
+    return thumbs.reshape(n, size, block, size, block).mean(axis=(2, 4))
+
+
+def phash(grids):
+    """64-bit DCT hashes: low 8x8 frequencies of 32x32 mean grids against their median."""
+    dct = _dct_matrix(32)
+    low = (dct @ grids @ dct.T)[:, :8, :8].reshape(len(grids), 64)
+    # The DC term only measures brightness, leave it out of the median
+    return np.packbits(low > np.median(low[:, 1:], axis=1)[:, None], axis=1)
+
+
+def normalize(grids):
+    """Zero-mean unit vectors, so a dot product is the Pearson correlation."""
+    vectors = grids.reshape(len(grids), -1)
+    vectors = vectors - vectors.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def hamming(hashes, others):
+    """Pairwise differing bits between two sets of packed 64-bit hashes."""
+    return np.unpackbits(hashes[:, None, :] ^ others[None, :, :], axis=2).sum(axis=2)
+
+
+def has_content(doc, page_no: int) -> bool:
+    """A text layer or images on the page, however little ink they show."""
+    page = doc[page_no]
+    return bool(page.get_images()) or bool(page.get_text('text').strip())
+
+
+def is_identical(doc, page_no: int, other_no: int) -> bool:
+    """
+    Same text layer and a full-size render with no pixel differing by more
+    than INK_DELTA, so pages that differ in a number or a name never match.
+    """
+    import fitz
+
+    page, other = doc[page_no], doc[other_no]
+    if page.get_text('text') != other.get_text('text'):
+        return False
+
+    matrix = fitz.Matrix(IDENTICAL_DPI / 72, IDENTICAL_DPI / 72)
+    renders = [p.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False) for p in (page, other)]
+    if (renders[0].width, renders[0].height) != (renders[1].width, renders[1].height):
+        return False
+
+    a, b = (np.frombuffer(pix.samples, dtype=np.uint8).astype(np.int16) for pix in renders)
+    return not (np.abs(a - b) > INK_DELTA).any()
+
+
+def analyze_pages(input_path: str, blank_coverage: float = BLANK_COVERAGE,
+                  duplicate_distance: int = DUPLICATE_DISTANCE, max_workers: int = None) -> dict:
+    """
+    Find blank and near-duplicate pages.
+
+    A page is blank when its ink coverage is below blank_coverage and it
+    has no text layer and no images. A page is a duplicate of the first
+    earlier non-blank page whose dHash and pHash both differ in at most
+    duplicate_distance bits and whose mean grid correlates with it by at
+    least DUPLICATE_CORRELATION; it is identical to it when is_identical
+    confirms the match.
+
+    Args:
+        input_path: PDF file
+        blank_coverage: Ink share below which a page counts as blank
+        duplicate_distance: Hash distance up to which pages count as duplicates
+        max_workers: Upper bound on render processes
+
+    Returns:
+        dict: {success, page_count, blank_pages,
+               duplicates: [{page, duplicate_of, distance, identical}], coverage}
+              with 1-based pages
+    """
+    try:
+        import fitz
+
+        with fitz.open(input_path) as doc:
+            page_count = doc.page_count
+            if not page_count:
+                raise ValueError("PDF has no pages")
+
+            tasks = [(input_path, start, stop) for start, stop in page_chunks(page_count, PAGES_PER_CHUNK)]
+            thumbs = np.frombuffer(
+                b''.join(iter_chunks(_render_chunk, tasks, max_workers=max_workers)), dtype=np.uint8,
+            ).reshape(page_count, THUMB_SIZE, THUMB_SIZE)
+
+            coverage = ink_coverage(thumbs)
+            blank = coverage < blank_coverage
+
+            # Few pages are this empty, so their text layers are read one by one
+            for page_no in np.flatnonzero(blank):
+                blank[page_no] = not has_content(doc, int(page_no))
+
+            candidates = np.flatnonzero(~blank)
+            grids = mean_grid(thumbs[candidates])
+            d_hashes, p_hashes = dhash(thumbs[candidates]), phash(grids)
+            vectors = normalize(grids)
+
+            original = {}
+            duplicates = []
+            for start in range(0, len(candidates), COMPARE_BATCH):
+                stop = min(start + COMPARE_BATCH, len(candidates))
+                # Only earlier pages can be originals, so compare against [0, stop)
+                distance = np.maximum(
+                    hamming(d_hashes[start:stop], d_hashes[:stop]),
+                    hamming(p_hashes[start:stop], p_hashes[:stop]),
+                )
+                correlation = vectors[start:stop] @ vectors[:stop].T
+                similar = (distance <= duplicate_distance) & (correlation >= DUPLICATE_CORRELATION)
+                for row, i in enumerate(range(start, stop)):
+                    matches = np.flatnonzero(similar[row, :i])
+                    if len(matches):
+                        j = original.get(matches[0], matches[0])
+                        original[i] = j
+                        duplicates.append({
+                            'page': int(candidates[i]) + 1,
+                            'duplicate_of': int(candidates[j]) + 1,
+                            'distance': int(distance[row, matches[0]]),
+                            'identical': is_identical(doc, int(candidates[i]), int(candidates[j])),
+                        })
+
+        blank_pages = [int(page) + 1 for page in np.flatnonzero(blank)]
+
+        logger.info(
+            f"PageAnalysis:DONE pages={page_count} blank={len(blank_pages)} duplicates={len(duplicates)} "
+            f"identical={sum(d['identical'] for d in duplicates)}"
+        )
+
+        return {
+            'success': True,
+            'page_count': page_count,
+            'blank_pages': blank_pages,
+            'duplicates': duplicates,
+            'coverage': [round(float(value), 4) for value in coverage],
+        }
+
+    except Exception as e:
+        logger.error(f"Page analysis failed: {e}")
+        return {'success': False, 'message': str(e)}
+
+
+def remove_pages(input_path: str, output_path: str, pages: list) -> dict:
+    """
+    Write a copy of the PDF without the given 1-based pages.
+
+    Returns:
+        dict: {success, page_count, removed}
+    """
+    try:
+        import fitz
+
+        with fitz.open(input_path) as doc:
+            drop = {page - 1 for page in pages}
+            keep = [page_no for page_no in range(doc.page_count) if page_no not in drop]
+            if not keep:
+                raise ValueError("Every page would be removed")
+
+            doc.select(keep)
+            doc.save(output_path, garbage=3, deflate=True)
+
+        return {'success': True, 'page_count': len(keep), 'removed': len(pages)}
+
+    except Exception as e:
+        logger.error(f"Page removal failed: {e}")
+        return {'success': False, 'message': str(e)}
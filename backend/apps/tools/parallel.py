@@ -0,0 +1,145 @@
+"""
+Parallel Page Processing
+Helpers for fanning page-local work out to a process pool.
+Pure utilities - no Django, no DB.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import signal
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def default_workers(max_workers: int = None) -> int:
+    """Resolve pool size, capped by available CPUs."""
+    cpus = os.cpu_count() or 1
+    return max(1, min(max_workers or DEFAULT_MAX_WORKERS, cpus))
+
+
+def can_fork() -> bool:
+    """
+    Check whether this process may start child processes.
+
+    Celery prefork children are daemonic and cannot own a process pool,
+    so callers fall back to serial execution there.
+    """
+    return not multiprocessing.current_process().daemon
+
+
+def page_chunks(page_count: int, chunk_size: int) -> list:
+    """
+    Split a page range into contiguous chunks.
+
+    Returns:
+        list: [(start, stop), ...] with 0-indexed, stop-exclusive bounds
+    """
+    chunk_size = max(1, chunk_size)
+    return [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+
+
+def iter_chunks(func, tasks: list, max_workers: int = None):
+    """
+    Run func over tasks in a process pool, yielding results in task order
+    as soon as each one is ready.
+
+    Falls back to in-process execution for a single task or when the
+    current process is not allowed to fork.
+
+    Args:
+        func: Picklable top-level callable taking one task argument
+        tasks: List of picklable task arguments
+        max_workers: Upper bound on pool size
+
+    Yields:
+        Results in the same order as tasks
+    """
+    workers = min(default_workers(max_workers), len(tasks))
+
+    if workers <= 1 or not can_fork():
+        for task in tasks:
+            yield func(task)
+        return
+
+    try:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Parallel:POOL_UNAVAILABLE error={e}, running serially")
+        for task in tasks:
+            yield func(task)
+        return
+
+    with pool:
+        yield from pool.map(func, tasks)
+
+
+def map_chunks(func, tasks: list, max_workers: int = None) -> list:
+    """
+    Run func over tasks in a process pool, preserving task order.
+
+    Returns:
+        list: Results in the same order as tasks
+    """
+    return list(iter_chunks(func, tasks, max_workers=max_workers))
+
+
+def _child_entry(conn, func, args: tuple):
+    """Single-use child body: reply (True, result) or (False, exception)."""
+    try:
+        reply = (True, func(*args))
+    except Exception as e:
+        reply = (False, e)
+    try:
+        conn.send(reply)
+    except Exception:
+        # Unpicklable result or exception
+        conn.send((False, RuntimeError(str(reply[1]))))
+    conn.close()
+
+
+def stop_process(process):
+    """Kill a child outright; work stuck in native code ignores SIGTERM."""
+    try:
+        os.kill(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.join()
+
+
+def run_in_child(func, args: tuple, timeout: float):
+    """
+    Run func(*args) in a single-use child process and kill it after timeout.
+
+    billiard (Celery's multiprocessing fork) is used because it may start
+    processes from a daemonic Celery child, where can_fork() is False.
+
+    Raises:
+        TimeoutError: When func did not return within timeout seconds
+        Exception: Whatever func raised
+    """
+    import billiard
+
+    receiver, sender = billiard.Pipe(duplex=False)
+    process = billiard.Process(target=_child_entry, args=(sender, func, args), daemon=True)
+    process.start()
+    sender.close()
+
+    try:
+        if not receiver.poll(timeout):
+            raise TimeoutError(f"exceeded {timeout}s")
+        try:
+            ok, result = receiver.recv()
+        except (EOFError, OSError):
+            process.join()
+            raise RuntimeError(f"child process exited with code {process.exitcode}")
+    finally:
+        stop_process(process)
+        receiver.close()
+
+    if not ok:
+        raise result
+    return result
@@ -29,6 +29,10 @@ class ToolDefinition:
     
     generate_preview: bool = True
     
+    # Page-local tools can stream very large inputs a window of pages at a time
+    page_windowed: bool = False
+    page_window_size: int = 50
+    
     is_premium: bool = False
     is_ai: bool = False
     
@@ -104,7 +108,7 @@ class ToolRegistry:
             # Converters - From PDF  
             ToolDefinition(id='PDF_TO_WORD', name='PDF to Word', category='converters', input_mime_types=pdf, requires_pdf_input=True, output_mime_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document', output_extension='.docx', worker_module='apps.tools.converters.pdf_to_word', description='Convert PDF to Word', icon='file-word'),
             ToolDefinition(id='PDF_TO_EXCEL', name='PDF to Excel', category='converters', input_mime_types=pdf, requires_pdf_input=True, output_mime_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', output_extension='.xlsx', worker_module='apps.tools.converters.pdf_to_excel', description='Convert PDF to Excel', icon='file-excel'),
-            ToolDefinition(id='PDF_TO_IMAGE', name='PDF to Image', category='converters', input_mime_types=pdf, requires_pdf_input=True, output_mime_type='application/zip', output_extension='.zip', worker_module='apps.tools.converters.pdf_to_image', description='Convert PDF to images', icon='image'),
+            ToolDefinition(id='PDF_TO_IMAGE', name='PDF to Image', category='converters', input_mime_types=pdf, requires_pdf_input=True, output_mime_type='application/zip', output_extension='.zip', worker_module='apps.tools.converters.pdf_to_image', page_windowed=True, description='Convert PDF to images', icon='image'),
             
             # Optimizers
             ToolDefinition(id='COMPRESS_PDF', name='Compress PDF', category='optimizers', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.optimizers.compress', description='Reduce file size', icon='compress', parameters_schema={'level': {'type': 'string', 'enum': ['low', 'medium', 'high'], 'default': 'medium'}}),
@@ -112,24 +116,26 @@ class ToolRegistry:
             # Editors
             ToolDefinition(id='MERGE_PDF', name='Merge PDFs', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.merge', description='Combine PDFs', icon='object-group'),
             ToolDefinition(id='SPLIT_PDF', name='Split PDF', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.split', description='Split PDF', icon='object-ungroup'),
-            ToolDefinition(id='ROTATE_PDF', name='Rotate PDF', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.rotate', description='Rotate pages', icon='rotate-right'),
+            ToolDefinition(id='ROTATE_PDF', name='Rotate PDF', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.rotate', page_windowed=True, description='Rotate pages', icon='rotate-right'),
             ToolDefinition(id='DELETE_PAGES', name='Delete Pages', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.delete_pages', description='Remove pages', icon='trash'),
             ToolDefinition(id='REORDER_PAGES', name='Reorder Pages', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.reorder', description='Rearrange pages', icon='sort'),
-            ToolDefinition(id='WATERMARK', name='Add Watermark', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.watermark', description='Add watermark', icon='tint'),
-            ToolDefinition(id='PAGE_NUMBERS', name='Add Page Numbers', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.page_numbers', description='Add page numbers', icon='sort-numeric-up'),
+            ToolDefinition(id='WATERMARK', name='Add Watermark', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.watermark', page_windowed=True, description='Add watermark', icon='tint'),
+            ToolDefinition(id='PAGE_NUMBERS', name='Add Page Numbers', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.editors.page_numbers', page_windowed=True, description='Add page numbers', icon='sort-numeric-up'),
+            ToolDefinition(id='FLATTEN_PDF', name='Flatten PDF', category='editors', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.windowed', page_windowed=True, description='Flatten annotations', icon='layer-group'),
+            ToolDefinition(id='EXTRACT_IMAGES', name='Extract Images', category='converters', input_mime_types=pdf, requires_pdf_input=True, output_mime_type='application/zip', output_extension='.zip', worker_module='apps.tools.windowed', page_windowed=True, description='Extract embedded images', icon='images'),
             
             # Security
             ToolDefinition(id='ENCRYPT_PDF', name='Protect PDF', category='security', input_mime_types=pdf, requires_pdf_input=True, is_premium=True, worker_module='apps.tools.security.protect', description='Password protect', icon='lock'),
             ToolDefinition(id='DECRYPT_PDF', name='Unlock PDF', category='security', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.security.unlock', description='Remove password', icon='unlock'),
             ToolDefinition(id='SIGN_PDF', name='Sign PDF', category='security', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.security.sign', description='Digital signature', icon='signature'),
-            ToolDefinition(id='REDACT_PDF', name='Redact PDF', category='security', input_mime_types=pdf, requires_pdf_input=True, is_premium=True, worker_module='apps.tools.security.redact', description='Redact content', icon='eraser'),
+            ToolDefinition(id='REDACT_PDF', name='Redact PDF', category='security', input_mime_types=pdf, requires_pdf_input=True, is_premium=True, worker_module='apps.tools.security.redact', description='Redact content', icon='eraser', parameters_schema={'terms': {'type': 'array'}, 'regexes': {'type': 'array'}, 'pattern_sets': {'type': 'array', 'items': ['email', 'phone', 'iban']}, 'areas': {'type': 'array'}, 'case_sensitive': {'type': 'boolean', 'default': False}}),
             
             # AI
             ToolDefinition(id='OCR_PDF', name='OCR', category='ai', input_mime_types=pdf, requires_pdf_input=True, is_premium=True, is_ai=True, worker_module='apps.tools.ai.ocr', description='Extract text with OCR', icon='text'),
             ToolDefinition(id='SUMMARIZE_PDF', name='Summarize', category='ai', input_mime_types=pdf, requires_pdf_input=True, is_premium=True, is_ai=True, worker_module='apps.tools.ai.summarize', description='AI summary', icon='brain'),
             
             # Repair
-            ToolDefinition(id='REPAIR_PDF', name='Repair PDF', category='repair', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.repair.repair', description='Fix corrupted PDF', icon='wrench'),
+            ToolDefinition(id='REPAIR_PDF', name='Repair PDF', category='repair', input_mime_types=pdf, requires_pdf_input=True, worker_module='apps.tools.repair.repair', description='Fix corrupted PDF', icon='wrench', parameters_schema={'type': {'type': 'string', 'enum': ['auto', 'pikepdf', 'pymupdf', 'ghostscript'], 'default': 'auto'}}),
         ]
         
         for tool in tools_list:
@@ -0,0 +1,333 @@
+"""
+Render Service
+Long-lived process pool for rasterizing PDF pages.
+Pure utilities - no Django, no DB.
+
+Each render process keeps an LRU of open fitz documents keyed by file hash,
+bounded by document count and source bytes. Requests for a file always go to
+the same process, so a burst of page renders parses the file once and the
+bytes are only sent (or downloaded) when that process does not hold it yet.
+Where the caller may not fork, the cache lives in the calling process.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import atexit
+import hashlib
+import math
+import os
+import threading
+import logging
+
+from apps.tools.parallel import can_fork, default_workers
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_WORKERS = int(os.environ.get('RENDER_WORKERS', 2))
+CACHE_MAX_DOCUMENTS = int(os.environ.get('RENDER_CACHE_DOCUMENTS', 8))
+CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MB', 256)) * 1024 * 1024
+
+# Deep-zoom pyramid: square tiles, deepest level rendered at TILE_MAX_ZOOM
+TILE_SIZE = 256
+TILE_MAX_ZOOM = 4
+
+
+class DocumentCache:
+    """
+    LRU of open documents held by one process.
+
+    Size is measured in source bytes, which fitz keeps referenced for the
+    life of the document, so the budget tracks the bulk of what is held.
+    """
+
+    def __init__(self, max_documents: int = CACHE_MAX_DOCUMENTS, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._documents = OrderedDict()  # key -> (doc, size)
+
+    def __len__(self):
+        return len(self._documents)
+
+    def get(self, key: str):
+        entry = self._documents.get(key)
+        if entry is None:
+            return None
+        self._documents.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, data: bytes):
+        import fitz
+
+        self.discard(key)
+        doc = fitz.open(stream=data, filetype='pdf')
+        self._documents[key] = (doc, len(data))
+        self.size += len(data)
+        self._evict()
+        return doc
+
+    def discard(self, key: str):
+        entry = self._documents.pop(key, None)
+        if entry is not None:
+            entry[0].close()
+            self.size -= entry[1]
+
+    def clear(self):
+        for key in list(self._documents):
+            self.discard(key)
+
+    def _evict(self):
+        # The newest document always stays, even when it alone exceeds the budget
+        while len(self._documents) > 1 and (
+            len(self._documents) > self.max_documents or self.size > self.max_bytes
+        ):
+            key = next(iter(self._documents))
+            self.discard(key)
+            logger.debug(f"Render:EVICTED key={key}")
+
+
+_cache = None
+
+
+def _local_cache() -> DocumentCache:
+    global _cache
+    if _cache is None:
+        _cache = DocumentCache()
+    return _cache
+
+
+def _render_page(doc, index: int, zoom: float = 1.0, fit: tuple = None, dpi: int = None,
+                 fmt: str = 'png', quality: int = 85) -> dict:
+    import fitz
+
+    page = doc[index]
+    if fit:
+        zoom = min(fit[0] / page.rect.width, fit[1] / page.rect.height)
+    elif dpi:
+        zoom = dpi / 72
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    if fmt in ('jpg', 'jpeg'):
+        data = pix.tobytes('jpeg', jpg_quality=quality)
+    else:
+        data = pix.tobytes(fmt)
+
+    return {'page': index, 'data': data, 'width': pix.width, 'height': pix.height}
+
+
+def _render_sizes(doc, index: int, sizes: list, fmt: str = 'jpeg', quality: int = 85) -> dict:
+    """
+    Render a page once at the largest fit box and downscale for the others.
+
+    Returns:
+        dict: {page, sizes: [{data, width, height}, ...]} in the order of sizes
+    """
+    import io
+    import fitz
+    from PIL import Image
+
+    page = doc[index]
+    zooms = [min(box[0] / page.rect.width, box[1] / page.rect.height) for box in sizes]
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(max(zooms), max(zooms)), alpha=False)
+    base = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+    pix = None
+
+    images = []
+    for zoom in zooms:
+        target = (
+            max(1, round(page.rect.width * zoom)),
+            max(1, round(page.rect.height * zoom)),
+        )
+        image = base if zoom == max(zooms) else base.resize(target, Image.LANCZOS, reducing_gap=3.0)
+
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP' if fmt == 'webp' else 'JPEG', quality=quality)
+        images.append({'data': buffer.getvalue(), 'width': image.width, 'height': image.height})
+
+    return {'page': index, 'sizes': images}
+
+
+def tile_levels(width: float, height: float, tile_size: int = TILE_SIZE,
+                max_zoom: float = TILE_MAX_ZOOM) -> dict:
+    """
+    Describe the deep-zoom pyramid of a page.
+
+    Follows the Deep Zoom layout: the last level is the page at max_zoom,
+    each level above halves it (rounding up), down to a single pixel.
+
+    Args:
+        width, height: Displayed page size in points
+    """
+    full_width = max(1, math.ceil(width * max_zoom))
+    full_height = max(1, math.ceil(height * max_zoom))
+    return {
+        'width': full_width,
+        'height': full_height,
+        'tile_size': tile_size,
+        'overlap': 0,
+        'levels': math.ceil(math.log2(max(full_width, full_height))) + 1,
+    }
+
+
+def _render_tile(doc, index: int, tile: tuple, tile_size: int = TILE_SIZE,
+                 max_zoom: float = TILE_MAX_ZOOM, fmt: str = 'jpeg', quality: int = 80) -> dict:
+    """Render one pyramid tile of a page using a clip rectangle."""
+    import fitz
+
+    level, col, row = tile
+    page = doc[index]
+    pyramid = tile_levels(page.rect.width, page.rect.height, tile_size, max_zoom)
+
+    if not 0 <= level < pyramid['levels']:
+        raise IndexError(f"Level {level} not in pyramid")
+
+    shrink = 2 ** (pyramid['levels'] - 1 - level)
+    level_width = math.ceil(pyramid['width'] / shrink)
+    level_height = math.ceil(pyramid['height'] / shrink)
+
+    x0, y0 = col * tile_size, row * tile_size
+    if col < 0 or row < 0 or x0 >= level_width or y0 >= level_height:
+        raise IndexError(f"Tile {col}_{row} not in level {level}")
+    x1, y1 = min(x0 + tile_size, level_width), min(y0 + tile_size, level_height)
+
+    # Clip coordinates are in displayed page space, so rotation is handled
+    scale_x = level_width / page.rect.width
+    scale_y = level_height / page.rect.height
+    clip = fitz.Rect(x0 / scale_x, y0 / scale_y, x1 / scale_x, y1 / scale_y)
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(scale_x, scale_y), clip=clip, alpha=False)
+    if fmt == 'webp':
+        import io
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.frombytes('RGB', (pix.width, pix.height), pix.samples).save(buffer, 'WEBP', quality=quality)
+        data = buffer.getvalue()
+    else:
+        data = pix.tobytes('jpeg', jpg_quality=quality)
+
+    return {'page': index, 'tile': tile, 'data': data, 'width': pix.width, 'height': pix.height}
+
+
+def _render(key: str, data: bytes, pages: list, options: dict):
+    """
+    Render pages of a cached document, opening it from data when given.
+
+    Returns None when the document is not cached and no data was sent.
+    """
+    cache = _local_cache()
+    doc = cache.get(key)
+    if doc is None:
+        if data is None:
+            return None
+        doc = cache.put(key, data)
+
+    if pages is None:
+        pages = range(doc.page_count)
+
+    if 'tile' in options:
+        render = _render_tile
+    elif 'sizes' in options:
+        render = _render_sizes
+    else:
+        render = _render_page
+    return {
+        'page_count': doc.page_count,
+        'pages': [render(doc, index, **options) for index in pages],
+    }
+
+
+class RenderService:
+    """Routes page renders to the process that holds the document."""
+
+    _shards = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _pool_for(cls, key: str):
+        with cls._lock:
+            if cls._shards is None:
+                cls._shards = [None] * default_workers(DEFAULT_WORKERS)
+                atexit.register(cls.shutdown)
+
+            shard = int(hashlib.md5(key.encode()).hexdigest()[:8], 16) % len(cls._shards)
+            if cls._shards[shard] is None:
+                cls._shards[shard] = ProcessPoolExecutor(max_workers=1)
+            return shard, cls._shards[shard]
+
+    @classmethod
+    def _reset_shard(cls, shard: int):
+        with cls._lock:
+            pool, cls._shards[shard] = cls._shards[shard], None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            shards, cls._shards = cls._shards or [], None
+        for pool in filter(None, shards):
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def render_pages(cls, key: str, loader, pages: list = None, **options) -> dict:
+        """
+        Rasterize pages of a PDF.
+
+        Args:
+            key: Content hash identifying the document
+            loader: Callable returning the PDF bytes, only called on a cache miss
+            pages: 0-indexed page numbers, or None for every page
+            **options: zoom, fit=(w, h), dpi, fmt ('png'/'jpeg'/...), quality;
+                or sizes=[(w, h), ...] with fmt 'webp'/'jpeg' to get every
+                size from a single render; or tile=(level, col, row) for one
+                deep-zoom tile
+
+        Returns:
+            dict: {page_count, pages: [{page, data, width, height}, ...]},
+                each page holding {page, sizes: [...]} instead when sizes is given
+        """
+        pages = None if pages is None else list(pages)
+
+        if can_fork():
+            shard, pool = cls._pool_for(key)
+            try:
+                result = pool.submit(_render, key, None, pages, options).result()
+                if result is None:
+                    logger.debug(f"Render:MISS key={key} shard={shard}")
+                    result = pool.submit(_render, key, loader(), pages, options).result()
+                return result
+            except BrokenProcessPool as e:
+                # A crashed render process takes its cache with it; the next
+                # request for this shard starts a fresh one
+                logger.warning(f"Render:POOL_UNAVAILABLE shard={shard} error={e}, rendering in process")
+                cls._reset_shard(shard)
+
+        result = _render(key, None, pages, options)
+        if result is None:
+            result = _render(key, loader(), pages, options)
+        return result
+
+
+def preview_format() -> str:
+    """WebP when Pillow was built with it, JPEG otherwise."""
+    from PIL import features
+
+    return 'webp' if features.check('webp') else 'jpeg'
+
+
+def content_key(data: bytes) -> str:
+    """Cache key for documents that arrive without a stored hash."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def record_key(record) -> str:
+    """Cache key for a stored file: its content hash, or id and version when unhashed."""
+    return record.sha256_hash or f"file:{record.id}:v{record.version}"
+
+
+def render_pages(key: str, loader, pages: list = None, **options) -> dict:
+    """Convenience function."""
+    return RenderService.render_pages(key, loader, pages, **options)
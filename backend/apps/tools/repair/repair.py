@@ -0,0 +1,298 @@
+"""
+PDF Repair Tool
+Pure transformation - no Django, no DB.
+
+Cheap diagnostics run first (header, trailer, xref, stream decoding). Repair
+then escalates pikepdf -> PyMuPDF clean save -> Ghostscript re-render,
+stopping at the first tier whose output validates. Diagnostics and each
+tier run in a child process under their own time budget, also inside Celery
+workers, so a hung parser cannot eat the budget of the next tier.
+"""
+import os
+import re
+import shutil
+import subprocess
+import time
+import logging
+
+from apps.tools.parallel import run_in_child
+
+logger = logging.getLogger(__name__)
+
+
+TIERS = ('pikepdf', 'pymupdf', 'ghostscript')
+
+# Seconds per tier
+DEFAULT_BUDGETS = {
+    'pikepdf': 30,
+    'pymupdf': 60,
+    'ghostscript': 300,
+}
+
+# Seconds for parsing the input during diagnostics
+DIAGNOSE_BUDGET = 30
+
+# Legacy RepairWorker type names
+TIER_ALIASES = {
+    'basic': 'pymupdf',
+}
+
+TAIL_BYTES = 4096
+MAX_REPORTED_PROBLEMS = 20
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DIAGNOSTICS
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _check_trailer(input_path: str) -> dict:
+    """Inspect the header, trailing %%EOF and startxref offset without parsing."""
+    size = os.path.getsize(input_path)
+
+    with open(input_path, 'rb') as f:
+        head = f.read(1024)
+        f.seek(max(0, size - TAIL_BYTES))
+        tail = f.read()
+
+        header_offset = head.find(b'%PDF-')
+        startxref = re.findall(rb'startxref\s+(\d+)', tail)
+        xref_offset = int(startxref[-1]) if startxref else None
+
+        xref_target_ok = False
+        if xref_offset is not None and 0 <= xref_offset < size:
+            f.seek(xref_offset)
+            # Classic xref table or a cross-reference stream object
+            xref_target_ok = bool(re.match(rb'\s*(xref|\d+\s+\d+\s+obj)', f.read(32)))
+
+    return {
+        'size_bytes': size,
+        'header_ok': header_offset == 0,
+        'header_offset': header_offset,
+        'eof_marker': b'%%EOF' in tail,
+        'startxref_ok': xref_target_ok,
+    }
+
+
+def _parse_checks(input_path: str) -> dict:
+    """Open the input with pikepdf and PyMuPDF. Runs in a child process."""
+    import fitz
+    import pikepdf
+
+    report = {'pikepdf_opens': False, 'xref_warnings': [], 'stream_errors': [], 'page_count': 0}
+
+    try:
+        with pikepdf.open(input_path) as pdf:
+            report['pikepdf_opens'] = True
+            report['page_count'] = len(pdf.pages)
+            report['xref_warnings'] = [str(w) for w in pdf.get_warnings()[:MAX_REPORTED_PROBLEMS]]
+            report['stream_errors'] = [str(e) for e in pdf.check_pdf_syntax()[:MAX_REPORTED_PROBLEMS]]
+    except Exception as e:
+        report['open_error'] = str(e)
+
+    # Best page count any parser can see in the damaged input
+    report['recoverable_pages'] = report['page_count']
+    try:
+        with fitz.open(input_path) as doc:
+            report['recoverable_pages'] = max(report['page_count'], doc.page_count)
+    except Exception:
+        pass
+
+    return report
+
+
+def diagnose(input_path: str, budget: int = DIAGNOSE_BUDGET) -> dict:
+    """
+    Run cheap structural checks. Parsing runs under its own time budget;
+    an input that cannot be parsed within it counts as unreadable.
+
+    Returns:
+        dict: trailer checks plus {pikepdf_opens, xref_warnings, stream_errors,
+              page_count, recoverable_pages, severity}
+    """
+    report = _check_trailer(input_path)
+
+    try:
+        report.update(run_in_child(_parse_checks, (input_path,), budget))
+    except Exception as e:
+        report.update({
+            'pikepdf_opens': False, 'xref_warnings': [], 'stream_errors': [],
+            'page_count': 0, 'recoverable_pages': 0,
+            'open_error': f"diagnostics {e}" if isinstance(e, TimeoutError) else str(e),
+        })
+
+    if not report['pikepdf_opens']:
+        report['severity'] = 'unreadable'
+    elif report['stream_errors']:
+        report['severity'] = 'damaged_streams'
+    elif report['xref_warnings'] or not (report['eof_marker'] and report['startxref_ok']):
+        report['severity'] = 'damaged_structure'
+    elif not report['header_ok']:
+        report['severity'] = 'damaged_header'
+    else:
+        report['severity'] = 'healthy'
+
+    return report
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TIERS
+# Each writes output_path; raising means the tier failed.
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _repair_pikepdf(input_path: str, output_path: str, budget: int):
+    import pikepdf
+
+    with pikepdf.open(input_path) as pdf:
+        pdf.remove_unreferenced_resources()
+        pdf.save(output_path, fix_metadata_version=True)
+
+
+def _repair_pymupdf(input_path: str, output_path: str, budget: int):
+    import fitz
+
+    with fitz.open(input_path) as doc:
+        if not doc.page_count:
+            raise ValueError("No pages recovered")
+        doc.save(output_path, garbage=4, deflate=True, clean=True)
+
+
+def _repair_ghostscript(input_path: str, output_path: str, budget: int):
+    result = subprocess.run([
+        'gs', '-o', output_path, '-sDEVICE=pdfwrite',
+        '-dPDFSETTINGS=/prepress',
+        input_path
+    ], capture_output=True, text=True, timeout=budget)
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Ghostscript error: {result.stderr.strip()[:500]}")
+
+
+TIER_FUNCTIONS = {
+    'pikepdf': _repair_pikepdf,
+    'pymupdf': _repair_pymupdf,
+    'ghostscript': _repair_ghostscript,
+}
+
+
+def _run_tier(tier: str, input_path: str, output_path: str, budget: int):
+    """
+    Run one tier under its time budget.
+
+    Ghostscript already runs as a subprocess with a timeout. The library
+    tiers run in a single-use child that is killed when the budget runs out.
+    """
+    if tier == 'ghostscript':
+        TIER_FUNCTIONS[tier](input_path, output_path, budget)
+        return
+
+    try:
+        run_in_child(TIER_FUNCTIONS[tier], (input_path, output_path, budget), budget)
+    except TimeoutError:
+        raise TimeoutError(f"{tier} exceeded {budget}s budget")
+
+
+def _validate(output_path: str, expected_pages: int, check_streams: bool) -> str:
+    """
+    Check a tier's output.
+
+    Returns:
+        str: Empty when valid, otherwise the reason it was rejected
+    """
+    import fitz
+    import pikepdf
+
+    if not os.path.exists(output_path) or not os.path.getsize(output_path):
+        return 'empty output'
+
+    with fitz.open(output_path) as doc:
+        if doc.is_repaired:
+            return 'output still needs repair'
+        if not doc.page_count:
+            return 'no pages'
+        if doc.page_count < expected_pages:
+            return f'lost pages ({doc.page_count} of {expected_pages})'
+
+    if check_streams:
+        with pikepdf.open(output_path) as pdf:
+            problems = pdf.check_pdf_syntax()
+        if problems:
+            return f'{len(problems)} stream errors remain'
+
+    return ''
+
+
+def repair(input_path: str, output_path: str, mode: str = 'auto', budgets: dict = None, **parameters) -> dict:
+    """
+    Repair a PDF with the cheapest tier that produces a valid file.
+
+    Args:
+        input_path: Path to input PDF
+        output_path: Path for repaired PDF
+        mode: 'auto' to escalate through TIERS, or a single tier name to force it
+        budgets: Per-tier (and 'diagnose') time budget overrides in seconds
+
+    Returns:
+        dict: {success, tier, attempts, diagnostics, page_count}
+    """
+    mode = TIER_ALIASES.get(mode, mode)
+    budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+    attempts = []
+    diagnostics = {}
+
+    try:
+        if mode != 'auto' and mode not in TIERS:
+            raise ValueError(f"Unknown repair mode '{mode}'. Use 'auto' or one of: {', '.join(TIERS)}")
+
+        diagnostics = diagnose(input_path, budgets.get('diagnose', DIAGNOSE_BUDGET))
+        expected_pages = diagnostics['recoverable_pages']
+        check_streams = bool(diagnostics['stream_errors'])
+
+        if mode != 'auto':
+            tiers = [mode]
+        elif diagnostics['severity'] == 'unreadable':
+            # pikepdf already failed to open it during diagnostics
+            tiers = ['pymupdf', 'ghostscript']
+        else:
+            tiers = list(TIERS)
+
+        candidate = f"{output_path}.candidate"
+        for tier in tiers:
+            started = time.monotonic()
+            attempt = {'tier': tier, 'budget_seconds': budgets[tier]}
+            try:
+                _run_tier(tier, input_path, candidate, budgets[tier])
+                rejection = _validate(candidate, expected_pages, check_streams)
+                attempt['status'] = 'rejected' if rejection else 'succeeded'
+                if rejection:
+                    attempt['error'] = rejection
+            except Exception as e:
+                attempt['status'] = 'timeout' if isinstance(e, (TimeoutError, subprocess.TimeoutExpired)) else 'failed'
+                attempt['error'] = str(e)
+            attempt['seconds'] = round(time.monotonic() - started, 3)
+            attempts.append(attempt)
+
+            logger.info(f"Repair:TIER tier={tier} status={attempt['status']} seconds={attempt['seconds']}")
+
+            if attempt['status'] == 'succeeded':
+                shutil.move(candidate, output_path)
+                return {
+                    'success': True,
+                    'tier': tier,
+                    'attempts': attempts,
+                    'diagnostics': diagnostics,
+                    'page_count': expected_pages,
+                }
+
+        if os.path.exists(candidate):
+            os.unlink(candidate)
+        raise RuntimeError("All repair tiers failed")
+
+    except Exception as e:
+        logger.error(f"Repair failed: {e}")
+        return {
+            'success': False,
+            'message': str(e),
+            'tier': None,
+            'attempts': attempts,
+            'diagnostics': diagnostics,
+        }
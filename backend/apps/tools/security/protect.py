@@ -12,8 +12,8 @@ def protect(input_path: str, output_path: str, password: str, permissions: dict
     Add password protection to PDF.
     
     Args:
-        input_path: Path to input PDF
-        output_path: Path for protected PDF
+        input_path: Path or file object of the input PDF
+        output_path: Path or writable file object for the protected PDF
         password: User password required to open
         permissions: {allow_printing: bool, allow_copying: bool}
         
@@ -21,24 +21,17 @@ def protect(input_path: str, output_path: str, password: str, permissions: dict
         dict: {success, encrypted}
     """
     try:
-        import pikepdf
+        from apps.tools import backends
         
-        perms = pikepdf.Permissions(
-            print_lowres=permissions.get('allow_printing', True) if permissions else True,
-            print_highres=permissions.get('allow_printing', True) if permissions else True,
-            extract=permissions.get('allow_copying', False) if permissions else False,
+        permissions = permissions or {}
+        backends.encrypt(
+            input_path,
+            output_path,
+            user_password=password,
+            allow_printing=permissions.get('allow_printing', True),
+            allow_copying=permissions.get('allow_copying', False),
         )
         
-        with pikepdf.open(input_path) as pdf:
-            pdf.save(
-                output_path,
-                encryption=pikepdf.Encryption(
-                    user=password,
-                    owner=password,
-                    allow=perms
-                )
-            )
-        
         logger.info(f"Protected PDF: {output_path}")
         
         return {'success': True, 'encrypted': True}
@@ -55,17 +48,16 @@ def unlock(input_path: str, output_path: str, password: str, **parameters) -> di
     Returns:
         dict: {success, decrypted}
     """
+    from apps.tools import backends
+    
     try:
-        import pikepdf
-        
-        with pikepdf.open(input_path, password=password) as pdf:
-            pdf.save(output_path)
+        backends.decrypt(input_path, output_path, password)
         
         logger.info(f"Unlocked PDF: {output_path}")
         
         return {'success': True, 'decrypted': True}
         
-    except pikepdf.PasswordError:
+    except backends.PasswordError:
         return {'success': False, 'message': 'Incorrect password'}
     except Exception as e:
         logger.error(f"Unlock failed: {e}")
@@ -0,0 +1,385 @@
+"""
+PDF Redaction Engine
+Pure transformation - no Django, no DB.
+
+Each page's words are extracted once into an in-memory index. Literal terms,
+regexes and built-in pattern sets are compiled once and each is matched on
+its own over the indexed text, so overlapping matches of different rules are
+all found. Large documents are indexed in
+parallel page chunks; redactions are then applied once per affected page.
+A match covering part of a word is boxed from the page's glyph boxes.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+import bisect
+import re
+import logging
+
+from apps.tools.parallel import map_chunks, page_chunks
+
+logger = logging.getLogger(__name__)
+
+
+PATTERN_SETS = {
+    'email': r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}",
+    # A leading +country code, a (area code) or separated digit groups; a bare
+    # run of digits is more often an invoice or order number than a phone
+    'phone': (
+        r"(?<![\w+])(?:"
+        r"\+\d{1,3}[\s.-]?(?:\(\d{1,4}\)[\s.-]?)?\d{1,4}(?:[\s.-]?\d{2,4}){1,4}"
+        r"|\(\d{1,4}\)[\s.-]?\d{2,4}(?:[\s.-]?\d{2,4}){1,3}"
+        r"|\d{2,4}(?:[\s.-]\d{2,4}){2,4}"
+        r")(?!\w)"
+    ),
+    'iban': r"\b[A-Z]{2}\d{2} ?(?:[A-Z0-9]{4} ?){2,7}[A-Z0-9]{1,4}\b",
+}
+
+PARALLEL_PAGE_THRESHOLD = 40
+PAGES_PER_CHUNK = 25
+
+
+@dataclass(frozen=True)
+class RedactionRule:
+    """A single thing to search for."""
+    label: str
+    kind: str  # 'term', 'regex' or 'pattern'
+    source: str
+    pages: frozenset = None  # 0-indexed pages, None = all pages
+
+
+def _iban_is_valid(value: str) -> bool:
+    """ISO 13616 mod-97 checksum."""
+    compact = value.replace(' ', '')
+    rearranged = compact[4:] + compact[:4]
+    digits = ''.join(str(int(ch, 36)) for ch in rearranged)
+    return int(digits) % 97 == 1
+
+
+def _phone_is_valid(value: str) -> bool:
+    """7 to 15 digits (E.164), and not an ISO date."""
+    digits = sum(ch.isdigit() for ch in value)
+    return 7 <= digits <= 15 and not re.fullmatch(r"\d{4}-\d{2}-\d{2}", value)
+
+
+VALIDATORS = {
+    'iban': _iban_is_valid,
+    'phone': _phone_is_valid,
+}
+
+
+def build_rules(terms=None, regexes=None, pattern_sets=None, case_sensitive: bool = False) -> list:
+    """
+    Normalise request input into a list of RedactionRule.
+
+    Args:
+        terms: List of strings or {'text', 'page'} dicts (page is 1-indexed)
+        regexes: List of regular expression strings
+        pattern_sets: Names from PATTERN_SETS
+        case_sensitive: Match literal terms case-sensitively
+
+    Raises:
+        ValueError: On an unknown pattern set or invalid regex
+    """
+    rules = []
+
+    for term in terms or []:
+        page = None
+        if isinstance(term, dict):
+            page = term.get('page')
+            term = term.get('text', '')
+        if not term:
+            continue
+        source = re.escape(term) if case_sensitive else f"(?i:{re.escape(term)})"
+        pages = frozenset([int(page) - 1]) if page else None
+        rules.append(RedactionRule(label=term, kind='term', source=source, pages=pages))
+
+    for expression in regexes or []:
+        try:
+            re.compile(expression)
+        except re.error as e:
+            raise ValueError(f"Invalid regex '{expression}': {e}")
+        rules.append(RedactionRule(label=expression, kind='regex', source=expression))
+
+    for name in pattern_sets or []:
+        if name not in PATTERN_SETS:
+            raise ValueError(f"Unknown pattern set '{name}'. Available: {', '.join(PATTERN_SETS)}")
+        rules.append(RedactionRule(label=name, kind='pattern', source=PATTERN_SETS[name]))
+
+    return rules
+
+
+@lru_cache(maxsize=64)
+def _compile(rules: tuple) -> tuple:
+    """
+    Compile every rule on its own. A single alternation would report only
+    the first of two overlapping matches, e.g. a term that starts an email
+    address, and leave the rest of the other match unredacted.
+    """
+    return tuple((rule, re.compile(rule.source)) for rule in rules)
+
+
+class PageIndex:
+    """Page text with character offsets mapped back to word boxes."""
+
+    def __init__(self, words: list, load_page=None):
+        """
+        Args:
+            words: PyMuPDF word boxes of the page
+            load_page: Callable returning the fitz page, for glyph boxes of
+                       partially matched words; without it they are covered whole
+        """
+        self.words = words
+        self._load_page = load_page
+        self._glyphs = None
+        self.starts = []
+        parts = []
+        offset = 0
+        previous_line = None
+
+        for word in words:
+            line_key = (word[5], word[6])
+            if parts:
+                separator = ' ' if line_key == previous_line else '\n'
+                parts.append(separator)
+                offset += 1
+            self.starts.append(offset)
+            parts.append(word[4])
+            offset += len(word[4])
+            previous_line = line_key
+
+        self.text = ''.join(parts)
+
+    def glyphs(self) -> list:
+        """Non-blank characters of the page as (bbox, char), read once on demand."""
+        if self._glyphs is None:
+            self._glyphs = []
+            page = self._load_page() if self._load_page else None
+            if page is not None:
+                for block in page.get_text('rawdict')['blocks']:
+                    for line in block.get('lines', []):
+                        for span in line['spans']:
+                            self._glyphs.extend(
+                                (char['bbox'], char['c']) for char in span['chars'] if not char['c'].isspace()
+                            )
+        return self._glyphs
+
+    def part_of_word(self, word, char_from: int, char_to: int):
+        """
+        Box of characters [char_from, char_to) of a word from its glyph boxes.
+
+        Returns:
+            tuple or None: None when the glyphs do not spell the word (rotated
+                           text, ligatures), so the caller covers the whole word
+        """
+        x0, y0, x1, y1, text = word[:5]
+        inside = sorted(
+            (glyph for glyph in self.glyphs()
+             if x0 <= (glyph[0][0] + glyph[0][2]) / 2 <= x1 and y0 <= (glyph[0][1] + glyph[0][3]) / 2 <= y1),
+            key=lambda glyph: glyph[0][0],
+        )
+        if ''.join(char for _, char in inside) != text:
+            return None
+        boxes = [bbox for bbox, _ in inside[char_from:char_to]]
+        return (min(b[0] for b in boxes), y0, max(b[2] for b in boxes), y1)
+
+    def rects_for_span(self, start: int, end: int) -> list:
+        """Return one rectangle per text line covered by [start, end)."""
+        lines = {}
+        i = max(0, bisect.bisect_right(self.starts, start) - 1)
+
+        while i < len(self.words) and self.starts[i] < end:
+            x0, y0, x1, y1, text, block, line = self.words[i][:7]
+            word_start = self.starts[i]
+            char_from = max(start, word_start) - word_start
+            char_to = min(end, word_start + len(text)) - word_start
+
+            if char_to > char_from and text:
+                rect = (x0, y0, x1, y1)
+                if char_to - char_from < len(text):
+                    # Glyph widths vary, so only real glyph boxes are safe here
+                    rect = self.part_of_word(self.words[i], char_from, char_to) or rect
+                key = (block, line)
+                if key in lines:
+                    prev = lines[key]
+                    rect = (min(prev[0], rect[0]), min(prev[1], rect[1]), max(prev[2], rect[2]), max(prev[3], rect[3]))
+                lines[key] = rect
+            i += 1
+
+        return list(lines.values())
+
+
+def _match_page(index: PageIndex, rules: tuple) -> list:
+    """Run every rule over one page index; overlapping matches are all kept."""
+    found = []
+
+    def _record(rule, match):
+        value = match.group(0)
+        if not value.strip():
+            return
+        validator = VALIDATORS.get(rule.label) if rule.kind == 'pattern' else None
+        if validator and not validator(value):
+            return
+        rects = index.rects_for_span(match.start(), match.end())
+        if rects:
+            found.append({'rule': rule.label, 'kind': rule.kind, 'text': value, 'rects': rects})
+
+    for rule, pattern in _compile(rules):
+        for match in pattern.finditer(index.text):
+            _record(rule, match)
+
+    return found
+
+
+def _index_chunk(task: tuple) -> dict:
+    """
+    Index and match a page range. Runs in a pool worker.
+
+    Pages are parsed from the file unless their words were extracted already;
+    the file is then only opened for glyph boxes of partially matched words.
+    """
+    import fitz
+
+    input_path, start, stop, rules, chunk_words = task
+    results = {}
+
+    doc = fitz.open(input_path) if chunk_words is None else None
+
+    def load_page(page_no):
+        nonlocal doc
+        if doc is None:
+            doc = fitz.open(input_path)
+        return doc[page_no]
+
+    try:
+        for page_no in range(start, stop):
+            page_rules = tuple(r for r in rules if r.pages is None or page_no in r.pages)
+            if not page_rules:
+                continue
+            if chunk_words is not None:
+                words = chunk_words[page_no - start]
+            else:
+                words = doc[page_no].get_text('words', sort=False)
+            index = PageIndex(words, load_page=lambda page_no=page_no: load_page(page_no))
+            matches = _match_page(index, page_rules)
+            if matches:
+                results[page_no] = matches
+    finally:
+        if doc is not None:
+            doc.close()
+
+    return results
+
+
+def find_matches(input_path: str, rules: list, page_count: int, max_workers: int = None,
+                 page_words: list = None) -> dict:
+    """
+    Locate every rule match in the document.
+
+    Args:
+        page_words: Word boxes of every page (text_extraction 'words' mode),
+            so the file is not parsed again
+
+    Returns:
+        dict: {page_index: [{rule, kind, text, rects}, ...]}
+    """
+    if not rules or not page_count:
+        return {}
+
+    rules = tuple(rules)
+    chunk_size = page_count if page_count < PARALLEL_PAGE_THRESHOLD else PAGES_PER_CHUNK
+    tasks = [
+        (input_path, start, stop, rules, None if page_words is None else page_words[start:stop])
+        for start, stop in page_chunks(page_count, chunk_size)
+    ]
+
+    matches = {}
+    for chunk_result in map_chunks(_index_chunk, tasks, max_workers=max_workers):
+        matches.update(chunk_result)
+    return matches
+
+
+def redact(input_path: str, output_path: str, terms: list = None, regexes: list = None,
+           pattern_sets: list = None, areas: list = None, case_sensitive: bool = False,
+           fill: tuple = (0, 0, 0), max_workers: int = None, page_words: list = None,
+           **parameters) -> dict:
+    """
+    Redact literal terms, regex matches, pattern sets and fixed areas.
+
+    Args:
+        input_path: Path to input PDF
+        output_path: Path for redacted PDF
+        terms: Literal strings, or {'text', 'page'} dicts scoped to one page
+        regexes: Regular expressions matched against page text
+        pattern_sets: Built-in sets, any of PATTERN_SETS ('email', 'phone', 'iban')
+        areas: [{'page': 1, 'rect': [x0, y0, x1, y1]}, ...]
+        case_sensitive: Match literal terms case-sensitively
+        fill: RGB fill colour (0-1 range)
+        max_workers: Upper bound on indexing processes
+        page_words: Word boxes of every page, e.g. from the text cache
+
+    Returns:
+        dict: {success, pages_scanned, pages_redacted, total_matches, counts, matches}
+    """
+    try:
+        import fitz
+
+        rules = build_rules(terms, regexes, pattern_sets, case_sensitive)
+
+        with fitz.open(input_path) as doc:
+            page_count = len(doc)
+
+        if page_words is not None and len(page_words) != page_count:
+            page_words = None
+        matches = find_matches(input_path, rules, page_count, max_workers=max_workers, page_words=page_words)
+
+        doc = fitz.open(input_path)
+        try:
+            pending = {}
+            for page_no, page_matches in matches.items():
+                for match in page_matches:
+                    pending.setdefault(page_no, []).extend(match['rects'])
+
+            for area in areas or []:
+                page_no = int(area.get('page', 1)) - 1
+                if 0 <= page_no < page_count and area.get('rect'):
+                    pending.setdefault(page_no, []).append(tuple(area['rect']))
+
+            for page_no in sorted(pending):
+                page = doc[page_no]
+                for rect in pending[page_no]:
+                    page.add_redact_annot(fitz.Rect(rect), fill=fill)
+                page.apply_redactions()
+
+            doc.save(output_path, garbage=4, deflate=True)
+        finally:
+            doc.close()
+
+        report = []
+        counts = {}
+        for page_no in sorted(matches):
+            for match in matches[page_no]:
+                counts[match['rule']] = counts.get(match['rule'], 0) + 1
+                report.append({
+                    'page': page_no + 1,
+                    'rule': match['rule'],
+                    'kind': match['kind'],
+                    'text': match['text'],
+                    'rects': [[round(v, 2) for v in rect] for rect in match['rects']],
+                })
+
+        logger.info(f"Redacted PDF: {len(report)} matches on {len(pending)} of {page_count} pages")
+
+        return {
+            'success': True,
+            'pages_scanned': page_count,
+            'pages_redacted': len(pending),
+            'total_matches': len(report),
+            'counts': counts,
+            'matches': report,
+        }
+
+    except (ValueError, re.error) as e:
+        return {'success': False, 'code': 'invalid_rules', 'message': str(e)}
+    except Exception as e:
+        logger.error(f"Redaction failed: {e}")
+        return {'success': False, 'message': str(e)}
@@ -0,0 +1,203 @@
+"""
+URL Render Cache
+
+Caches URL-to-PDF renders keyed on the normalized URL plus render options,
+so many users printing the same public page within minutes cost one
+Chromium render.
+
+An entry is served as-is for URL_RENDER_CACHE_FRESH seconds. After that the
+page is revalidated with a conditional HEAD request (ETag / Last-Modified)
+and re-rendered only when it changed. Entries never outlive
+URL_RENDER_CACHE_TTL seconds, since a page can change through its assets
+without its own validators changing. Concurrent misses for the same key
+wait for a single render.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import ipaddress
+import json
+import socket
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+HEAD_TIMEOUT = 5  # seconds
+LOCK_TIMEOUT = 150  # seconds, longer than a Gotenberg render may take
+WAIT_POLL = 0.25  # seconds
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache keys: lowercase scheme and host,
+    no default port, no fragment, sorted query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+class URLRenderCache:
+    """Render-once cache for URL-to-PDF conversions."""
+
+    @staticmethod
+    def ttl() -> int:
+        return getattr(settings, 'URL_RENDER_CACHE_TTL', 600)
+
+    @staticmethod
+    def fresh_seconds() -> int:
+        return getattr(settings, 'URL_RENDER_CACHE_FRESH', 60)
+
+    @staticmethod
+    def cache_key(url: str, options: dict) -> str:
+        raw = json.dumps([normalize_url(url), options], sort_keys=True, default=str)
+        return f"url_render:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    @staticmethod
+    def _is_public(url: str) -> bool:
+        """Only revalidate against hosts on the public internet."""
+        if getattr(settings, 'URL_RENDER_CACHE_ALLOW_PRIVATE', False):
+            return True
+        try:
+            host = urlsplit(url).hostname
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, None)}
+            return all(ipaddress.ip_address(address).is_global for address in addresses)
+        except (OSError, ValueError):
+            return False
+
+    @classmethod
+    def _head(cls, url: str, entry: dict = None) -> dict:
+        """
+        Conditional HEAD request for the page.
+
+        Returns:
+            dict: {unchanged, etag, last_modified, cacheable}; unchanged is
+                  only True when the origin confirmed the entry's validators
+        """
+        import requests
+
+        result = {'unchanged': False, 'etag': None, 'last_modified': None, 'cacheable': True}
+        if not cls._is_public(url):
+            return result
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = requests.head(url, headers=headers, timeout=HEAD_TIMEOUT, allow_redirects=True)
+        except requests.RequestException as e:
+            logger.warning(f"URLRenderCache:HEAD_FAILED url={url} error={e}")
+            return result
+
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        result['cacheable'] = 'no-store' not in cache_control and 'private' not in cache_control
+
+        if response.status_code == 304:
+            result.update(unchanged=True, etag=entry.get('etag'), last_modified=entry.get('last_modified'))
+            return result
+        if response.status_code >= 400:
+            return result
+
+        result['etag'] = response.headers.get('ETag')
+        result['last_modified'] = response.headers.get('Last-Modified')
+
+        # Origins that ignore conditional headers still answer with the same validators
+        if entry and (result['etag'] or result['last_modified']):
+            result['unchanged'] = (
+                result['etag'] == entry.get('etag')
+                and result['last_modified'] == entry.get('last_modified')
+            )
+        return result
+
+    @classmethod
+    def render(cls, url: str, render, **options) -> tuple:
+        """
+        Return the PDF for a URL, rendering it only when needed.
+
+        Args:
+            url: Page to render
+            render: Callable producing the PDF bytes on a miss
+            **options: Render options; every one is part of the cache key
+
+        Returns:
+            tuple: (pdf_bytes, status) with status 'hit', 'revalidated', 'miss' or 'bypass'
+        """
+        ttl = cls.ttl()
+        if ttl <= 0:
+            return render(), 'bypass'
+
+        key = cls.cache_key(url, options)
+        entry = cache.get(key)
+
+        if entry is not None:
+            now = time.time()
+            if now - entry['validated_at'] < cls.fresh_seconds():
+                return entry['pdf'], 'hit'
+
+            head = cls._head(url, entry)
+            if head['unchanged'] and head['cacheable']:
+                entry['validated_at'] = now
+                remaining = int(ttl - (now - entry['rendered_at']))
+                if remaining > 0:
+                    cache.set(key, entry, remaining)
+                logger.info(f"URLRenderCache:REVALIDATED url={url}")
+                return entry['pdf'], 'revalidated'
+
+        lock_key = f"{key}:lock"
+        locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        if not locked:
+            waited = cls._wait_for_render(key, lock_key, since=entry['rendered_at'] if entry else 0)
+            if waited is not None:
+                return waited, 'hit'
+
+        try:
+            # Validators are read before rendering, so a change mid-render
+            # makes the next revalidation miss rather than serve stale output
+            head = cls._head(url)
+            rendered_at = time.time()
+            pdf = render()
+
+            if head['cacheable']:
+                cache.set(key, {
+                    'pdf': pdf,
+                    'etag': head['etag'],
+                    'last_modified': head['last_modified'],
+                    'rendered_at': rendered_at,
+                    'validated_at': rendered_at,
+                }, ttl)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+
+        logger.info(f"URLRenderCache:RENDERED url={url} bytes={len(pdf)} cached={head['cacheable']}")
+        return pdf, 'miss'
+
+    @staticmethod
+    def _wait_for_render(key: str, lock_key: str, since: float):
+        """
+        Wait for another worker's render of the same key.
+
+        Returns:
+            bytes or None: The new PDF, or None when the other render gave up
+        """
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_POLL)
+            entry = cache.get(key)
+            if entry is not None and entry['rendered_at'] > since:
+                return entry['pdf']
+            if cache.get(lock_key) is None:
+                return None
+        return None
@@ -57,37 +57,7 @@ class WatermarkService:
             doc = fitz.open(stream=pdf_bytes, filetype="pdf")
             
             for page in doc:
-                rect = page.rect
-                
-                # Calculate center position
-                center_x = rect.width / 2
-                center_y = rect.height / 2
-                
-                # Create rotation matrix
-                import math
-                rad = math.radians(angle)
-                
-                # Insert text with rotation
-                # Using shape for more control
-                text_width = len(text) * font_size * 0.5  # Approximate
-                
-                # Position for diagonal watermark
-                point = fitz.Point(
-                    center_x - text_width / 2,
-                    center_y
-                )
-                
-                # Add invisible watermark text (render mode 3 = invisible but selectable)
-                # For visible watermark, use render mode 0
-                page.insert_text(
-                    point,
-                    text,
-                    fontsize=font_size,
-                    color=color,
-                    rotate=angle,
-                    overlay=True,
-                    render_mode=0,  # Visible, filled
-                )
+                cls.watermark_page(page, text, font_size, color, angle)
             
             # Save to bytes
             output = io.BytesIO()
@@ -102,6 +72,53 @@ class WatermarkService:
             # Return original if watermarking fails
             return pdf_bytes
     
+    @classmethod
+    def watermark_page(
+        cls,
+        page,
+        text: str = None,
+        font_size: int = None,
+        color: tuple = None,
+        angle: int = None,
+    ):
+        """
+        Draw the diagonal watermark on a single page.
+        
+        Shared by add_watermark and the page-window pipeline, which
+        stamps pages one window at a time instead of the whole document.
+        """
+        text = text or cls.DEFAULT_TEXT
+        font_size = font_size or cls.DEFAULT_FONT_SIZE
+        color = color or cls.DEFAULT_COLOR
+        angle = cls.DEFAULT_ANGLE if angle is None else angle
+        
+        rect = page.rect
+        text_width = len(text) * font_size * 0.5  # Approximate
+        
+        # Position for diagonal watermark
+        point = fitz.Point(
+            rect.width / 2 - text_width / 2,
+            rect.height / 2
+        )
+        
+        # insert_text only rotates by multiples of 90; use a morph for
+        # arbitrary angles, pivoting on the page centre
+        if angle % 90 == 0:
+            rotate, morph = angle % 360, None
+        else:
+            rotate, morph = 0, (fitz.Point(rect.width / 2, rect.height / 2), fitz.Matrix(-angle))
+        
+        page.insert_text(
+            point,
+            text,
+            fontsize=font_size,
+            color=color,
+            rotate=rotate,
+            morph=morph,
+            overlay=True,
+            render_mode=0,  # Visible, filled
+        )
+    
     @classmethod
     def add_corner_watermark(
         cls,
@@ -0,0 +1,139 @@
+"""
+Thumbnail Sprite Sheets
+Pure transformation - no Django, no DB.
+
+Renders every page at a small fixed height, in parallel page chunks, and
+packs the thumbnails row by row into a few sprite-sheet images with a
+coordinate map, so a page grid costs a handful of requests instead of one
+per page.
+"""
+import io
+import logging
+
+from apps.tools.parallel import iter_chunks, page_chunks
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_HEIGHT = 96
+MIN_HEIGHT = 32
+MAX_HEIGHT = 256
+MAX_ASPECT = 3          # very wide pages are squeezed to 3x the height
+SHEET_WIDTH = 2048
+SHEET_MAX_HEIGHT = 4096
+PAGES_PER_CHUNK = 25
+DEFAULT_QUALITY = 75
+
+
+def clamp_height(height) -> int:
+    return max(MIN_HEIGHT, min(int(height), MAX_HEIGHT))
+
+
+def _render_chunk(task: tuple) -> list:
+    """
+    Render a page range to raw RGB thumbnails. Runs in a pool worker.
+
+    Returns:
+        list: [(width, height, samples), ...]
+    """
+    import fitz
+
+    input_path, start, stop, height = task
+    thumbs = []
+
+    with fitz.open(input_path) as doc:
+        for page_no in range(start, stop):
+            page = doc[page_no]
+            zoom_y = height / page.rect.height
+            width = max(1, min(round(page.rect.width * zoom_y), height * MAX_ASPECT))
+            zoom_x = width / page.rect.width
+
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom_x, zoom_y), alpha=False)
+            thumbs.append((pix.width, pix.height, pix.samples))
+
+    return thumbs
+
+
+def build_sprite_sheets(input_path: str, height: int = DEFAULT_HEIGHT, fmt: str = 'webp',
+                        quality: int = DEFAULT_QUALITY, max_workers: int = None) -> dict:
+    """
+    Render all page thumbnails and pack them into sprite sheets.
+
+    Args:
+        input_path: PDF file
+        height: Thumbnail height in pixels, clamped to MIN_HEIGHT..MAX_HEIGHT
+        fmt: 'webp' or 'jpeg'
+        max_workers: Upper bound on render processes
+
+    Returns:
+        dict: {success, page_count, height, format, sheets: [bytes, ...],
+               pages: [{page, sheet, x, y, width, height}, ...]} with 1-based pages
+    """
+    try:
+        import fitz
+        from PIL import Image
+
+        height = clamp_height(height)
+
+        with fitz.open(input_path) as doc:
+            page_count = doc.page_count
+        if not page_count:
+            raise ValueError("PDF has no pages")
+
+        tasks = [(input_path, start, stop, height) for start, stop in page_chunks(page_count, PAGES_PER_CHUNK)]
+
+        rows_per_sheet = max(1, SHEET_MAX_HEIGHT // height)
+        sheets, pages = [], []
+        sheet, x, row = None, 0, 0
+
+        def finish(sheet, rows):
+            # Trim the unused rows of the last sheet before encoding
+            sheet = sheet.crop((0, 0, SHEET_WIDTH, rows * height))
+            buffer = io.BytesIO()
+            sheet.save(buffer, 'WEBP' if fmt == 'webp' else 'JPEG', quality=quality)
+            return buffer.getvalue()
+
+        page_no = 0
+        for chunk in iter_chunks(_render_chunk, tasks, max_workers=max_workers):
+            for width, thumb_height, samples in chunk:
+                page_no += 1
+                thumb = Image.frombytes('RGB', (width, thumb_height), samples)
+                if thumb_height > height:
+                    # Rounding in the render can add a pixel row
+                    thumb = thumb.crop((0, 0, width, height))
+
+                if sheet is not None and x + width > SHEET_WIDTH:
+                    x, row = 0, row + 1
+                if sheet is None or row == rows_per_sheet:
+                    if sheet is not None:
+                        sheets.append(finish(sheet, rows_per_sheet))
+                    sheet = Image.new('RGB', (SHEET_WIDTH, rows_per_sheet * height), 'white')
+                    x, row = 0, 0
+
+                sheet.paste(thumb, (x, row * height))
+                pages.append({
+                    'page': page_no,
+                    'sheet': len(sheets),
+                    'x': x,
+                    'y': row * height,
+                    'width': thumb.width,
+                    'height': thumb.height,
+                })
+                x += width
+
+        sheets.append(finish(sheet, row + 1))
+
+        logger.info(f"Built {len(sheets)} sprite sheets for {page_count} pages at {height}px")
+
+        return {
+            'success': True,
+            'page_count': page_count,
+            'height': height,
+            'format': fmt,
+            'sheets': sheets,
+            'pages': pages,
+        }
+
+    except Exception as e:
+        logger.error(f"Sprite sheet generation failed: {e}")
+        return {'success': False, 'message': str(e)}
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+import fitz
+from django.test import SimpleTestCase
+
+from apps.tools.security.redact import redact
+
+
+class OverlappingRuleTests(SimpleTestCase):
+    """Every rule is matched on its own, so overlapping matches are all redacted."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.input_path = os.path.join(tmp.name, 'input.pdf')
+        self.output_path = os.path.join(tmp.name, 'output.pdf')
+
+    def redacted_text(self, text, **rules):
+        with fitz.open() as doc:
+            doc.new_page().insert_text((72, 72), text)
+            doc.save(self.input_path)
+
+        result = redact(self.input_path, self.output_path, **rules)
+        self.assertTrue(result['success'], result)
+        with fitz.open(self.output_path) as doc:
+            return doc[0].get_text('text'), result
+
+    def test_overlapping_terms(self):
+        text, result = self.redacted_text("Contact John Smith today", terms=['John', 'John Smith'])
+
+        self.assertNotIn('John', text)
+        self.assertNotIn('Smith', text)
+        self.assertEqual(result['counts'], {'John': 1, 'John Smith': 1})
+
+    def test_term_inside_regex_match(self):
+        text, result = self.redacted_text("Ref ACC-1234-XY closed", terms=['1234'], regexes=[r'ACC-\d+-[A-Z]+'])
+
+        self.assertNotIn('ACC', text)
+        self.assertNotIn('XY', text)
+        self.assertIn('closed', text)
+        self.assertEqual(result['total_matches'], 2)
+
+    def test_term_prefixing_pattern_set_match(self):
+        text, _ = self.redacted_text(
+            "Contact John Smith at john@example.com today",
+            terms=['John', 'John Smith'], pattern_sets=['email'],
+        )
+
+        self.assertNotIn('Smith', text)
+        self.assertNotIn('example', text)
+        self.assertIn('Contact', text)
+        self.assertIn('today', text)
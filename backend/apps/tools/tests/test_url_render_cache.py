@@ -0,0 +1,178 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.tools.converters.gotenberg_converter import convert_url_to_pdf_gotenberg
+from apps.tools.services.url_render_cache import URLRenderCache, normalize_url
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    """Fixture site: /page carries an ETag, /private must not be cached."""
+    version = 1
+    heads = []
+
+    def _respond(self, body: bool):
+        etag = f'"v{OriginHandler.version}"'
+        if self.path.startswith('/private'):
+            self.send_response(200)
+            self.send_header('Cache-Control', 'private, no-store')
+        elif self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html')
+        self.end_headers()
+        if body:
+            self.wfile.write(f"<h1>Version {OriginHandler.version}</h1>".encode())
+
+    def do_HEAD(self):
+        OriginHandler.heads.append(dict(self.headers))
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def log_message(self, *args):
+        pass
+
+
+class GotenbergHandler(BaseHTTPRequestHandler):
+    """Stand-in for Gotenberg's Chromium URL route; counts renders."""
+    renders = 0
+    delay = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        GotenbergHandler.renders += 1
+        time.sleep(GotenbergHandler.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.end_headers()
+        self.wfile.write(b'%PDF-1.4\n' + b'%' * 200 + f"render {GotenbergHandler.renders}".encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    URL_RENDER_CACHE_TTL=600,
+    URL_RENDER_CACHE_FRESH=60,
+    URL_RENDER_CACHE_ALLOW_PRIVATE=True,
+)
+class URLRenderCacheTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.origin = _serve(OriginHandler)
+        cls.gotenberg = _serve(GotenbergHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.origin.server_address[1]}"
+        cls.gotenberg_patch = mock.patch(
+            'apps.tools.converters.gotenberg_converter.GOTENBERG_URL',
+            f"http://127.0.0.1:{cls.gotenberg.server_address[1]}",
+        )
+        cls.gotenberg_patch.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.gotenberg_patch.stop()
+        cls.origin.shutdown()
+        cls.gotenberg.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        OriginHandler.version = 1
+        OriginHandler.heads = []
+        GotenbergHandler.renders = 0
+        GotenbergHandler.delay = 0
+
+    def render(self, path='/page', **options):
+        url = self.base_url + path
+        options = {'page_size': 'A4', 'orientation': 'portrait', **options}
+        return URLRenderCache.render(url, lambda: convert_url_to_pdf_gotenberg(url=url, **options), **options)
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url('HTTPS://Example.COM:443/docs?b=2&a=1#intro'),
+            normalize_url('https://example.com/docs?a=1&b=2'),
+        )
+        self.assertEqual(normalize_url('http://example.com'), 'http://example.com/')
+        self.assertNotEqual(normalize_url('http://example.com:8080/'), normalize_url('http://example.com/'))
+
+    def test_repeat_request_is_served_from_cache(self):
+        first, status_first = self.render()
+        second, status_second = self.render()
+
+        self.assertEqual((status_first, status_second), ('miss', 'hit'))
+        self.assertEqual(first, second)
+        self.assertEqual(GotenbergHandler.renders, 1)
+
+    def test_render_options_are_part_of_the_key(self):
+        self.render()
+        _, status_landscape = self.render(orientation='landscape')
+
+        self.assertEqual(status_landscape, 'miss')
+        self.assertEqual(GotenbergHandler.renders, 2)
+
+    @override_settings(URL_RENDER_CACHE_FRESH=0)
+    def test_unchanged_page_is_revalidated_not_rendered(self):
+        self.render()
+        pdf, status = self.render()
+
+        self.assertEqual(status, 'revalidated')
+        self.assertEqual(GotenbergHandler.renders, 1)
+        self.assertEqual(OriginHandler.heads[-1].get('If-None-Match'), '"v1"')
+        self.assertIn(b'render 1', pdf)
+
+    @override_settings(URL_RENDER_CACHE_FRESH=0)
+    def test_changed_page_is_rendered_again(self):
+        self.render()
+        OriginHandler.version = 2
+        pdf, status = self.render()
+
+        self.assertEqual(status, 'miss')
+        self.assertEqual(GotenbergHandler.renders, 2)
+        self.assertIn(b'render 2', pdf)
+
+    def test_private_pages_are_not_cached(self):
+        self.render('/private')
+        _, status = self.render('/private')
+
+        self.assertEqual(status, 'miss')
+        self.assertEqual(GotenbergHandler.renders, 2)
+
+    @override_settings(URL_RENDER_CACHE_TTL=0)
+    def test_zero_ttl_bypasses_the_cache(self):
+        _, status = self.render()
+
+        self.assertEqual(status, 'bypass')
+        self.assertEqual(OriginHandler.heads, [])
+
+    def test_concurrent_requests_share_one_render(self):
+        GotenbergHandler.delay = 0.5
+        results = []
+
+        def request():
+            results.append(self.render())
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(GotenbergHandler.renders, 1)
+        self.assertEqual(len({pdf for pdf, _ in results}), 1)
+        self.assertEqual(sorted(status for _, status in results), ['hit'] * 4 + ['miss'])
@@ -0,0 +1,339 @@
+"""
+Page-Window Processing
+Streams very large PDFs through page-local operations one window at a time.
+Pure transformation - no Django, no DB.
+
+PyMuPDF only ever holds a single window of pages. Each transformed window is
+saved as a part file and its pages' drawing is written back onto the source
+page objects with pikepdf, which loads page objects lazily. Windows that no
+operation touches are left as they are. Rasterised pages and extracted images are written
+into a zip on disk as each window completes.
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+import logging
+
+from apps.tools.parallel import page_chunks
+
+logger = logging.getLogger(__name__)
+
+
+WINDOW_THRESHOLD_PAGES = 200
+DEFAULT_WINDOW_SIZE = 50
+
+PAGE_NUMBER_MARGIN = 30
+
+
+def count_pages(input_path: str) -> int:
+    """Read the page count without loading page content."""
+    from apps.tools import backends
+
+    return backends.page_count(input_path)
+
+
+def should_window(tool, page_count: int) -> bool:
+    """Check whether a tool opted in and the document is large enough to window."""
+    return bool(tool and getattr(tool, 'page_windowed', False) and page_count >= WINDOW_THRESHOLD_PAGES)
+
+
+def parse_page_spec(spec, page_count: int) -> list:
+    """
+    Resolve a page specification into 0-indexed page numbers, in the given
+    order and keeping repeats, e.g. for extracting pages into one file.
+
+    Args:
+        spec: "1-5,8,10-12" or a list of 1-indexed ints/strings; empty means every page
+
+    Returns:
+        list: Page numbers within the document
+    """
+    if spec in (None, ''):
+        return list(range(page_count))
+
+    parts = spec.split(',') if isinstance(spec, str) else spec
+    pages = []
+    for part in parts:
+        part = str(part).strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            pages.extend(range(int(start) - 1, int(end)))
+        else:
+            pages.append(int(part) - 1)
+
+    return [p for p in pages if 0 <= p < page_count]
+
+
+def parse_pages(pages, page_count: int):
+    """
+    Resolve a page selection into 0-indexed page numbers.
+
+    Args:
+        pages: 'all', None, "1,3-5" or a list of 1-indexed ints/strings
+
+    Returns:
+        set or None: None means every page
+    """
+    if pages in (None, '', 'all'):
+        return None
+
+    return set(parse_page_spec(pages, page_count))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PAGE OPERATIONS
+# Each receives the page, its 1-indexed number and the document page count.
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _rotate_page(page, number: int, total: int, angle: int = 90, **parameters):
+    page.set_rotation(int(angle))
+
+
+def _watermark_page(page, number: int, total: int, text: str = None, font_size: int = None,
+                    color: tuple = None, angle: int = None, **parameters):
+    from apps.tools.services.watermark import WatermarkService
+
+    WatermarkService.watermark_page(page, text, font_size, tuple(color) if color else None, angle)
+
+
+def _number_page(page, number: int, total: int, position: str = 'bottom-center',
+                 number_format: str = '{n}', font_size: int = 11, start: int = 1, **parameters):
+    import fitz
+
+    offset = int(start) - 1
+    label = number_format.format(n=number + offset, total=total + offset)
+    width = fitz.get_text_length(label, fontsize=font_size)
+
+    rect = page.rect
+    vertical, _, horizontal = position.partition('-')
+    if horizontal == 'left':
+        x = PAGE_NUMBER_MARGIN
+    elif horizontal == 'right':
+        x = rect.width - PAGE_NUMBER_MARGIN - width
+    else:
+        x = (rect.width - width) / 2
+    y = PAGE_NUMBER_MARGIN + font_size if vertical == 'top' else rect.height - PAGE_NUMBER_MARGIN
+
+    # Coordinates are in the displayed (rotated) page space
+    point = fitz.Point(x, y) * page.derotation_matrix
+    page.insert_text(point, label, fontsize=font_size, rotate=page.rotation, overlay=True)
+
+
+def _flatten_page(page, number: int, total: int, **parameters):
+    for annot in page.annots():
+        annot.update()
+
+
+PAGE_OPERATIONS = {
+    'rotate': _rotate_page,
+    'watermark': _watermark_page,
+    'page_numbers': _number_page,
+    'flatten': _flatten_page,
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PIPELINES
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _release_window():
+    """Drop MuPDF's object store so memory stays bounded by one window."""
+    import fitz
+
+    fitz.TOOLS.store_shrink(100)
+
+
+# What a page operation can change: the drawing, the page geometry and the
+# annotation appearances. Everything else stays on the source page object.
+PAGE_DRAWING_KEYS = ('/Contents', '/Resources', '/MediaBox', '/CropBox')
+
+
+def _annotation_key(annot) -> tuple:
+    rect = tuple(round(float(v), 2) for v in annot.get('/Rect', ()))
+    return str(annot.get('/Subtype', '')), rect
+
+
+def _copy(source, part, obj):
+    # copy_foreign only takes indirect objects; boxes and the like are direct
+    if not obj.is_indirect:
+        obj = part.make_indirect(obj)
+    return source.copy_foreign(obj)
+
+
+def _replace_drawing(source, part, page, part_page):
+    """Copy a transformed page's drawing onto the source page object."""
+    for key in PAGE_DRAWING_KEYS:
+        if key in part_page:
+            page[key] = _copy(source, part, part_page[key])
+    # Set explicitly: the source page may inherit a rotation from its parent
+    page.Rotate = int(part_page.get('/Rotate', 0))
+
+    appearances = {
+        _annotation_key(annot): annot.AP
+        for annot in part_page.get('/Annots', ())
+        if '/AP' in annot
+    }
+    for annot in page.get('/Annots', ()):
+        appearance = appearances.get(_annotation_key(annot))
+        if appearance is not None:
+            annot.AP = _copy(source, part, appearance)
+
+
+def _assemble(input_path: str, segments: list, output_path: str):
+    """
+    Write the transformed windows back into the source document and save it.
+
+    Transformed pages keep their page objects, so form fields, the structure
+    tree, named destinations, bookmarks, page labels and the rest of the
+    catalog still point at them.
+
+    Args:
+        segments: [(path, start, stop), ...] with stop-exclusive page bounds
+    """
+    import pikepdf
+
+    with pikepdf.open(input_path) as source:
+        page_no = 0
+        for path, start, stop in segments:
+            if path == input_path:
+                page_no += stop - start
+                continue
+
+            with pikepdf.open(path) as part:
+                for part_no in range(start, stop):
+                    _replace_drawing(source, part, source.pages[page_no].obj, part.pages[part_no].obj)
+                    page_no += 1
+
+        source.save(output_path)
+
+
+def transform_pages(input_path: str, output_path: str, operation: str,
+                    window_size: int = DEFAULT_WINDOW_SIZE, pages=None, **parameters) -> dict:
+    """
+    Apply a page-local operation to a PDF one window of pages at a time.
+
+    Args:
+        input_path: Path to input PDF
+        output_path: Path for output PDF
+        operation: One of PAGE_OPERATIONS ('rotate', 'watermark', 'page_numbers', 'flatten')
+        window_size: Pages held in memory at once
+        pages: Page selection, see parse_pages (default: all)
+        **parameters: Passed to the page operation
+
+    Returns:
+        dict: {success, page_count, pages_processed, windows}
+    """
+    try:
+        import fitz
+
+        apply = PAGE_OPERATIONS.get(operation)
+        if apply is None:
+            raise ValueError(f"Unsupported page operation '{operation}'")
+
+        total = count_pages(input_path)
+        selected = parse_pages(pages, total)
+        windows = page_chunks(total, window_size)
+        work_dir = tempfile.mkdtemp(prefix='ninja_windows_')
+
+        try:
+            segments = []
+            processed = 0
+
+            for start, stop in windows:
+                targets = [p for p in range(start, stop) if selected is None or p in selected]
+                if not targets:
+                    segments.append((input_path, start, stop))
+                    continue
+
+                part_path = os.path.join(work_dir, f'window_{start:06d}.pdf')
+                with fitz.open(input_path) as source, fitz.open() as window:
+                    window.insert_pdf(source, from_page=start, to_page=stop - 1)
+                    for page_no in targets:
+                        apply(window[page_no - start], page_no + 1, total, **parameters)
+                    window.save(part_path, garbage=3, deflate=True)
+                _release_window()
+
+                segments.append((part_path, 0, stop - start))
+                processed += len(targets)
+
+            _assemble(input_path, segments, output_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        logger.info(f"Windowed:{operation.upper()} pages={total} processed={processed} windows={len(windows)}")
+
+        return {
+            'success': True,
+            'page_count': total,
+            'pages_processed': processed,
+            'windows': len(windows),
+        }
+
+    except Exception as e:
+        logger.error(f"Windowed {operation} failed: {e}")
+        return {'success': False, 'message': str(e)}
+
+
+def rasterize_pages(input_path: str, output_path: str, dpi: int = 150, fmt: str = 'png',
+                    window_size: int = DEFAULT_WINDOW_SIZE, pages=None, **parameters) -> dict:
+    """
+    Render pages to images, streaming them into a zip one window at a time.
+
+    Args:
+        input_path: Path to input PDF
+        output_path: Path for output zip
+        dpi: Render resolution
+        fmt: 'png' or 'jpg'
+        window_size: Pages rendered before the object store is released
+        pages: Page selection, see parse_pages (default: all)
+
+    Returns:
+        dict: {success, page_count, images}
+    """
+    try:
+        import fitz
+
+        fmt = 'jpg' if fmt in ('jpg', 'jpeg', 'image') else 'png'
+        total = count_pages(input_path)
+        selected = parse_pages(pages, total)
+        images = 0
+
+        # Images are already compressed; deflating them again only costs CPU
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED) as zf:
+            for start, stop in page_chunks(total, window_size):
+                with fitz.open(input_path) as doc:
+                    for page_no in range(start, stop):
+                        if selected is not None and page_no not in selected:
+                            continue
+                        pix = doc[page_no].get_pixmap(dpi=dpi)
+                        zf.writestr(f'page_{page_no + 1}.{fmt}', pix.tobytes(fmt))
+                        pix = None
+                        images += 1
+                _release_window()
+
+        logger.info(f"Windowed:RASTERIZE pages={total} images={images} dpi={dpi}")
+
+        return {'success': True, 'page_count': total, 'images': images}
+
+    except Exception as e:
+        logger.error(f"Windowed rasterize failed: {e}")
+        return {'success': False, 'message': str(e)}
+
+
+def extract_images(input_path: str, output_path: str, window_size: int = DEFAULT_WINDOW_SIZE,
+                   pages=None, **parameters) -> dict:
+    """
+    Extract embedded images into a zip, scanning one window of pages at a time.
+
+    Delegates to image_extraction, which writes images shared by several
+    pages (logos, backgrounds) once, under the first page they appear on.
+
+    Returns:
+        dict: {success, page_count, images, occurrences, duplicates_skipped}
+    """
+    from apps.tools.image_extraction import extract_images as extract_unique_images
+
+    return extract_unique_images(input_path, output_path, pages=pages, window_size=window_size, **parameters)
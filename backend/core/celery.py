@@ -31,4 +31,20 @@ app.conf.beat_schedule = {
         'task': 'core.tasks.daily_maintenance',
         'schedule': crontab(minute=0, hour=0), # Midnight
     },
+    'search-index-pending-files': {
+        'task': 'apps.files.tasks.index_pending_files',
+        'schedule': crontab(minute='*/5'),
+    },
+    'evict-cold-tiles': {
+        'task': 'apps.files.tasks.evict_cold_tiles',
+        'schedule': crontab(minute=30),
+    },
+    'reconcile-storage-counters': {
+        'task': 'apps.files.tasks.reconcile_storage_counters',
+        'schedule': crontab(minute=15, hour=3),
+    },
+    'flush-usage-counters': {
+        'task': 'apps.subscriptions.tasks.flush_usage_counters',
+        'schedule': crontab(minute='*'),
+    },
 }
@@ -175,6 +175,45 @@ class DeliveryService:
         
         return {'error': 'Share link not found'}
     
+    @classmethod
+    def stream_response(cls, request, path: str, filename: str = None, content_type: str = None):
+        """
+        Stream a stored file, honoring a single-range Range header.
+        
+        Partial requests get 206 with Content-Range, so a viewer can read a
+        linearized PDF's first page (and later any other page) without
+        downloading the whole file.
+        
+        Returns:
+            StreamingHttpResponse or HttpResponse (416)
+        """
+        from django.http import HttpResponse, StreamingHttpResponse
+        from core.storage import RangeNotSatisfiable, StorageService
+        import mimetypes
+        
+        content_type = content_type or mimetypes.guess_type(filename or path)[0] or 'application/octet-stream'
+        
+        try:
+            opened = StorageService.open_range(path, request.headers.get('Range'))
+        except RangeNotSatisfiable as e:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{e.size}"
+            return response
+        
+        response = StreamingHttpResponse(
+            opened['stream'],
+            status=206 if opened['partial'] else 200,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(opened['end'] - opened['start'] + 1)
+        response['Accept-Ranges'] = 'bytes'
+        if opened['partial']:
+            response['Content-Range'] = f"bytes {opened['start']}-{opened['end']}/{opened['size']}"
+        if filename:
+            response['Content-Disposition'] = f'inline; filename="{filename}"'
+        
+        return response
+    
     @classmethod
     def send_share_notification(cls, file_asset, recipient_email: str, share_url: str):
         """Send email notification for shared file."""
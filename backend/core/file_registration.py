@@ -80,6 +80,7 @@ class FileRegistrationService:
                 'uploaded_at': timezone.now().isoformat(),
                 'original_checksum': validation['checksum'],
                 'pdf_metadata': validation.get('pdf_metadata', {}),
+                'structure': validation.get('structure'),
                 **(metadata or {})
             }
         )
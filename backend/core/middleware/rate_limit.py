@@ -8,6 +8,8 @@ from django.core.cache import cache
 from django.conf import settings
 from django.utils import timezone
 
+from core.rate_limiter import Limit, RateLimitEngine, RateLimitResult
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,7 +22,8 @@ class RateLimitMiddleware:
     - Per-IP rate limiting
     - Per-user rate limiting
     - Per-endpoint rate limiting
-    - Burst allowance
+    - Burst allowance, with an optional hourly window per endpoint
+    - Per-endpoint request costs
     - Automatic IP blocking for repeated violations
     """
     
@@ -30,15 +33,24 @@ class RateLimitMiddleware:
     BLOCK_DURATION_SECONDS = 300  # 5 minutes auto-block
     VIOLATION_THRESHOLD = 10  # Block after 10 violations
     
-    # Endpoints with custom limits
+    # Endpoints with custom limits; 'rph' adds an hourly window
     ENDPOINT_LIMITS = {
-        '/api/auth/login/': {'rpm': 10, 'burst': 3},
-        '/api/auth/signup/': {'rpm': 5, 'burst': 2},
-        '/api/auth/password/reset/': {'rpm': 5, 'burst': 2},
+        '/api/auth/login/': {'rpm': 10, 'burst': 3, 'rph': 60},
+        '/api/auth/signup/': {'rpm': 5, 'burst': 2, 'rph': 20},
+        '/api/auth/password/reset/': {'rpm': 5, 'burst': 2, 'rph': 20},
         '/api/tools/': {'rpm': 30, 'burst': 5},
         '/api/files/upload/': {'rpm': 20, 'burst': 3},
     }
     
+    # Heavy endpoints count as several requests against their limit
+    ENDPOINT_COSTS = {
+        '/api/tools/ocr/': 3,
+        '/api/tools/pdf-to-word/': 2,
+        '/api/tools/pdf-to-excel/': 2,
+        '/api/tools/url-to-pdf/': 2,
+        '/api/tools/compress-pdf/': 2,
+    }
+    
     # Paths to skip rate limiting
     EXEMPT_PATHS = [
         '/api/health/',
@@ -72,36 +84,27 @@ class RateLimitMiddleware:
                 'retry_after': self._get_block_remaining(client_ip)
             }, status=429)
         
-        # Get rate limit for this endpoint
-        limit_config = self._get_limit_for_path(path)
-        rpm = limit_config['rpm']
-        burst = limit_config['burst']
-        
         # Check rate limit
-        is_allowed, retry_after = self._check_rate_limit(
-            client_ip, user_id, path, rpm, burst
-        )
+        result = self._check_rate_limit(client_ip, user_id, path)
         
-        if not is_allowed:
+        if not result.allowed:
             # Record violation
             self._record_violation(client_ip)
             
             response = JsonResponse({
                 'error': 'Rate limit exceeded. Please slow down.',
-                'retry_after': retry_after
+                'retry_after': result.retry_after_seconds
             }, status=429)
-            response['Retry-After'] = str(retry_after)
-            response['X-RateLimit-Limit'] = str(rpm)
-            response['X-RateLimit-Remaining'] = '0'
+            for header, value in result.headers().items():
+                response[header] = value
             return response
         
         # Process request
         response = self.get_response(request)
         
         # Add rate limit headers
-        remaining = self._get_remaining(client_ip, user_id, path, rpm)
-        response['X-RateLimit-Limit'] = str(rpm)
-        response['X-RateLimit-Remaining'] = str(max(0, remaining))
+        for header, value in result.headers().items():
+            response[header] = value
         
         return response
     
@@ -112,73 +115,45 @@ class RateLimitMiddleware:
             return x_forwarded_for.split(',')[0].strip()
         return request.META.get('REMOTE_ADDR', '0.0.0.0')
     
-    def _get_limit_for_path(self, path: str) -> dict:
-        """Get rate limit configuration for a path"""
+    def _get_limit_for_path(self, path: str) -> Tuple[str, dict]:
+        """Get the rate limit scope and configuration for a path"""
         for pattern, config in self.ENDPOINT_LIMITS.items():
             if path.startswith(pattern):
-                return config
-        return {'rpm': self.DEFAULT_REQUESTS_PER_MINUTE, 'burst': self.DEFAULT_BURST_SIZE}
+                return pattern, config
+        return path, {'rpm': self.DEFAULT_REQUESTS_PER_MINUTE, 'burst': self.DEFAULT_BURST_SIZE}
+    
+    def _get_cost_for_path(self, path: str) -> int:
+        """Get how many requests a call to this path counts as"""
+        for pattern, cost in self.ENDPOINT_COSTS.items():
+            if path.startswith(pattern):
+                return cost
+        return 1
     
     def _check_rate_limit(
         self, 
         client_ip: str, 
         user_id: Optional[int], 
-        path: str, 
-        rpm: int, 
-        burst: int
-    ) -> Tuple[bool, int]:
+        path: str
+    ) -> RateLimitResult:
         """
-        Check if request is within rate limit using sliding window algorithm.
-        Returns (is_allowed, retry_after_seconds)
+        Check and count the request against every window of its endpoint
+        limit, atomically and in one Redis round-trip.
         """
-        now = time.time()
-        window_start = now - 60  # 1 minute window
-        
-        # Create unique key
-        if user_id:
-            key = f"ratelimit:user:{user_id}:{self._hash_path(path)}"
-        else:
-            key = f"ratelimit:ip:{client_ip}:{self._hash_path(path)}"
-        
-        # Get request timestamps from cache
-        timestamps = cache.get(key, [])
+        scope, config = self._get_limit_for_path(path)
         
-        # Remove old timestamps
-        timestamps = [ts for ts in timestamps if ts > window_start]
-        
-        # Check if within limit
-        if len(timestamps) >= rpm:
-            # Calculate retry-after
-            oldest = min(timestamps) if timestamps else now
-            retry_after = int(60 - (now - oldest)) + 1
-            return False, max(1, retry_after)
-        
-        # Add current timestamp
-        timestamps.append(now)
-        cache.set(key, timestamps, 120)  # Keep for 2 minutes
-        
-        return True, 0
-    
-    def _get_remaining(
-        self, 
-        client_ip: str, 
-        user_id: Optional[int], 
-        path: str, 
-        rpm: int
-    ) -> int:
-        """Get remaining requests in current window"""
-        now = time.time()
-        window_start = now - 60
+        # The minute window admits a full minute's budget at once, as the
+        # fixed window did; 'burst' is kept in the config but not enforced
+        limits = [Limit(config['rpm'], 60)]
+        if config.get('rph'):
+            limits.append(Limit(config['rph'], 3600))
         
+        # Endpoints sharing a limit share one budget
         if user_id:
-            key = f"ratelimit:user:{user_id}:{self._hash_path(path)}"
+            key = f"user:{user_id}:{self._hash_path(scope)}"
         else:
-            key = f"ratelimit:ip:{client_ip}:{self._hash_path(path)}"
+            key = f"ip:{self._hash_path(scope)}:{client_ip}"
         
-        timestamps = cache.get(key, [])
-        timestamps = [ts for ts in timestamps if ts > window_start]
-        
-        return rpm - len(timestamps)
+        return RateLimitEngine.check(key, limits, cost=self._get_cost_for_path(path))
     
     def _hash_path(self, path: str) -> str:
         """Create short hash of path for cache key"""
@@ -196,8 +171,13 @@ class RateLimitMiddleware:
     def _record_violation(self, client_ip: str):
         """Record rate limit violation and auto-block if threshold exceeded"""
         key = f"violations:{client_ip}"
-        violations = cache.get(key, 0) + 1
-        cache.set(key, violations, 3600)  # Track for 1 hour
+        cache.add(key, 0, 3600)  # Track for 1 hour
+        try:
+            violations = cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.add(key, 1, 3600)
+            violations = 1
         
         if violations >= self.VIOLATION_THRESHOLD:
             # Auto-block this IP
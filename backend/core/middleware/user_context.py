@@ -0,0 +1,24 @@
+"""
+User Context Middleware
+
+Scopes the UserContextResolver memo to one request, so the many quota and
+permission checks of a request resolve the user's context once.
+"""
+from core.user_context import UserContextResolver
+
+
+class UserContextMiddleware:
+    """
+    Add to MIDDLEWARE in settings.py, after AuthenticationMiddleware:
+        'core.middleware.user_context.UserContextMiddleware',
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        token = UserContextResolver.begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            UserContextResolver.end_request(token)
@@ -4,7 +4,6 @@ Handles output storage, versioning, preview generation, and quota finalization.
 """
 from django.utils import timezone
 from django.conf import settings
-import tempfile
 import os
 import hashlib
 import logging
@@ -21,7 +20,8 @@ class OutputService:
     """Handles output file storage and preview generation."""
     
     @classmethod
-    def store_output_version(cls, file_asset, output_path: str, output_filename: str = None, metadata: dict = None) -> dict:
+    def store_output_version(cls, file_asset, output_path: str, output_filename: str = None, metadata: dict = None,
+                             linearize: bool = None) -> dict:
         """
         Store processed output as a new version.
         
@@ -30,9 +30,10 @@ class OutputService:
             output_path: Local path to output file
             output_filename: Optional custom filename
             metadata: Additional version metadata
+            linearize: Linearize a PDF output; None decides by size
             
         Returns:
-            dict: {storage_path, size, hash, version, url}
+            dict: {storage_path, size, hash, version, url, linearized}
         """
         from core.storage import StorageService
         from core.file_registration import FileRegistrationService
@@ -46,6 +47,8 @@ class OutputService:
         new_version = file_asset.version + 1
         storage_path = f"outputs/{file_asset.id}/v{new_version}/{filename}"
         
+        linearized = cls.linearize_output(output_path, linearize)
+        
         output_hash = cls._calculate_hash(output_path)
         output_size = os.path.getsize(output_path)
         
@@ -57,7 +60,7 @@ class OutputService:
             output_path=storage_path,
             output_size=output_size,
             output_hash=output_hash,
-            metadata=metadata
+            metadata={**(metadata or {}), 'linearized': linearized}
         )
         
         url = StorageService.get_signed_url(storage_path)
@@ -68,12 +71,65 @@ class OutputService:
             'hash': output_hash,
             'version': new_version,
             'url': url,
+            'linearized': linearized,
         }
         
         logger.info(f"Output:STORED file={file_asset.id} version={new_version} size={output_size}")
         
         return result
     
+    @staticmethod
+    def linearize_output(output_path: str, linearize: bool = None) -> bool:
+        """
+        Rewrite a PDF output in place as linearized ("fast web view"), so a
+        viewer fetching byte ranges can show page 1 before the rest arrives.
+        
+        Args:
+            output_path: Local path to output file
+            linearize: True/False to force; None linearizes PDFs of at least
+                LINEARIZE_MIN_BYTES
+            
+        Returns:
+            bool: True if the file was linearized
+        """
+        import pikepdf
+        
+        if linearize is False:
+            return False
+        if linearize is None and os.path.getsize(output_path) < getattr(settings, 'LINEARIZE_MIN_BYTES', 10 * 1024 * 1024):
+            return False
+        
+        with open(output_path, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                return False
+        
+        temp_path = output_path + '.linearized'
+        try:
+            with pikepdf.open(output_path) as pdf:
+                if pdf.is_linearized:
+                    return True
+                # encryption=True keeps an owner-password protection as it was
+                pdf.save(temp_path, linearize=True, encryption=pdf.is_encrypted)
+            os.replace(temp_path, output_path)
+        except pikepdf.PasswordError:
+            # Needs a user password we do not have; serve it as written
+            return False
+        except pikepdf.PdfError as e:
+            logger.warning(f"Output:LINEARIZE_FAILED path={output_path} error={e}")
+            return False
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        
+        logger.info(f"Output:LINEARIZED path={output_path} size={os.path.getsize(output_path)}")
+        return True
+    
+    PREVIEW_SIZES = {
+        'thumbnail': (150, 150),
+        'preview': (600, 600),
+        'full': (1200, 1200),
+    }
+    
     @classmethod
     def generate_preview(cls, file_asset, preview_type: str = 'thumbnail', page: int = 1) -> dict:
         """
@@ -87,73 +143,89 @@ class OutputService:
         Returns:
             dict: {preview_path, url, dimensions}
         """
+        return cls.generate_previews(file_asset, [preview_type], [page])[preview_type][0]
+    
+    @classmethod
+    def generate_previews(cls, file_asset, preview_types: list = ('thumbnail', 'preview'), pages: list = (1,)) -> dict:
+        """
+        Generate preview images of several sizes for several pages.
+        
+        Each page is rendered once at the largest requested size and the
+        smaller sizes are downscaled from it, encoded as WebP (JPEG when
+        Pillow lacks WebP). All images are uploaded as one batch and the
+        file metadata is saved once.
+        
+        Returns:
+            dict: {preview_type: [result per page, in order]}
+        """
+        from apps.files.services.structure_index import StructureIndexService
+        from apps.tools.render_service import preview_format, record_key, render_pages
         from core.storage import StorageService
         
         if file_asset.mime_type != 'application/pdf':
-            return {'supported': False}
+            return {preview_type: [{'supported': False} for _ in pages] for preview_type in preview_types}
         
-        size_map = {
-            'thumbnail': (150, 150),
-            'preview': (600, 600),
-            'full': (1200, 1200),
-        }
-        size = size_map.get(preview_type, (600, 600))
+        sizes = [cls.PREVIEW_SIZES.get(preview_type, (600, 600)) for preview_type in preview_types]
+        
+        # Pages missing from the structural index fail without rendering
+        results = {preview_type: {} for preview_type in preview_types}
+        indexed = StructureIndexService.get(file_asset) is not None
+        to_render = []
+        for page in pages:
+            if indexed and StructureIndexService.page_size(file_asset, page) is None:
+                for preview_type in preview_types:
+                    results[preview_type][page] = {'error': f"Page {page} does not exist"}
+            elif page not in to_render:
+                to_render.append(page)
         
         try:
-            with StorageService.read(file_asset.file.name) as pdf_file:
-                preview_image = cls._generate_pdf_preview(pdf_file, page, size)
-            
-            preview_path = f"previews/{file_asset.id}/{preview_type}_p{page}.jpg"
-            
-            with open(preview_image, 'rb') as img:
-                StorageService.upload(preview_path, img)
-            
-            os.unlink(preview_image)
-            
-            url = StorageService.get_signed_url(preview_path)
-            
-            file_asset.metadata[f'preview_{preview_type}'] = preview_path
-            file_asset.save(update_fields=['metadata'])
-            
-            logger.info(f"Preview:GENERATED file={file_asset.id} type={preview_type}")
-            
-            return {
-                'preview_path': preview_path,
-                'url': url,
-                'type': preview_type,
-                'page': page,
-                'dimensions': size,
-            }
+            if to_render:
+                fmt = preview_format()
+                ext = 'webp' if fmt == 'webp' else 'jpg'
+                rendered = render_pages(
+                    record_key(file_asset),
+                    lambda: StorageService.read_bytes(file_asset.file.name),
+                    [page - 1 for page in to_render],
+                    sizes=sizes, fmt=fmt, quality=85,
+                )
+                
+                uploads = {}
+                for page, images in zip(to_render, rendered['pages']):
+                    for preview_type, image in zip(preview_types, images['sizes']):
+                        preview_path = f"previews/{file_asset.id}/{preview_type}_p{page}.{ext}"
+                        uploads[preview_path] = image['data']
+                        results[preview_type][page] = {
+                            'preview_path': preview_path,
+                            'type': preview_type,
+                            'page': page,
+                            'dimensions': (image['width'], image['height']),
+                        }
+                
+                saved = StorageService.upload_batch(uploads)
+                
+                for preview_type in preview_types:
+                    for page in to_render:
+                        result = results[preview_type][page]
+                        result['preview_path'] = saved[result['preview_path']]
+                        result['url'] = StorageService.get_signed_url(result['preview_path'])
+                    file_asset.metadata[f'preview_{preview_type}'] = results[preview_type][to_render[-1]]['preview_path']
+                file_asset.save(update_fields=['metadata'])
+                
+                logger.info(
+                    f"Preview:GENERATED file={file_asset.id} types={','.join(preview_types)} "
+                    f"pages={len(to_render)} format={fmt}"
+                )
             
         except Exception as e:
             logger.error(f"Preview:FAILED file={file_asset.id} error={e}")
-            return {'error': str(e)}
-    
-    @staticmethod
-    def _generate_pdf_preview(pdf_file, page: int, size: tuple) -> str:
-        """Generate preview image from PDF using pdf2image or pikepdf."""
-        try:
-            from pdf2image import convert_from_bytes
-            from PIL import Image
-            
-            images = convert_from_bytes(
-                pdf_file.read(),
-                first_page=page,
-                last_page=page,
-                size=size
-            )
-            
-            if not images:
-                raise OutputError("No pages extracted from PDF")
-            
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            images[0].save(temp_file.name, 'JPEG', quality=85)
-            
-            return temp_file.name
-            
-        except ImportError:
-            logger.warning("pdf2image not installed, previews unavailable")
-            raise OutputError("Preview generation requires pdf2image")
+            for preview_type in preview_types:
+                for page in to_render:
+                    results[preview_type][page] = {'error': str(e)}
+        
+        return {
+            preview_type: [results[preview_type][page] for page in pages]
+            for preview_type in preview_types
+        }
     
     @classmethod
     def validate_output(cls, output_path: str, expected_type: str = 'application/pdf') -> bool:
@@ -218,27 +290,21 @@ class PreviewGenerator:
     @classmethod
     def generate_all_previews(cls, file_asset) -> dict:
         """Generate all preview sizes for a file."""
-        results = {}
-        
-        for preview_type in ['thumbnail', 'preview']:
-            result = OutputService.generate_preview(file_asset, preview_type)
-            results[preview_type] = result
+        previews = OutputService.generate_previews(file_asset, ['thumbnail', 'preview'], [1])
         
-        return results
+        return {preview_type: results[0] for preview_type, results in previews.items()}
     
     @classmethod
     def generate_multipage_preview(cls, file_asset, max_pages: int = 5) -> list:
         """Generate previews for multiple pages."""
-        previews = []
+        from apps.files.services.structure_index import StructureIndexService
         
-        page_count = file_asset.page_count or 1
+        page_count = StructureIndexService.page_count(file_asset, default=1)
         pages_to_render = min(page_count, max_pages)
         
-        for page in range(1, pages_to_render + 1):
-            result = OutputService.generate_preview(file_asset, 'preview', page=page)
-            previews.append(result)
-        
-        return previews
+        return OutputService.generate_previews(
+            file_asset, ['preview'], list(range(1, pages_to_render + 1)),
+        )['preview']
 
 
 def store_output_version(file_asset, output_path: str, **kwargs) -> dict:
@@ -0,0 +1,179 @@
+"""
+Rate Limiting Engine
+GCRA (generic cell rate algorithm) limits checked in one Redis round-trip.
+
+Each window of a limit keeps a single value in Redis, the theoretical
+arrival time (TAT) of the next request, so memory per key is constant no
+matter the traffic. A check runs one Lua script (EVALSHA) that tests every
+window of the limit and, only if all of them allow the request, advances
+all of them, so concurrent requests can never over-admit.
+
+A window of `limit` requests per `period` seconds admits up to `burst`
+requests at once (default: limit) and refills one request every
+period / limit seconds. A request may cost more than one unit.
+"""
+from dataclasses import dataclass
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+KEY_PREFIX = 'rl'
+
+# KEYS: one TAT key per window
+# ARGV[1] cost, ARGV[2] now in ms or '' for the Redis clock,
+# then per window: emission interval (ms), burst
+# Returns {allowed, window index, remaining, reset after ms, retry after ms}
+# for the most restrictive window
+GCRA = """
+local cost = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+if not now then
+    local t = redis.call('TIME')
+    now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+end
+
+local tats, new_tats, intervals, tolerances = {}, {}, {}, {}
+local allowed, retry_after, denied_by = 1, 0, 0
+
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[1 + i * 2])
+    local tolerance = interval * tonumber(ARGV[2 + i * 2])
+    local tat = math.max(tonumber(redis.call('GET', key) or now), now)
+    local new_tat = tat + cost * interval
+
+    tats[i], new_tats[i], intervals[i], tolerances[i] = tat, new_tat, interval, tolerance
+    local allow_at = new_tat - tolerance
+    if allow_at > now then
+        allowed = 0
+        if allow_at - now > retry_after then
+            retry_after, denied_by = allow_at - now, i
+        end
+    end
+end
+
+-- All windows advance together or not at all
+if allowed == 1 then
+    for i, key in ipairs(KEYS) do
+        tats[i] = new_tats[i]
+        redis.call('SET', key, new_tats[i], 'PX', new_tats[i] - now)
+    end
+end
+
+local binding, remaining = 1, nil
+for i = 1, #KEYS do
+    local left = math.max(math.floor((tolerances[i] - (tats[i] - now)) / intervals[i]), 0)
+    if remaining == nil or left < remaining then
+        binding, remaining = i, left
+    end
+end
+if denied_by > 0 then
+    binding = denied_by
+end
+
+return {allowed, binding, remaining, tats[binding] - now, retry_after}
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """`limit` requests per `period` seconds, at most `burst` at once."""
+    limit: int
+    period: int
+    burst: int = None
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or self.limit
+
+    @property
+    def interval_ms(self) -> int:
+        return max(int(self.period * 1000 / self.limit), 1)
+
+    @property
+    def policy(self) -> str:
+        return f"{self.limit};w={self.period}"
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: Limit
+    remaining: int
+    reset_after: float  # seconds until the binding window is fully refilled
+    retry_after: float  # seconds until the request would be admitted; 0 when allowed
+    policy: str
+
+    @property
+    def retry_after_seconds(self) -> int:
+        return math.ceil(self.retry_after) if not self.allowed else 0
+
+    def headers(self) -> dict:
+        """IETF RateLimit header fields, plus the X-RateLimit ones clients already read."""
+        headers = {
+            'RateLimit-Limit': str(self.limit.limit),
+            'RateLimit-Remaining': str(self.remaining),
+            'RateLimit-Reset': str(math.ceil(self.reset_after)),
+            'RateLimit-Policy': self.policy,
+            'X-RateLimit-Limit': str(self.limit.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(self.retry_after_seconds)
+        return headers
+
+
+class RateLimitEngine:
+    """Atomic multi-window GCRA checks shared by the middleware and ScaleController."""
+
+    @staticmethod
+    def _redis():
+        from django_redis import get_redis_connection
+
+        return get_redis_connection('default')
+
+    @classmethod
+    def check(cls, key: str, limits, cost: int = 1, now: float = None) -> RateLimitResult:
+        """
+        Admit one request of `cost` units against every window in `limits`.
+
+        Args:
+            key: Identity and scope, e.g. 'ip:1.2.3.4:tools'
+            limits: Limit or list of Limits that must all admit the request
+            cost: Units the request consumes
+            now: Clock override in seconds (tests); the Redis clock otherwise
+
+        Returns:
+            RateLimitResult: For the most restrictive window. When Redis is
+                             unreachable the request is allowed.
+        """
+        limits = [limits] if isinstance(limits, Limit) else list(limits)
+        policy = ', '.join(limit.policy for limit in limits)
+
+        keys = [f"{KEY_PREFIX}:{key}:{limit.period}" for limit in limits]
+        args = [cost, '' if now is None else int(now * 1000)]
+        for limit in limits:
+            args += [limit.interval_ms, limit.capacity]
+
+        try:
+            script = cls._redis().register_script(GCRA)
+            allowed, binding, remaining, reset_ms, retry_ms = script(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"RateLimit:REDIS_UNAVAILABLE key={key} error={e}")
+            first = limits[0]
+            return RateLimitResult(True, first, first.capacity, 0, 0, policy)
+
+        return RateLimitResult(
+            allowed=allowed == 1,
+            limit=limits[binding - 1],
+            remaining=int(remaining),
+            reset_after=reset_ms / 1000,
+            retry_after=retry_ms / 1000,
+            policy=policy,
+        )
+
+
+def check_rate(key: str, limits, cost: int = 1) -> RateLimitResult:
+    """Convenience function."""
+    return RateLimitEngine.check(key, limits, cost)
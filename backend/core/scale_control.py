@@ -8,6 +8,8 @@ from django.utils import timezone
 from datetime import timedelta
 import logging
 
+from core.rate_limiter import Limit, RateLimitEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,9 +38,22 @@ class WorkerConfig:
         'low_priority': 2,
     }
     
+    # Processes a single CPU-bound job may fan out to
+    PROCESS_POOL_SIZE = {
+        'PDF_TO_WORD': 4,
+        'PAGE_THUMBNAILS': 4,
+        'EXTRACT_IMAGES': 4,
+        'PAGE_ANALYSIS': 4,
+    }
+    DEFAULT_PROCESS_POOL_SIZE = 2
+    
     @classmethod
     def get_concurrency(cls, queue_name: str) -> int:
         return cls.CONCURRENCY.get(queue_name, 5)
+    
+    @classmethod
+    def get_process_pool_size(cls, tool_id: str) -> int:
+        return cls.PROCESS_POOL_SIZE.get(tool_id, cls.DEFAULT_PROCESS_POOL_SIZE)
 
 
 class AIQuotaConfig:
@@ -100,9 +115,14 @@ class ScaleController:
         return context['tier_name']
     
     @classmethod
-    def check_rate_limit(cls, user, action: str = 'request') -> tuple:
+    def check_rate_limit(cls, user, action: str = 'request', cost: int = 1) -> tuple:
         """
-        Check if user is within rate limits.
+        Check if user is within rate limits, counting the request if so.
+        
+        Args:
+            user: User instance or None
+            action: Action identifier; each action has its own budget
+            cost: Requests this action counts as
         
         Returns:
             tuple: (allowed: bool, retry_after: int)
@@ -115,19 +135,12 @@ class ScaleController:
             return True, 0
         
         user_id = user.id if user and user.is_authenticated else 'guest'
-        key = f"rate:{user_id}:{action}:{timezone.now().strftime('%Y%m%d%H%M')}"
-        
-        current = cache.get(key, 0)
-        
-        if current >= rpm_limit:
-            return False, 60
-        
-        cache.set(key, current + 1, timeout=60)
-        return True, 0
+        result = RateLimitEngine.check(f"rate:{user_id}:{action}", Limit(rpm_limit, 60), cost=cost)
+        return result.allowed, result.retry_after_seconds
     
     @classmethod
     def check_job_limit(cls, user) -> tuple:
-        """Check if user can start a new job."""
+        """Check if user can start a new job, counting it if so."""
         tier = cls.get_user_tier(user)
         limits = ThrottleConfig.get_limits(tier)
         
@@ -136,15 +149,8 @@ class ScaleController:
             return True, 0
         
         user_id = user.id if user and user.is_authenticated else 'guest'
-        key = f"jobs:{user_id}:{timezone.now().strftime('%Y%m%d%H')}"
-        
-        current = cache.get(key, 0)
-        
-        if current >= jobs_limit:
-            return False, 3600
-        
-        cache.set(key, current + 1, timeout=3600)
-        return True, 0
+        result = RateLimitEngine.check(f"jobs:{user_id}", Limit(jobs_limit, 3600))
+        return result.allowed, result.retry_after_seconds
     
     @classmethod
     def check_concurrent_limit(cls, user) -> tuple:
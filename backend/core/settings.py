@@ -122,6 +122,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.user_context.UserContextMiddleware',
     'django_otp.middleware.OTPMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'allauth.account.middleware.AccountMiddleware', # AllAuth
@@ -489,3 +490,14 @@ else:
         },
     }
 
+
+# Deep-zoom tiles kept in storage before the coldest are evicted
+TILE_CACHE_MAX_BYTES = int(os.getenv('TILE_CACHE_MAX_MB', 2048)) * 1024 * 1024
+
+# PDF outputs at least this large are linearized for progressive viewing
+LINEARIZE_MIN_BYTES = int(os.getenv('LINEARIZE_MIN_MB', 10)) * 1024 * 1024
+
+# URL-to-PDF renders are shared for this long (seconds, 0 disables the cache)
+# and revalidated with the origin once older than URL_RENDER_CACHE_FRESH
+URL_RENDER_CACHE_TTL = int(os.getenv('URL_RENDER_CACHE_TTL', 600))
+URL_RENDER_CACHE_FRESH = int(os.getenv('URL_RENDER_CACHE_FRESH', 60))
@@ -1,6 +1,8 @@
 from celery.signals import task_prerun, task_success, task_failure, after_task_publish
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from .models import TaskLog
+from apps.subscriptions.models.subscription import Subscription
 from django.conf import settings
 from django.utils import timezone
 
@@ -134,3 +136,14 @@ def delete_user_files(sender, instance, **kwargs):
              pass
 
     print(f"GDPR Cleanup: User {instance.email} deleted.")
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_save, sender=Subscription)
+def invalidate_user_context(sender, instance, **kwargs):
+    """
+    Role, tier and subscription changes alter the resolved user context.
+    """
+    from core.user_context import UserContextResolver
+    
+    UserContextResolver.invalidate(instance.pk if sender is not Subscription else instance.user_id)
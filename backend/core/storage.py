@@ -12,6 +12,7 @@ import hashlib
 import mimetypes
 import os
 import io
+import re
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,6 +23,55 @@ class StorageError(Exception):
     pass
 
 
+class RangeNotSatisfiable(StorageError):
+    """Requested byte range lies outside the file."""
+    
+    def __init__(self, size: int):
+        super().__init__(f"Range not satisfiable for size {size}")
+        self.size = size
+
+
+RANGE_CHUNK_SIZE = 256 * 1024
+RANGE_PATTERN = re.compile(r'\s*bytes=(\d*)-(\d*)\s*')
+
+
+def is_single_range(range_header: str) -> bool:
+    """True for a well-formed "bytes=" header naming one range."""
+    match = RANGE_PATTERN.fullmatch(range_header or '')
+    return bool(match) and match.group(1) + match.group(2) != ''
+
+
+def parse_range(range_header: str, size: int):
+    """
+    Parse a single-range "bytes=" header against a file size.
+    
+    Returns:
+        tuple: (start, end) inclusive, or None to send the whole file
+            (no header, a malformed header, or several ranges)
+        
+    Raises:
+        RangeNotSatisfiable: If the range starts beyond the end of the file
+    """
+    if not is_single_range(range_header):
+        return None
+    
+    first, last = RANGE_PATTERN.fullmatch(range_header).groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable(size)
+        return max(size - length, 0), size - 1
+    
+    start = int(first)
+    if last and int(last) < start:
+        # Syntactically invalid, so the header is ignored
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(size)
+    return start, min(int(last), size - 1) if last else size - 1
+
+
 class StorageService:
     """
     Production-grade unified storage interface.
@@ -180,6 +230,30 @@ class StorageService:
         else:
             return {'path': cls.upload(path, file_obj), 'chunked': False}
     
+    @classmethod
+    def upload_batch(cls, files: dict, max_workers: int = 8) -> dict:
+        """
+        Upload a set of small files concurrently.
+        
+        Args:
+            files: {path: bytes or file-like object}
+            max_workers: Concurrent uploads
+        
+        Returns:
+            dict: {requested path: saved path}
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        if not files:
+            return {}
+        
+        workers = max(1, min(max_workers, len(files)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            saved = dict(zip(files, pool.map(lambda item: cls.upload(*item), files.items())))
+        
+        logger.info(f"Storage:UPLOAD_BATCH files={len(saved)}")
+        return saved
+    
     @classmethod
     def read(cls, path: str):
         """Open file for reading. Returns file-like object."""
@@ -235,6 +309,83 @@ class StorageService:
         logger.info(f"Storage:DELETE_FOLDER prefix={prefix} deleted={deleted}")
         return deleted
     
+    @classmethod
+    def open_range(cls, path: str, range_header: str = None) -> dict:
+        """
+        Open a stored file for a (possibly partial) HTTP response.
+        
+        On S3/R2 a single range is passed through to the object GET, so only
+        the requested bytes leave the bucket. Local files are seeked.
+        
+        Args:
+            path: Storage path
+            range_header: Value of the request's Range header
+            
+        Returns:
+            dict: {stream, size, start, end, partial} with stream yielding
+                the bytes start..end inclusive
+            
+        Raises:
+            RangeNotSatisfiable: If the range lies outside the file
+        """
+        backend = cls.get_backend_name()
+        
+        if backend in ('s3', 'r2'):
+            from botocore.exceptions import ClientError
+            
+            client = cls.get_s3_client()
+            params = {'Bucket': cls._bucket_name, 'Key': path}
+            if is_single_range(range_header):
+                params['Range'] = range_header.strip()
+            
+            try:
+                obj = client.get_object(**params)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') == 'InvalidRange':
+                    raise RangeNotSatisfiable(cls.get_size(path))
+                logger.error(f"Storage:RANGE:FAILED path={path} error={e}")
+                raise StorageError(f"Read failed: {e}")
+            
+            content_range = obj.get('ContentRange')  # "bytes 0-99/1234"
+            if content_range:
+                span, _, size = content_range.split(' ', 1)[1].partition('/')
+                start, end = (int(value) for value in span.split('-'))
+                size = int(size)
+            else:
+                size = obj['ContentLength']
+                start, end = 0, size - 1
+            
+            return {
+                'stream': obj['Body'].iter_chunks(RANGE_CHUNK_SIZE),
+                'size': size,
+                'start': start,
+                'end': end,
+                'partial': bool(content_range),
+            }
+        
+        size = default_storage.size(path)
+        span = parse_range(range_header, size)
+        start, end = span if span else (0, size - 1)
+        
+        def stream():
+            with default_storage.open(path, 'rb') as f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(RANGE_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+        
+        return {
+            'stream': stream(),
+            'size': size,
+            'start': start,
+            'end': end,
+            'partial': span is not None,
+        }
+    
     @classmethod
     def exists(cls, path: str) -> bool:
         """Check if file exists in storage."""
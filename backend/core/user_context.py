@@ -1,8 +1,13 @@
 """
 User Context Resolution Service
 Complete user tier, quota, and permission resolution.
+
+Resolved contexts are memoized for the current request (see
+core.middleware.user_context) and cached for CONTEXT_TTL seconds across
+processes. Changes to a user's files, subscription or role invalidate the
+cached entry.
 """
-from django.db.models import Sum
+from contextvars import ContextVar
 from django.utils import timezone
 from core.constants import UserTier, SubscriptionStatus, STORAGE_QUOTAS
 import logging
@@ -10,12 +15,44 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+CONTEXT_TTL = 30  # seconds
+
+# user id -> resolved context, for the request being served
+_request_memo = ContextVar('user_context_memo', default=None)
+
+
 class UserContextResolver:
     """
     Resolves complete user context for any request.
     This is the single source of truth for user capabilities.
     """
     
+    @staticmethod
+    def cache_key(user_id) -> str:
+        return f"user_context:{user_id}"
+    
+    @classmethod
+    def begin_request(cls):
+        """Start a per-request memo. Returns a token for end_request()."""
+        return _request_memo.set({})
+    
+    @classmethod
+    def end_request(cls, token):
+        _request_memo.reset(token)
+    
+    @classmethod
+    def invalidate(cls, user_id):
+        """Drop the cached context of a user (memo and shared cache)."""
+        from django.core.cache import cache
+        
+        memo = _request_memo.get()
+        if memo is not None:
+            memo.pop(user_id, None)
+        try:
+            cache.delete(cls.cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"UserContext:INVALIDATE_FAILED user={user_id} error={e}")
+    
     @classmethod
     def resolve(cls, user) -> dict:
         """
@@ -27,9 +64,35 @@ class UserContextResolver:
         Returns:
             dict: Complete context including tier, quotas, and permissions
         """
+        from django.core.cache import cache
+        
         if user is None or not user.is_authenticated:
             return cls._guest_context()
         
+        memo = _request_memo.get()
+        if memo is not None and user.id in memo:
+            return memo[user.id]
+        
+        try:
+            context = cache.get(cls.cache_key(user.id))
+        except Exception as e:
+            logger.warning(f"UserContext:CACHE_UNAVAILABLE error={e}")
+            context = None
+        
+        if context is None:
+            context = cls._resolve(user)
+            try:
+                cache.set(cls.cache_key(user.id), context, CONTEXT_TTL)
+            except Exception as e:
+                logger.warning(f"UserContext:CACHE_UNAVAILABLE error={e}")
+        
+        if memo is not None:
+            memo[user.id] = context
+        return context
+    
+    @classmethod
+    def _resolve(cls, user) -> dict:
+        """Resolve the context from the database."""
         tier = cls._resolve_tier(user)
         subscription_status = cls._resolve_subscription_status(user)
         
@@ -135,18 +198,13 @@ class UserContextResolver:
     
     @classmethod
     def _calculate_storage_used(cls, user) -> int:
-        """Calculate total storage bytes used by user."""
-        from apps.files.models.user_file import UserFile
+        """Total storage bytes used by user, from the denormalized counter."""
+        from apps.accounts.models.user import User
         
-        total = UserFile.objects.filter(
-            user=user
-        ).exclude(
-            status__in=['DELETED', 'EXPIRED']
-        ).aggregate(
-            total=Sum('size_bytes')
-        )['total']
+        # Read fresh: the instance may have been loaded before recent uploads
+        total = User.objects.filter(pk=user.pk).values_list('storage_used_bytes', flat=True).first()
         
-        return total or 0
+        return max(total or 0, 0)
     
     @classmethod
     def _get_job_priority(cls, tier: UserTier) -> int:
@@ -23,6 +23,30 @@ def cleanup_files(paths, retries=3, delay=0.1):
         except Exception:
             pass
 
+
+class CleanupIterator:
+    """
+    Wraps a response body and removes files once the response is closed.
+
+    Django closes a streaming response's content even when the client
+    disconnects before the body is read, which a generator's finally block
+    does not cover (it never starts).
+    """
+
+    def __init__(self, iterable, paths):
+        self.iterable = iterable
+        self.paths = paths
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+    def close(self):
+        try:
+            if hasattr(self.iterable, 'close'):
+                self.iterable.close()
+        finally:
+            cleanup_files(self.paths)
+
 def check_premium_access(request):
     """
     Helper to check Authentication and Premium status.
@@ -66,7 +90,6 @@ def dispatch_async_task(request, task_func, quota_code, task_args=None, task_kwa
     filename = f"{int(time.time())}_{file_obj.name}"
     
     import hashlib
-    import pikepdf
     
     # Calculate SHA256 (preferred). MD5 is deprecated and not used for new security checks.
     sha256_hash = hashlib.sha256()
@@ -77,17 +100,16 @@ def dispatch_async_task(request, task_func, quota_code, task_args=None, task_kwa
     # Reset pointer for saving
     file_obj.seek(0)
 
-    # Validate PDF & Get Page Count
+    # Validate PDF & build the structural index (page count, sizes, fonts, images) in one parse
     page_count = None
+    structure = None
     if file_obj.content_type == 'application/pdf' or file_obj.name.lower().endswith('.pdf'):
         try:
-            # We need to read it to open with pikepdf, or save first. 
-            # Since we have it in memory/chunks, let's defer page count until after save or use temporary stream?
-            # Using pikepdf.open on stream might work if seekable.
-            with pikepdf.open(file_obj) as pdf:
-                page_count = len(pdf.pages)
+            from apps.files.services.structure_index import StructureIndexService
+            structure = StructureIndexService.build(file_obj)
+            page_count = structure['page_count']
         except Exception:
-            # Not a valid PDF or encryption issue
+            # Not a valid PDF; the task reports the error
             pass
         finally:
              file_obj.seek(0)
@@ -101,6 +123,8 @@ def dispatch_async_task(request, task_func, quota_code, task_args=None, task_kwa
         metadata = {'original_name': file_obj.name}
         if page_count:
             metadata['page_count'] = page_count
+        if structure:
+            metadata['structure'] = structure
             
         file_asset = UserFile.objects.create(
             user=request.user,
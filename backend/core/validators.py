@@ -111,56 +111,33 @@ class FileValidator:
     @staticmethod
     def validate_pdf_integrity(file_obj) -> dict:
         """
-        Validate PDF structure and extract metadata.
+        Validate PDF structure and build its structural index in one parse.
         
         Returns:
-            dict: {valid, page_count, is_encrypted, metadata}
+            dict: {valid, page_count, is_encrypted, metadata, structure}
         """
         try:
-            import pikepdf
+            from apps.files.services.structure_index import StructureIndexService
+            structure = StructureIndexService.build(file_obj)
         except ImportError:
-            logger.warning("pikepdf not installed, skipping PDF validation")
+            logger.warning("PyMuPDF not installed, skipping PDF validation")
             return {'valid': True, 'page_count': None, 'is_encrypted': False}
-        
-        initial_pos = file_obj.tell() if hasattr(file_obj, 'tell') else 0
-        
-        try:
-            with pikepdf.open(file_obj) as pdf:
-                page_count = len(pdf.pages)
-                is_encrypted = pdf.is_encrypted
-                
-                metadata = {}
-                if pdf.docinfo:
-                    for key in ['/Title', '/Author', '/Subject', '/Creator', '/Producer']:
-                        try:
-                            val = pdf.docinfo.get(key)
-                            if val:
-                                metadata[key.lstrip('/')] = str(val)
-                        except Exception:
-                            pass
-                
-                if hasattr(file_obj, 'seek'):
-                    file_obj.seek(initial_pos)
-                
-                logger.info(f"Validation:PDF:OK pages={page_count} encrypted={is_encrypted}")
-                
-                return {
-                    'valid': True,
-                    'page_count': page_count,
-                    'is_encrypted': is_encrypted,
-                    'metadata': metadata
-                }
-                
-        except pikepdf.PasswordError:
-            if hasattr(file_obj, 'seek'):
-                file_obj.seek(initial_pos)
-            return {'valid': True, 'page_count': 0, 'is_encrypted': True}
-            
-        except pikepdf.PdfError as e:
-            if hasattr(file_obj, 'seek'):
-                file_obj.seek(initial_pos)
+        except Exception as e:
             logger.warning(f"Validation:PDF:FAILED error={e}")
             raise ValidationError(f"Invalid or corrupted PDF file: {e}")
+        
+        page_count = structure['page_count']
+        is_encrypted = structure['is_encrypted']
+        
+        logger.info(f"Validation:PDF:OK pages={page_count} encrypted={is_encrypted}")
+        
+        return {
+            'valid': True,
+            'page_count': page_count,
+            'is_encrypted': is_encrypted,
+            'metadata': {key.capitalize(): value for key, value in structure['info'].items()},
+            'structure': structure,
+        }
     
     @staticmethod
     def extract_page_count(file_obj) -> int:
@@ -282,6 +259,7 @@ class FileValidator:
             results['page_count'] = pdf_info.get('page_count')
             results['is_encrypted'] = pdf_info.get('is_encrypted', False)
             results['pdf_metadata'] = pdf_info.get('metadata', {})
+            results['structure'] = pdf_info.get('structure')
         
         if scan_virus:
             virus_result = cls.scan_for_virus(file_obj)
@@ -0,0 +1,144 @@
+"""
+Benchmark the PDF backends per operation and record the fastest.
+
+Times every operation of apps.tools.backends on every installed backend over
+a reference corpus, then writes the winner per operation to
+apps/tools/backends/selection.json, which the backend layer reads at startup.
+
+The default corpus is generated: a long text document, an image-heavy
+document and a document of many small pages. Pass --corpus to time a
+directory of real PDFs instead.
+
+Usage:
+    python scripts/benchmark_pdf_backends.py [--corpus DIR] [--repeat 3] [--dry-run]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_corpus(directory: str) -> list:
+    """Generate the reference documents."""
+    import fitz
+
+    paths = []
+
+    doc = fitz.open()
+    for i in range(300):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), f"Section {i + 1}\n" + "Lorem ipsum dolor sit amet. " * 60)
+    paths.append(os.path.join(directory, 'text_300.pdf'))
+    doc.save(paths[-1], deflate=True)
+
+    doc = fitz.open()
+    for i in range(40):
+        pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 800, 600))
+        pix.clear_with(i * 5 % 255)
+        doc.new_page().insert_image(fitz.Rect(50, 50, 545, 420), pixmap=pix)
+    paths.append(os.path.join(directory, 'images_40.pdf'))
+    doc.save(paths[-1], deflate=True)
+
+    doc = fitz.open()
+    for i in range(1500):
+        doc.new_page(width=200, height=200).insert_text((20, 100), str(i))
+    paths.append(os.path.join(directory, 'small_1500.pdf'))
+    doc.save(paths[-1])
+
+    return paths
+
+
+def operation_runs(path: str, page_count: int, encrypted_path: str) -> dict:
+    """One callable per operation, each taking a backend."""
+    half = max(page_count // 2, 1)
+    groups = [list(range(0, half)), list(range(half, page_count))]
+
+    return {
+        'page_count': lambda b: b.page_count(path),
+        'merge': lambda b: b.merge([path, path], io.BytesIO()),
+        'split': lambda b: b.split(path, groups, [io.BytesIO(), io.BytesIO()]),
+        'rotate': lambda b: b.rotate(path, io.BytesIO(), 90),
+        'encrypt': lambda b: b.encrypt(path, io.BytesIO(), 'benchmark'),
+        'decrypt': lambda b: b.decrypt(encrypted_path, io.BytesIO(), 'benchmark'),
+        'save': lambda b: b.save(path, io.BytesIO()),
+    }
+
+
+def best_time(func, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Directory of PDFs to time instead of the generated corpus')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--dry-run', action='store_true', help='Print results without writing selection.json')
+    args = parser.parse_args()
+
+    from apps.tools.backends import BACKENDS, OPERATIONS, SELECTION_PATH
+
+    backends = [b for b in BACKENDS.values() if b.available()]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.corpus:
+            corpus = sorted(
+                os.path.join(args.corpus, name) for name in os.listdir(args.corpus)
+                if name.lower().endswith('.pdf')
+            )
+        else:
+            corpus = build_corpus(workdir)
+
+        timings = {op: {b.name: 0.0 for b in backends} for op in OPERATIONS}
+
+        for path in corpus:
+            reference = backends[0]
+            page_count = reference.page_count(path)
+            encrypted_path = os.path.join(workdir, 'encrypted.pdf')
+            reference.encrypt(path, encrypted_path, 'benchmark')
+
+            print(f"{os.path.basename(path)} ({page_count} pages)")
+            runs = operation_runs(path, page_count, encrypted_path)
+            for op in OPERATIONS:
+                line = []
+                for backend in backends:
+                    elapsed = best_time(lambda: runs[op](backend), args.repeat)
+                    timings[op][backend.name] += elapsed
+                    line.append(f"{backend.name}={elapsed * 1000:8.1f}ms")
+                print(f"  {op:<11} " + '  '.join(line))
+
+    selection = {op: min(results, key=results.get) for op, results in timings.items()}
+
+    print("\nFastest per operation over the corpus:")
+    for op, name in selection.items():
+        print(f"  {op:<11} {name}")
+
+    if args.dry_run:
+        return
+
+    with open(SELECTION_PATH, 'w') as f:
+        json.dump({
+            'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'corpus': [os.path.basename(p) for p in corpus],
+            'repeat': args.repeat,
+            'seconds': {op: {name: round(t, 4) for name, t in results.items()} for op, results in timings.items()},
+            'selection': selection,
+        }, f, indent=2)
+        f.write('\n')
+
+    print(f"\nWrote {SELECTION_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark the PowerPoint -> PDF content-rendering fallback.
+
+Compares the previous serial renderer (fonts reloaded per slide, LANCZOS
+resize of every picture, PNG per slide re-decoded by reportlab) with the
+current one (cached fonts and pictures, parallel slide chunks, direct JPEG /
+pixmap embedding) on a generated deck.
+
+Usage:
+    python scripts/benchmark_pptx_fallback.py [--slides 40] [--workers 4] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+def build_deck(slide_count: int) -> bytes:
+    """Generate a deck with a shared logo, a per-slide photo and body text."""
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    def png(size, color):
+        img = Image.new('RGB', size, color)
+        ImageDraw.Draw(img).ellipse([10, 10, size[0] - 10, size[1] - 10], fill='white')
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG')
+        buffer.seek(0)
+        return buffer
+
+    prs = Presentation()
+    prs.slide_width = Inches(13.333)
+    prs.slide_height = Inches(7.5)
+    logo = png((600, 600), (200, 30, 30)).getvalue()
+
+    for i in range(slide_count):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        title = slide.shapes.add_textbox(Inches(0.5), Inches(0.3), Inches(10), Inches(1.5))
+        title.text_frame.text = f"Quarterly review - slide {i + 1}"
+        title.text_frame.paragraphs[0].runs[0].font.size = Pt(36)
+        body = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(7), Inches(4.5))
+        body.text_frame.text = ' '.join(['Revenue grew across every region this quarter.'] * 6)
+        slide.shapes.add_picture(io.BytesIO(logo), Inches(11.5), Inches(0.3), Inches(1.3), Inches(1.3))
+        slide.shapes.add_picture(png((1600, 1200), (20, 60 + i % 150, 120)), Inches(8), Inches(2), Inches(4.8), Inches(3.6))
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_render(content: bytes) -> bytes:
+    """The serial renderer as it was before the caches and pool were added."""
+    from pptx import Presentation
+    from pptx.enum.shapes import MSO_SHAPE_TYPE
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    prs = Presentation(io.BytesIO(content))
+    width = int((prs.slide_width / 914400) * 96 * 2.5)
+    height = int((prs.slide_height / 914400) * 96 * 2.5)
+    pdf_buffer = io.BytesIO()
+    c = canvas.Canvas(pdf_buffer, pagesize=(width * 0.75, height * 0.75))
+
+    for slide in prs.slides:
+        img = Image.new('RGB', (width, height), 'white')
+        draw = ImageDraw.Draw(img)
+        try:
+            title_font = ImageFont.truetype("arial.ttf", int(height * 0.06))
+            body_font = ImageFont.truetype("arial.ttf", int(height * 0.04))
+        except OSError:
+            title_font = body_font = ImageFont.load_default()
+
+        for shape in slide.shapes:
+            left = int((shape.left / 914400) * 96 * 2.5)
+            top = int((shape.top / 914400) * 96 * 2.5)
+            shape_width = int((shape.width / 914400) * 96 * 2.5)
+            shape_height = int((shape.height / 914400) * 96 * 2.5)
+            if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+                shape_img = Image.open(io.BytesIO(shape.image.blob))
+                shape_img = shape_img.resize((shape_width, shape_height), Image.Resampling.LANCZOS)
+                img.paste(shape_img, (left, top))
+            elif shape.has_text_frame and shape.text.strip():
+                font = title_font if len(shape.text) < 50 else body_font
+                draw.text((left + 10, top + 10), shape.text[:200], fill='black', font=font)
+
+        png_buffer = io.BytesIO()
+        img.save(png_buffer, format='PNG')
+        png_buffer.seek(0)
+        c.drawImage(ImageReader(png_buffer), 0, 0, width=width * 0.75, height=height * 0.75)
+        c.showPage()
+
+    c.save()
+    return pdf_buffer.getvalue()
+
+
+def reset_caches():
+    """Start every run cold so cached pictures from a previous run do not count."""
+    from apps.tools.converters import pptx_converter
+
+    pptx_converter._image_cache.clear()
+    pptx_converter._image_cache_pixels = 0
+    pptx_converter._font.cache_clear()
+
+
+def timed(label: str, func, slides: int, repeat: int):
+    best = None
+    size = 0
+    for _ in range(repeat):
+        reset_caches()
+        start = time.perf_counter()
+        size = len(func())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best:7.2f}s  {slides / best:6.2f} slides/s  {size / 1024:9.0f} KiB")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slides', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    from apps.tools.converters.pptx_converter import _convert_via_image_extraction
+
+    content = build_deck(args.slides)
+    print(f"Deck: {args.slides} slides, {len(content) / 1024:.0f} KiB, CPUs: {os.cpu_count()}\n")
+
+    before = timed('before (serial, PNG)', lambda: legacy_render(content), args.slides, args.repeat)
+    timed('after (1 worker, jpeg)', lambda: _convert_via_image_extraction(content, max_workers=1), args.slides, args.repeat)
+    timed('after (1 worker, raw)', lambda: _convert_via_image_extraction(content, 'raw', max_workers=1), args.slides, args.repeat)
+    after = timed(
+        f'after ({args.workers} workers, jpeg)',
+        lambda: _convert_via_image_extraction(content, max_workers=args.workers),
+        args.slides, args.repeat,
+    )
+
+    print(f"\nSpeed-up: {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
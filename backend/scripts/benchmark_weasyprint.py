@@ -0,0 +1,84 @@
+"""
+Benchmark the WeasyPrint HTML / Markdown -> PDF pipeline.
+
+Compares the previous per-call renderer (Markdown converter, stylesheet and
+font configuration built for every document) with the current one (cached
+font configuration and stylesheet, in process and in the warm render pool)
+on a small and a large generated Markdown document.
+
+Usage:
+    python scripts/benchmark_weasyprint.py [--sections 200] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_markdown(sections: int) -> str:
+    """Generate a report with headings, paragraphs, a table and a code block per section."""
+    parts = ['# Quarterly report\n']
+    for i in range(sections):
+        parts.append(f"## Section {i + 1}\n")
+        parts.append(' '.join(['Revenue grew across every region this quarter.'] * 8) + '\n')
+        parts.append('| Region | Q1 | Q2 | Q3 |\n|---|---|---|---|')
+        for region in ('North', 'South', 'East', 'West'):
+            parts.append(f"| {region} | {i * 3} | {i * 5} | {i * 7} |")
+        parts.append('\n```python\ntotal = sum(row.value for row in rows)\nprint(total)\n```\n')
+    return '\n'.join(parts)
+
+
+def legacy_render(text: str) -> bytes:
+    """The Markdown renderer as it was before the caches and pool were added."""
+    import markdown
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+    from apps.tools.converters.weasyprint_service import MARKDOWN_CSS, MARKDOWN_TEMPLATE
+
+    body = markdown.markdown(text, extensions=['tables', 'fenced_code', 'codehilite'])
+    font_config = FontConfiguration()
+    return HTML(string=MARKDOWN_TEMPLATE.format(body=body)).write_pdf(
+        stylesheets=[CSS(string=MARKDOWN_CSS, font_config=font_config)], font_config=font_config,
+    )
+
+
+def timed(label: str, func, repeat: int):
+    best = None
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(func())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:9.1f}ms  {size / 1024:9.0f} KiB")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sections', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from apps.tools.converters.weasyprint_service import WeasyPrintService, _render
+
+    documents = [('small', build_markdown(1)), ('large', build_markdown(args.sections))]
+
+    # Start the pool and let it warm up outside the timings
+    WeasyPrintService.render('markdown', '# warm-up')
+    _render('markdown', '# warm-up')
+
+    for name, text in documents:
+        print(f"\n{name.capitalize()} document: {len(text) / 1024:.0f} KiB Markdown, CPUs: {os.cpu_count()}")
+        before = timed('before (per call)', lambda: legacy_render(text), args.repeat)
+        timed('after (in process)', lambda: _render('markdown', text), args.repeat)
+        after = timed('after (warm pool)', lambda: WeasyPrintService.render('markdown', text), args.repeat)
+        print(f"Speed-up: {before / after:.1f}x")
+
+    WeasyPrintService.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+import threading
+from unittest import mock
+
+import fakeredis
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.middleware.rate_limit import RateLimitMiddleware
+from core.rate_limiter import Limit, RateLimitEngine
+from core.scale_control import ScaleController
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FakeRedisTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        patcher = mock.patch.object(RateLimitEngine, '_redis', staticmethod(lambda: self.redis))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class RateLimitEngineTests(FakeRedisTestCase):
+    def test_burst_then_deny(self):
+        limit = Limit(10, 60, burst=3)
+        results = [RateLimitEngine.check('k', limit, now=1000) for _ in range(4)]
+
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual([r.remaining for r in results], [2, 1, 0, 0])
+        # One request refills every 6 seconds
+        self.assertEqual(results[-1].retry_after, 6)
+        self.assertEqual(results[-1].retry_after_seconds, 6)
+
+    def test_refill_over_time(self):
+        limit = Limit(60, 60)
+        for _ in range(60):
+            self.assertTrue(RateLimitEngine.check('k', limit, now=1000).allowed)
+        self.assertFalse(RateLimitEngine.check('k', limit, now=1000).allowed)
+
+        self.assertTrue(RateLimitEngine.check('k', limit, now=1001).allowed)
+        self.assertFalse(RateLimitEngine.check('k', limit, now=1001).allowed)
+
+        result = RateLimitEngine.check('k', limit, now=1061)
+        self.assertTrue(result.allowed)
+        self.assertEqual(result.remaining, 59)
+
+    def test_every_window_must_allow(self):
+        limits = [Limit(10, 60), Limit(12, 3600)]
+        for _ in range(10):
+            self.assertTrue(RateLimitEngine.check('k', limits, now=1000).allowed)
+
+        minute = RateLimitEngine.check('k', limits, now=1000)
+        self.assertFalse(minute.allowed)
+        self.assertEqual(minute.limit, limits[0])
+
+        # The minute window refills long before the hourly one
+        for _ in range(2):
+            self.assertTrue(RateLimitEngine.check('k', limits, now=1060).allowed)
+        hour = RateLimitEngine.check('k', limits, now=1060)
+        self.assertFalse(hour.allowed)
+        self.assertEqual(hour.limit, limits[1])
+        self.assertEqual(hour.policy, '10;w=60, 12;w=3600')
+
+    def test_denied_request_consumes_nothing(self):
+        limits = [Limit(10, 60), Limit(2, 3600)]
+        RateLimitEngine.check('k', limits, now=1000)
+        RateLimitEngine.check('k', limits, now=1000)
+        minute_tat = self.redis.get('rl:k:60')
+
+        self.assertFalse(RateLimitEngine.check('k', limits, now=1000).allowed)
+        self.assertEqual(self.redis.get('rl:k:60'), minute_tat)
+
+    def test_cost(self):
+        limit = Limit(10, 60)
+        self.assertEqual(RateLimitEngine.check('k', limit, cost=4, now=1000).remaining, 6)
+        self.assertEqual(RateLimitEngine.check('k', limit, cost=6, now=1000).remaining, 0)
+        self.assertFalse(RateLimitEngine.check('k', limit, cost=1, now=1000).allowed)
+
+    def test_one_expiring_key_per_window(self):
+        limits = [Limit(100, 60), Limit(1000, 3600)]
+        for i in range(50):
+            RateLimitEngine.check('k', limits, now=1000 + i / 10)
+
+        self.assertEqual(sorted(self.redis.keys()), [b'rl:k:3600', b'rl:k:60'])
+        self.assertGreater(self.redis.pttl('rl:k:60'), 0)
+        self.assertLessEqual(self.redis.pttl('rl:k:60'), 60000)
+
+    def test_one_round_trip_per_check(self):
+        RateLimitEngine.check('k', Limit(10, 60))
+        with mock.patch.object(self.redis, 'execute_command', wraps=self.redis.execute_command) as execute:
+            RateLimitEngine.check('k', Limit(10, 60))
+        self.assertEqual([c.args[0] for c in execute.call_args_list], ['EVALSHA'])
+
+    def test_redis_clock(self):
+        limit = Limit(2, 60)
+        self.assertTrue(RateLimitEngine.check('k', limit).allowed)
+        self.assertTrue(RateLimitEngine.check('k', limit).allowed)
+        self.assertFalse(RateLimitEngine.check('k', limit).allowed)
+
+    def test_concurrent_checks_never_over_admit(self):
+        limit = Limit(25, 60)
+        allowed = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            for _ in range(10):
+                allowed.append(RateLimitEngine.check('k', limit, now=1000).allowed)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(allowed), 80)
+        self.assertEqual(allowed.count(True), 25)
+
+    def test_headers(self):
+        RateLimitEngine.check('k', Limit(2, 60), now=1000)
+        RateLimitEngine.check('k', Limit(2, 60), now=1000)
+        headers = RateLimitEngine.check('k', Limit(2, 60), now=1000).headers()
+
+        self.assertEqual(headers['RateLimit-Limit'], '2')
+        self.assertEqual(headers['RateLimit-Remaining'], '0')
+        self.assertEqual(headers['RateLimit-Reset'], '60')
+        self.assertEqual(headers['RateLimit-Policy'], '2;w=60')
+        self.assertEqual(headers['Retry-After'], '30')
+
+    def test_fails_open_without_redis(self):
+        with mock.patch.object(RateLimitEngine, '_redis', side_effect=ConnectionError('down')):
+            result = RateLimitEngine.check('k', Limit(1, 60))
+        self.assertTrue(result.allowed)
+        self.assertNotIn('Retry-After', result.headers())
+
+
+class RateLimitMiddlewareTests(FakeRedisTestCase):
+    def setUp(self):
+        super().setUp()
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse('ok'))
+        self.factory = RequestFactory()
+
+    def request(self, path, ip='10.0.0.1'):
+        request = self.factory.post(path, REMOTE_ADDR=ip)
+        request.user = AnonymousUser()
+        return self.middleware(request)
+
+    def test_limits_and_headers(self):
+        responses = [self.request('/api/auth/login/') for _ in range(11)]
+
+        self.assertEqual([r.status_code for r in responses], [200] * 10 + [429])
+        self.assertEqual(responses[0]['RateLimit-Limit'], '10')
+        self.assertEqual(responses[0]['RateLimit-Remaining'], '9')
+        self.assertEqual(responses[0]['X-RateLimit-Remaining'], '9')
+        self.assertEqual(responses[0]['RateLimit-Policy'], '10;w=60, 60;w=3600')
+        self.assertEqual(responses[-1]['Retry-After'], '6')
+
+    def test_clients_are_limited_separately(self):
+        for _ in range(10):
+            self.request('/api/auth/login/')
+        self.assertEqual(self.request('/api/auth/login/').status_code, 429)
+        self.assertEqual(self.request('/api/auth/login/', ip='10.0.0.2').status_code, 200)
+
+    def test_endpoint_cost_draws_on_shared_budget(self):
+        self.assertEqual(self.request('/api/tools/ocr/')['RateLimit-Remaining'], '27')
+        self.assertEqual(self.request('/api/tools/pdf-to-word/')['RateLimit-Remaining'], '25')
+        self.assertEqual(self.request('/api/tools/merge/')['RateLimit-Remaining'], '24')
+
+    def test_violations_block_client(self):
+        for _ in range(10 + RateLimitMiddleware.VIOLATION_THRESHOLD):
+            self.request('/api/auth/login/')
+        self.assertEqual(cache.get('violations:10.0.0.1'), RateLimitMiddleware.VIOLATION_THRESHOLD)
+        self.assertTrue(cache.get('blocked:10.0.0.1'))
+
+
+class ScaleControllerTests(FakeRedisTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(ScaleController, 'get_user_tier', return_value='GUEST')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_requests_respect_tier_limit(self):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(ScaleController.check_rate_limit(None)))
+            for _ in range(20)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        allowed = [r for r in results if r[0]]
+        denied = [r for r in results if not r[0]]
+        self.assertEqual(len(allowed), 5)
+        self.assertTrue(all(1 <= retry_after <= 12 for _, retry_after in denied))
+
+    def test_cost(self):
+        self.assertEqual(ScaleController.check_rate_limit(None, cost=5), (True, 0))
+        self.assertFalse(ScaleController.check_rate_limit(None)[0])
+        self.assertEqual(ScaleController.check_rate_limit(None, action='other'), (True, 0))
+
+    def test_job_limit(self):
+        for _ in range(10):
+            self.assertEqual(ScaleController.check_job_limit(None), (True, 0))
+        allowed, retry_after = ScaleController.check_job_limit(None)
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 360)